@@ -1,5 +1,6 @@
 # app/__init__.py
 from flask import Flask, render_template
+from sqlalchemy import event
 from app.extensions import db, login_manager, admin, migrate
 from app.models import User
 
@@ -13,6 +14,16 @@ def create_app(config_object='config.Config'):
     login_manager.init_app(app)
     migrate.init_app(app, db)
     
+    # 数据库连接设置
+    register_database_events(app)
+    
+    # 注册写入排队、条文文本、计数、全文索引与版本生效区间维护事件
+    from app.services import write_queue, texts, counters, search, version_ranges  # noqa: F401
+    
+    # 测试时限制单个请求的查询数
+    from app.services.query_guard import init_query_guard
+    init_query_guard(app)
+    
     # 注册蓝图
     from app.views.auth import auth_bp
     from app.views.regulation import regulation_bp
@@ -29,29 +40,44 @@ def create_app(config_object='config.Config'):
     # 设置Admin
     setup_admin(app)
     
+    # 提前初始化 process/ 处理流程的分词器
+    if app.config.get('TOKENIZER_EAGER_INIT'):
+        from process.tools.tokenizer import init_tokenizer
+        init_tokenizer()
+    
     # 辅助函数
     register_context_processors(app)
     register_template_filters(app)
     
     return app
 
+def register_database_events(app):
+    """注册数据库连接事件"""
+    with app.app_context():
+        engine = db.engine
+    
+    if engine.dialect.name == 'sqlite':
+        pragmas = app.config.get('SQLITE_PRAGMAS', {'foreign_keys': 'ON'})
+        
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragma(dbapi_connection, connection_record):
+            """按配置设置连接参数；SQLite 默认不检查外键，需按连接开启以支持 ON DELETE CASCADE"""
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+            cursor.close()
+    
+    # 可选的内存只读副本
+    from app.services.read_replica import init_read_replica
+    init_read_replica(app, engine)
+
 def register_context_processors(app):
     """注册上下文处理器"""
-    # 获取处罚计数辅助函数
+    # 法规计数辅助函数（读取 legal_counter 汇总表，列表页由视图预先按本页法规批量读取）
     @app.context_processor
     def utility_processor():
-        from app.models import LegalCause, LegalPunishment
-        
-        def get_punishment_count(regulation_id):
-            """获取特定法规的处罚总数"""
-            return db.session.query(LegalPunishment).\
-                join(LegalCause).\
-                filter(LegalCause.regulation_id == regulation_id).\
-                count()
-                
-        return {
-            'get_punishment_count': get_punishment_count
-        }
+        from app.services.counters import get_regulation_counts
+        return {'get_regulation_counts': get_regulation_counts}
 
 def register_template_filters(app):
     """注册模板过滤器"""
@@ -3,9 +3,10 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_admin import Admin
 from flask_migrate import Migrate
+from app.services.read_replica import RoutingSession
 
 # 创建扩展实例但不初始化
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 admin = Admin(name='法律法规管理平台', template_mode='bootstrap4')
 migrate = Migrate()
@@ -5,5 +5,7 @@ from app.extensions import db
 from app.models.user import User
 from app.models.regulation import (
     LegalRegulation, LegalRegulationVersion, 
-    LegalStructure, LegalCause, LegalPunishment
+    LegalStructure, LegalCause, LegalPunishment,
+    LegalStructureCauseLink, LegalCounter, LegalSearchDocument, LegalText,
+    LegalVersionDiff
 )
\ No newline at end of file
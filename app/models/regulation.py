@@ -1,7 +1,69 @@
 # app/models/regulation.py
+import hashlib
 from datetime import datetime
+from sqlalchemy import inspect, event, select, Computed
 from app.extensions import db
 
+# 关联默认不允许隐式查询，需要时在查询中用 selectinload/joinedload 预先加载，
+# 避免模板中逐行懒加载（N+1 查询）
+LAZY = 'raise_on_sql'
+
+# 条文位置键：条/款/项/目各占三位十进制，空值按 0 计，
+# 排序与 (条, 款, 项, 目) 一致，某条的全部条文是一段连续区间
+PATH_KEY_STEP = 1000
+PATH_KEY_SQL = (
+    'COALESCE(article, 0) * 1000000000 + COALESCE(paragraph, 0) * 1000000'
+    ' + COALESCE(item, 0) * 1000 + COALESCE(section, 0)'
+)
+
+def make_path_key(article, paragraph=None, item=None, section=None):
+    """计算条文位置键"""
+    key = 0
+    for part in (article, paragraph, item, section):
+        key = key * PATH_KEY_STEP + (part or 0)
+    return key
+
+def path_key_range(article, paragraph=None, item=None):
+    """返回某条（款、项）下全部条文位置键的闭区间 (起, 止)"""
+    parts = [part for part in (article, paragraph, item) if part is not None]
+    span = PATH_KEY_STEP ** (4 - len(parts))
+    start = make_path_key(*parts)
+    return start, start + span - 1
+
+def text_hash(text):
+    """文本的 SHA-256 哈希（十六进制），作为 legal_text 的主键"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+# 对象上已赋值、尚未写入 legal_text 的文本 {哈希列: (哈希, 文本)}
+_PENDING_TEXTS = '_pending_texts'
+
+def _text_property(hash_attr, text_attr):
+    """以哈希列与文本关联读写条文文本的属性
+
+    赋值时只计算哈希，文本在 flush 前由 app.services.texts 写入 legal_text。
+    """
+    def getter(self):
+        pending = self.__dict__.get(_PENDING_TEXTS, {}).get(hash_attr)
+        if pending is not None and pending[0] == self.__dict__.get(hash_attr):
+            return pending[1]
+        text = getattr(self, text_attr)
+        return text.content if text is not None else None
+
+    def setter(self, value):
+        key = text_hash(value) if value is not None else None
+        self.__dict__.setdefault(_PENDING_TEXTS, {})[hash_attr] = (key, value)
+        setattr(self, hash_attr, key)
+
+    return property(getter, setter)
+
+def pending_texts(obj):
+    """对象上待写入 legal_text 的文本 {哈希: 文本}"""
+    return {key: value for key, value in obj.__dict__.get(_PENDING_TEXTS, {}).values() if key is not None}
+
+def _loaded(obj, attr):
+    """返回已加载的关联对象，未加载时返回 None，__str__ 不触发查询"""
+    return inspect(obj).dict.get(attr)
+
 class TimestampMixin:
     """添加创建和更新时间戳的Mixin类"""
     created_at = db.Column(db.DateTime, default=datetime.now)
@@ -10,22 +72,30 @@ class TimestampMixin:
 class LegalRegulationVersion(db.Model, TimestampMixin):
     """法规版本信息表"""
     id = db.Column(db.Integer, primary_key=True)
-    regulation_id = db.Column(db.Integer, db.ForeignKey('legal_regulation.id'), nullable=False)
+    regulation_id = db.Column(db.Integer, db.ForeignKey('legal_regulation.id', name='fk_version_regulation_id', ondelete='CASCADE'), nullable=False)
     version_number = db.Column(db.String(50))  # 如 "1.0", "2.0" 或年份如 "2010版"
     revision_date = db.Column(db.DateTime)     # 修订日期
     effective_date = db.Column(db.DateTime)    # 该版本生效日期
+    effective_until = db.Column(db.DateTime)   # 失效日期（下一版本的生效日期，由 version_ranges 维护）
     publish_date = db.Column(db.DateTime)      # 该版本公布日期
     status = db.Column(db.String(20), default='current')  # "current", "superseded", "archived"
     changes_summary = db.Column(db.Text)       # 主要变更摘要
     step_id = db.Column(db.Integer, default=1)  # 默认值为1
     
     # 关联
-    regulation = db.relationship('LegalRegulation', back_populates='versions')
-    structures = db.relationship('LegalStructure', back_populates='version')
-    causes = db.relationship('LegalCause', back_populates='version')
+    regulation = db.relationship('LegalRegulation', back_populates='versions', lazy=LAZY)
+    structures = db.relationship('LegalStructure', back_populates='version', passive_deletes=True, lazy=LAZY)
+    causes = db.relationship('LegalCause', back_populates='version', passive_deletes=True, lazy=LAZY)
+    
+    __table_args__ = (
+        db.Index('ix_version_regulation_revision', 'regulation_id', 'revision_date'),
+        db.Index('ix_version_effective_range', 'regulation_id', 'effective_date', 'effective_until'),
+        db.Index('ix_version_regulation_number', 'regulation_id', 'version_number'),
+    )
     
     def __str__(self):
-        return f"{self.regulation.name} - {self.version_number}" if self.regulation else self.version_number
+        regulation = _loaded(self, 'regulation')
+        return f"{regulation.name} - {self.version_number}" if regulation else self.version_number
 
 class LegalRegulation(db.Model, TimestampMixin):
     """法规模型"""
@@ -44,10 +114,17 @@ class LegalRegulation(db.Model, TimestampMixin):
     latest_revision_date = db.Column(db.DateTime)     # 最新修订日期
     current_version_id = db.Column(db.Integer)        # 当前版本ID
     
-    # 关联
-    structures = db.relationship('LegalStructure', back_populates='regulation', cascade='all, delete-orphan')
-    causes = db.relationship('LegalCause', back_populates='regulation', cascade='all, delete-orphan')
-    versions = db.relationship('LegalRegulationVersion', back_populates='regulation', cascade='all, delete-orphan')
+    # 关联（子表由数据库 ON DELETE CASCADE 删除，不预先加载）
+    structures = db.relationship('LegalStructure', back_populates='regulation',
+                                 cascade='all, delete-orphan', passive_deletes=True, lazy=LAZY)
+    causes = db.relationship('LegalCause', back_populates='regulation',
+                             cascade='all, delete-orphan', passive_deletes=True, lazy=LAZY)
+    versions = db.relationship('LegalRegulationVersion', back_populates='regulation',
+                               cascade='all, delete-orphan', passive_deletes=True, lazy=LAZY)
+    
+    __table_args__ = (
+        db.Index('ix_regulation_level_publish', 'hierarchy_level', 'publish_date'),
+    )
     
     def __str__(self):
         return self.name
@@ -63,56 +140,81 @@ class LegalRegulation(db.Model, TimestampMixin):
         query = LegalStructure.query.filter_by(regulation_id=self.id)
         
         if version_id:
-            query = query.filter(
-                db.or_(
-                    LegalStructure.version_id == version_id,
-                    LegalStructure.version_id.is_(None)
-                )
-            )
+            query = query.filter(LegalStructure.version_id == version_id)
         
-        return query.order_by(LegalStructure.article, LegalStructure.paragraph, 
-                             LegalStructure.item, LegalStructure.section).all()
+        return query.order_by(LegalStructure.path_key).all()
     
     def get_causes(self, version_id=None):
         """获取指定版本的事由"""
         query = LegalCause.query.filter_by(regulation_id=self.id)
         
         if version_id:
-            query = query.filter(
-                db.or_(
-                    LegalCause.version_id == version_id,
-                    LegalCause.version_id.is_(None)
-                )
-            )
+            query = query.filter(LegalCause.version_id == version_id)
         
         return query.order_by(LegalCause.code).all()
 
 class LegalStructure(db.Model, TimestampMixin):
     """法律条文结构"""
     id = db.Column(db.Integer, primary_key=True)
-    regulation_id = db.Column(db.Integer, db.ForeignKey('legal_regulation.id'), nullable=False)
-    version_id = db.Column(db.Integer, db.ForeignKey('legal_regulation_version.id', name='fk_structure_version_id'))
+    regulation_id = db.Column(db.Integer, db.ForeignKey('legal_regulation.id', name='fk_structure_regulation_id', ondelete='CASCADE'), nullable=False)
+    version_id = db.Column(db.Integer, db.ForeignKey('legal_regulation_version.id', name='fk_structure_version_id', ondelete='CASCADE'), nullable=False)
     
     article = db.Column(db.Integer)  # 条
     paragraph = db.Column(db.Integer)  # 款
     item = db.Column(db.Integer)  # 项
     section = db.Column(db.Integer)  # 目
     
-    content = db.Column(db.Text, nullable=False)
-    original_text = db.Column(db.Text)  # 原始文本
+    # 内容与原始文本存于 legal_text，按哈希引用，各版本相同的条文共用一行
+    content_hash = db.Column(db.String(64), db.ForeignKey('legal_text.hash', name='fk_structure_content_hash'), nullable=False)
+    original_text_hash = db.Column(db.String(64), db.ForeignKey('legal_text.hash', name='fk_structure_original_text_hash'))
+    
+    # 位置键，由数据库根据条/款/项/目生成
+    path_key = db.Column(db.BigInteger, Computed(PATH_KEY_SQL))
     
     # 关联
-    regulation = db.relationship('LegalRegulation', back_populates='structures')
-    version = db.relationship('LegalRegulationVersion', back_populates='structures')
+    regulation = db.relationship('LegalRegulation', back_populates='structures', lazy=LAZY)
+    version = db.relationship('LegalRegulationVersion', back_populates='structures', lazy=LAZY)
+    cause_links = db.relationship('LegalStructureCauseLink', back_populates='structure',
+                                  cascade='all, delete-orphan', passive_deletes=True, lazy=LAZY)
+    # 文本随条文在同一查询中连接加载
+    content_text = db.relationship('LegalText', foreign_keys=[content_hash], viewonly=True, lazy='joined')
+    original_text_text = db.relationship('LegalText', foreign_keys=[original_text_hash], viewonly=True, lazy='joined')
+    
+    content = _text_property('content_hash', 'content_text')
+    original_text = _text_property('original_text_hash', 'original_text_text')  # 原始文本
+    
+    __table_args__ = (
+        db.Index('ix_structure_regulation_version_path', 'regulation_id', 'version_id', 'path_key'),
+        db.Index('ix_structure_content_hash', 'content_hash'),
+        db.Index('ix_structure_original_text_hash', 'original_text_hash'),
+    )
     
     def __str__(self):
         return f"第{self.article}条" if self.article else "未编号条文"
+    
+    @classmethod
+    def at(cls, article, paragraph=None, item=None, section=None):
+        """精确定位条文的查询条件"""
+        return cls.path_key == make_path_key(article, paragraph, item, section)
+    
+    @classmethod
+    def within(cls, article, paragraph=None, item=None):
+        """某条（款、项）下全部条文的查询条件，如 within(12) 为第十二条全部条文"""
+        return cls.path_key.between(*path_key_range(article, paragraph, item))
+
+class LegalText(db.Model):
+    """条文文本，按内容哈希去重；未被引用的文本由 app.services.texts.prune_unused_texts 清理"""
+    hash = db.Column(db.String(64), primary_key=True)
+    content = db.Column(db.Text, nullable=False)
+    
+    def __str__(self):
+        return self.content[:30]
 
 class LegalCause(db.Model, TimestampMixin):
     """法律事由"""
     id = db.Column(db.Integer, primary_key=True)
-    regulation_id = db.Column(db.Integer, db.ForeignKey('legal_regulation.id'), nullable=False)
-    version_id = db.Column(db.Integer, db.ForeignKey('legal_regulation_version.id', name='fk_cause_version_id'))
+    regulation_id = db.Column(db.Integer, db.ForeignKey('legal_regulation.id', name='fk_cause_regulation_id', ondelete='CASCADE'), nullable=False)
+    version_id = db.Column(db.Integer, db.ForeignKey('legal_regulation_version.id', name='fk_cause_version_id', ondelete='CASCADE'), nullable=False)
     
     code = db.Column(db.String(100), nullable=False)  # 唯一编号
     description = db.Column(db.Text, nullable=False)  # 事由描述
@@ -128,9 +230,16 @@ class LegalCause(db.Model, TimestampMixin):
     severity = db.Column(db.String(20))  # 严重程度
     
     # 关联
-    punishments = db.relationship('LegalPunishment', back_populates='cause', cascade='all, delete-orphan')
-    regulation = db.relationship('LegalRegulation', back_populates='causes')
-    version = db.relationship('LegalRegulationVersion', back_populates='causes')
+    punishments = db.relationship('LegalPunishment', back_populates='cause',
+                                  cascade='all, delete-orphan', passive_deletes=True, lazy=LAZY)
+    regulation = db.relationship('LegalRegulation', back_populates='causes', lazy=LAZY)
+    version = db.relationship('LegalRegulationVersion', back_populates='causes', lazy=LAZY)
+    structure_links = db.relationship('LegalStructureCauseLink', back_populates='cause',
+                                      cascade='all, delete-orphan', passive_deletes=True, lazy=LAZY)
+    
+    __table_args__ = (
+        db.Index('ix_cause_regulation_version_code', 'regulation_id', 'version_id', 'code'),
+    )
     
     def __str__(self):
         return f"{self.code}: {self.description[:30]}..." if len(self.description) > 30 else self.description
@@ -138,8 +247,10 @@ class LegalCause(db.Model, TimestampMixin):
 class LegalPunishment(db.Model, TimestampMixin):
     """具体处罚措施"""
     id = db.Column(db.Integer, primary_key=True)
-    cause_id = db.Column(db.Integer, db.ForeignKey('legal_cause.id'), nullable=False)
-    version_id = db.Column(db.Integer, db.ForeignKey('legal_regulation_version.id', name='fk_punishment_version_id'))
+    cause_id = db.Column(db.Integer, db.ForeignKey('legal_cause.id', name='fk_punishment_cause_id', ondelete='CASCADE'), nullable=False)
+    # 法规与版本取自所属事由，按法规、版本统计和导出处罚时无需关联事由表
+    regulation_id = db.Column(db.Integer, db.ForeignKey('legal_regulation.id', name='fk_punishment_regulation_id', ondelete='CASCADE'), nullable=False)
+    version_id = db.Column(db.Integer, db.ForeignKey('legal_regulation_version.id', name='fk_punishment_version_id', ondelete='CASCADE'), nullable=False)
     
     circumstance = db.Column(db.String(200))  # 情形
     punishment_type = db.Column(db.String(100))  # 处罚类型
@@ -151,8 +262,107 @@ class LegalPunishment(db.Model, TimestampMixin):
     additional_notes = db.Column(db.Text)  # 行政行为
     
     # 关联
-    cause = db.relationship('LegalCause', back_populates='punishments')
-    version = db.relationship('LegalRegulationVersion')
+    cause = db.relationship('LegalCause', back_populates='punishments', lazy=LAZY)
+    version = db.relationship('LegalRegulationVersion', lazy=LAZY)
+    
+    __table_args__ = (
+        db.Index('ix_punishment_cause', 'cause_id'),
+        db.Index('ix_punishment_version', 'version_id'),
+        db.Index('ix_punishment_regulation_version', 'regulation_id', 'version_id'),
+    )
+    
+    def __str__(self):
+        cause = _loaded(self, 'cause')
+        return f"{self.punishment_type} - {cause.code}" if cause else self.punishment_type
+
+@event.listens_for(LegalPunishment, 'before_insert')
+@event.listens_for(LegalPunishment, 'before_update')
+def _copy_cause_scope(mapper, connection, target):
+    """新建或更换事由的处罚，从事由补齐法规与版本（Core 批量写入需自行填写）"""
+    state = inspect(target)
+    cause_changed = state.attrs.cause_id.history.has_changes() if state.persistent else False
+    if target.regulation_id is not None and target.version_id is not None and not cause_changed:
+        return
+    cause_table = LegalCause.__table__
+    row = connection.execute(select(cause_table.c.regulation_id, cause_table.c.version_id).where(
+        cause_table.c.id == target.cause_id
+    )).first()
+    if row is None:
+        return
+    target.regulation_id = row.regulation_id
+    if target.version_id is None or cause_changed:
+        target.version_id = row.version_id
+
+class LegalStructureCauseLink(db.Model):
+    """条文与事由的关联（违则/罚则/行为），由事由的条款引用解析而来"""
+    id = db.Column(db.Integer, primary_key=True)
+    regulation_id = db.Column(db.Integer, db.ForeignKey('legal_regulation.id', name='fk_link_regulation_id', ondelete='CASCADE'), nullable=False)
+    version_id = db.Column(db.Integer, db.ForeignKey('legal_regulation_version.id', name='fk_link_version_id', ondelete='CASCADE'))
+    structure_id = db.Column(db.Integer, db.ForeignKey('legal_structure.id', name='fk_link_structure_id', ondelete='CASCADE'), nullable=False)
+    cause_id = db.Column(db.Integer, db.ForeignKey('legal_cause.id', name='fk_link_cause_id', ondelete='CASCADE'), nullable=False)
+    role = db.Column(db.String(20), nullable=False)  # "violation", "punishment", "behavior"
+    
+    # 关联
+    structure = db.relationship('LegalStructure', back_populates='cause_links', lazy=LAZY)
+    cause = db.relationship('LegalCause', back_populates='structure_links', lazy=LAZY)
+    
+    __table_args__ = (
+        db.Index('ix_link_regulation_version', 'regulation_id', 'version_id'),
+        db.Index('ix_link_structure', 'structure_id'),
+        db.Index('ix_link_cause', 'cause_id'),
+        db.UniqueConstraint('version_id', 'structure_id', 'cause_id', 'role', name='uq_link_version_structure_cause_role'),
+    )
+    
+    def __str__(self):
+        return f"{self.structure_id} - {self.cause_id} ({self.role})"
+
+class LegalCounter(db.Model):
+    """数据计数汇总（全局/法规/版本），由 app.services.counters 维护"""
+    scope = db.Column(db.String(20), primary_key=True)  # "global", "regulation", "version"
+    scope_id = db.Column(db.Integer, primary_key=True)  # 法规ID或版本ID，全局为0
+    regulation_id = db.Column(db.Integer, index=True)   # 所属法规，便于整体刷新
+    
+    regulation_count = db.Column(db.Integer, nullable=False, default=0)
+    structure_count = db.Column(db.Integer, nullable=False, default=0)
+    cause_count = db.Column(db.Integer, nullable=False, default=0)
+    punishment_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    def __str__(self):
+        return f"{self.scope}:{self.scope_id}"
+
+class LegalVersionDiff(db.Model):
+    """版本比较结果缓存（JSON），signature 与两个版本条文的现状不一致时由 app.services.version_diff 重新计算"""
+    old_version_id = db.Column(db.Integer, db.ForeignKey('legal_regulation_version.id', name='fk_version_diff_old_version_id', ondelete='CASCADE'), primary_key=True)
+    new_version_id = db.Column(db.Integer, db.ForeignKey('legal_regulation_version.id', name='fk_version_diff_new_version_id', ondelete='CASCADE'), primary_key=True)
+    signature = db.Column(db.String(200), nullable=False)
+    result = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    
+    __table_args__ = (
+        db.Index('ix_version_diff_new_version', 'new_version_id'),
+    )
+    
+    def __str__(self):
+        return f"{self.old_version_id} -> {self.new_version_id}"
+
+class LegalSearchDocument(db.Model):
+    """全文检索文档，id 与 FTS5 表 legal_search_fts 的 rowid 一致"""
+    id = db.Column(db.Integer, primary_key=True)
+    doc_type = db.Column(db.String(20), nullable=False)  # "structure", "cause", "punishment"
+    doc_id = db.Column(db.Integer, nullable=False)
+    regulation_id = db.Column(db.Integer, nullable=False, index=True)
+    version_id = db.Column(db.Integer)
+    
+    # 定位信息（条款号），事由与处罚取其违则条款对应的条
+    article = db.Column(db.Integer)
+    paragraph = db.Column(db.Integer)
+    item = db.Column(db.Integer)
+    section = db.Column(db.Integer)
+    
+    __table_args__ = (
+        db.UniqueConstraint('doc_type', 'doc_id', name='uq_search_doc_type_id'),
+    )
     
     def __str__(self):
-        return f"{self.punishment_type} - {self.cause.code}" if self.cause else self.punishment_type
\ No newline at end of file
+        return f"{self.doc_type}:{self.doc_id}"
@@ -0,0 +1,2 @@
+# app/services/__init__.py
+# 视图、导入脚本共用的数据服务
@@ -0,0 +1,130 @@
+# app/services/bulk_loader.py
+"""
+批量导入工具
+DataFrame 按列整体转换为字典列表，再以 Core insert 批量写入，
+不为每行创建 ORM 对象。
+"""
+import logging
+import numpy as np
+import pandas as pd
+from app.extensions import db
+from app.services.counters import notify_bulk_change
+from app.services.search import notify_reindex
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+
+
+def _convert_column(series, kind):
+    """按类型转换整列，返回 (转换后的列, 无法转换的行掩码)"""
+    present = series.notna()
+    if kind == 'int':
+        numbers = pd.to_numeric(series, errors='coerce')
+        invalid = present & numbers.isna()
+        # 与 int() 一致，小数向零取整；转为 object 列以保留 Python int
+        converted = np.trunc(numbers).astype('Int64').astype(object)
+        return converted.where(converted.notna(), None), invalid
+    if kind == 'str':
+        return series.astype(str).where(present, None), pd.Series(False, index=series.index)
+    raise ValueError(f"不支持的列类型: {kind}")
+
+
+def frame_to_records(df, spec, constants=None):
+    """将 DataFrame 转换为可批量插入的字典列表
+
+    spec 为 {字段名: (Excel列名, 类型, 空值默认值)}，类型为 'int' 或 'str'；
+    constants 为每行相同的字段值。无法转换为整数的行会被跳过，返回 (记录列表, 跳过行数)。
+    """
+    columns = {}
+    invalid = pd.Series(False, index=df.index)
+    for field, (column, kind, default) in spec.items():
+        if column in df.columns:
+            values, bad = _convert_column(df[column], kind)
+            invalid |= bad
+            if default is not None:
+                values = values.where(values.notna(), default)
+        else:
+            values = pd.Series(default, index=df.index, dtype=object)
+        columns[field] = values
+
+    frame = pd.DataFrame(columns, index=df.index)[~invalid]
+    for field, value in (constants or {}).items():
+        frame[field] = value
+    records = frame.astype(object).where(frame.notna(), None).to_dict('records')
+    return records, int(invalid.sum())
+
+
+def bulk_insert(model, records, batch_size=BATCH_SIZE, session=None):
+    """以 executemany 分批插入记录，不提交事务，返回插入行数"""
+    session = session or db.session
+    table = model.__table__
+    for start in range(0, len(records), batch_size):
+        session.execute(table.insert(), records[start:start + batch_size])
+    return len(records)
+
+
+def clear_version_structures(regulation_id, version_id, session=None):
+    """删除法规版本的条文（单条 DELETE，关联由 ON DELETE CASCADE 删除），不提交事务，返回删除条数"""
+    from app.models import LegalStructure
+    from app.services.texts import structure_text_hashes, prune_unused_texts
+    session = session or db.session
+    structure_table = LegalStructure.__table__
+    condition = (structure_table.c.regulation_id == regulation_id) & (structure_table.c.version_id == version_id)
+    hashes = structure_text_hashes(condition, session)
+    deleted = session.execute(structure_table.delete().where(condition)).rowcount
+    # 清理只被这些条文引用的文本
+    prune_unused_texts(hashes, session)
+    after_bulk_write([regulation_id], session)
+    return deleted
+
+
+def clear_version_causes(regulation_id, version_id, session=None):
+    """删除法规版本的事由（单条 DELETE，处罚与关联由 ON DELETE CASCADE 删除），不提交事务，返回删除条数"""
+    from app.models import LegalCause
+    session = session or db.session
+    cause_table = LegalCause.__table__
+    deleted = session.execute(cause_table.delete().where(
+        cause_table.c.regulation_id == regulation_id,
+        cause_table.c.version_id == version_id
+    )).rowcount
+    after_bulk_write([regulation_id], session)
+    return deleted
+
+
+def clear_version_punishments(regulation_id, version_id, session=None):
+    """删除法规版本的处罚（单条 DELETE），不提交事务，返回删除条数"""
+    from app.models import LegalPunishment
+    session = session or db.session
+    punishment_table = LegalPunishment.__table__
+    deleted = session.execute(punishment_table.delete().where(
+        punishment_table.c.regulation_id == regulation_id,
+        punishment_table.c.version_id == version_id
+    )).rowcount
+    after_bulk_write([regulation_id], session)
+    return deleted
+
+
+def conflict_insert(table, session=None):
+    """
+    支持 ON CONFLICT（on_conflict_do_nothing / on_conflict_do_update）的 insert 构造，
+    按会话所连数据库选择 SQLite 或 PostgreSQL 方言；其他数据库返回 None，由调用方改用通用写法
+    """
+    dialect = (session or db.session).get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert(table)
+
+
+def after_bulk_write(regulation_ids, session=None):
+    """
+    Core 语句（批量插入、集合更新/删除）写入后调用：这些语句不经过ORM事件，
+    在此登记受影响的法规，提交时刷新其计数与全文索引
+    """
+    session = session or db.session
+    notify_bulk_change(regulation_ids, session)
+    notify_reindex(regulation_ids, session)
@@ -0,0 +1,237 @@
+# app/services/clause_lookup.py
+"""
+条款引用批量解析
+将"《中华人民共和国统计法》第37条第1款"一类的引用解析为条文内容：
+引用由 process.tools.clause_parser 扫描为 (法规名, 条, 款, 项, 目)，法规名经进程内的名称表
+映射为法规与默认版本（名称表按 legal_regulation 的签名失效重建），
+全部引用以 JSON 参数传入，由一条按 (regulation_id, version_id, path_key) 区间查询的语句取回
+（SQLite 的 json_each；其他数据库改为分批的 OR 区间查询）。
+"""
+import json
+import bisect
+import logging
+import threading
+from flask import current_app
+from sqlalchemy import select, func, and_, or_, bindparam, String
+from app.extensions import db
+from app.models import LegalRegulation, LegalRegulationVersion, LegalStructure, LegalText
+from app.models.regulation import make_path_key, path_key_range
+from app.services.search import format_anchor
+from app.services.version_ranges import resolve_effective_versions
+from process.tools.clause_parser import scan_clauses
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = 'regulation_names'
+
+# 不支持 json_each 时每条语句包含的区间数
+FALLBACK_BATCH_SIZE = 200
+
+# 省略国名前缀的简称，如"统计法"
+NAME_PREFIX = '中华人民共和国'
+
+
+class RegulationNameMap:
+    """法规名称 -> (法规ID, 法规名称, 默认版本ID)，legal_regulation 有变化时重建"""
+
+    def __init__(self):
+        self._signature = None
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def _current_signature(self, session):
+        return tuple(session.execute(select(
+            func.count(LegalRegulation.id), func.max(LegalRegulation.id), func.max(LegalRegulation.updated_at)
+        )).one())
+
+    def _build(self, session):
+        regulations = session.execute(
+            select(LegalRegulation.id, LegalRegulation.name, LegalRegulation.current_version_id)
+        ).all()
+        # 没有设置当前版本的法规取状态为 current 或修订日期最新的版本
+        missing = [regulation_id for regulation_id, _, version_id in regulations if not version_id]
+        fallback = {}
+        for start in range(0, len(missing), 500):
+            for regulation_id, version_id in session.execute(
+                select(LegalRegulationVersion.regulation_id, LegalRegulationVersion.id).
+                where(LegalRegulationVersion.regulation_id.in_(missing[start:start + 500])).
+                order_by(LegalRegulationVersion.regulation_id,
+                         (LegalRegulationVersion.status == 'current').desc(),
+                         LegalRegulationVersion.revision_date.desc(),
+                         LegalRegulationVersion.id.desc())
+            ):
+                fallback.setdefault(regulation_id, version_id)
+
+        names = {}
+        short_names = {}
+        for regulation_id, name, version_id in regulations:
+            entry = (regulation_id, name, version_id or fallback.get(regulation_id))
+            names[name] = entry
+            if name.startswith(NAME_PREFIX):
+                short_names.setdefault(name[len(NAME_PREFIX):], []).append(entry)
+        for short_name, entries in short_names.items():
+            if len(entries) == 1:
+                names.setdefault(short_name, entries[0])
+        return names
+
+    def lookup(self, session):
+        """返回最新的名称表"""
+        signature = self._current_signature(session)
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    self._names = self._build(session)
+                    self._signature = signature
+                    logger.info(f"已重建法规名称表: {len(self._names)} 个名称")
+        return self._names
+
+
+def get_name_map():
+    """当前应用的法规名称表"""
+    return current_app.extensions.setdefault(EXTENSION_KEY, RegulationNameMap())
+
+
+def _anchor_range(article, paragraph, item, section):
+    if section is not None:
+        key = make_path_key(article, paragraph, item, section)
+        return key, key
+    return path_key_range(article, paragraph, item)
+
+
+def _targets_statement():
+    """按 JSON 数组 [[法规ID, 版本ID, 起, 止], ...] 取条文的语句
+
+    引用经 json_each 展开后逐个按 (regulation_id, version_id, path_key) 索引查找，
+    语句形状与引用数量无关，编译结果可被缓存。
+    """
+    structure_table = LegalStructure.__table__
+    text_table = LegalText.__table__
+    target = func.json_each(bindparam('targets', type_=String)).table_valued('value').alias('target')
+
+    def field(index):
+        return func.json_extract(target.c.value, f'$[{index}]')
+
+    return select(
+        structure_table.c.id, structure_table.c.regulation_id, structure_table.c.version_id,
+        structure_table.c.path_key, structure_table.c.article, structure_table.c.paragraph,
+        structure_table.c.item, structure_table.c.section, text_table.c.content
+    ).select_from(target).join(structure_table, and_(
+        structure_table.c.regulation_id == field(0),
+        structure_table.c.version_id == field(1),
+        structure_table.c.path_key.between(field(2), field(3))
+    )).join(text_table, text_table.c.hash == structure_table.c.content_hash)
+
+
+TARGETS_STATEMENT = _targets_statement()
+
+
+def _targets_fallback(targets):
+    """不支持 json_each 的数据库：各区间以 OR 连接，分批查询"""
+    structure_table = LegalStructure.__table__
+    text_table = LegalText.__table__
+    columns = TARGETS_STATEMENT.selected_columns
+    targets = list(targets)
+    for start in range(0, len(targets), FALLBACK_BATCH_SIZE):
+        yield select(*columns).select_from(structure_table.join(
+            text_table, text_table.c.hash == structure_table.c.content_hash
+        )).where(or_(*(and_(
+            structure_table.c.regulation_id == regulation_id,
+            structure_table.c.version_id == version_id,
+            structure_table.c.path_key.between(low, high)
+        ) for regulation_id, version_id, low, high in targets[start:start + FALLBACK_BATCH_SIZE])))
+
+
+def _fetch_structures(session, targets):
+    """一次取回 {(法规ID, 版本ID): [(位置键, 条文行)]}，targets 为 {(法规ID, 版本ID, 起, 止)}"""
+    if session.get_bind().dialect.name == 'sqlite':
+        results = [session.execute(TARGETS_STATEMENT, {'targets': json.dumps(list(targets))})]
+    else:
+        results = [session.execute(statement) for statement in _targets_fallback(targets)]
+    rows_by_version = {}
+    for row in (row for result in results for row in result):
+        rows_by_version.setdefault((row.regulation_id, row.version_id), {})[row.id] = row
+    return {
+        key: sorted(((row.path_key, row) for row in rows.values()), key=lambda pair: (pair[0], pair[1].id))
+        for key, rows in rows_by_version.items()
+    }
+
+
+def _find_default(names, regulation):
+    """未写法规名时使用的法规，可为名称或ID"""
+    if regulation is None:
+        return None
+    if isinstance(regulation, int) or str(regulation).isdigit():
+        return next((entry for entry in names.values() if entry[0] == int(regulation)), None)
+    return names.get(regulation)
+
+
+def resolve_references(items, default_regulation=None, version_ids=None, on_date=None, session=None):
+    """批量解析条款引用
+
+    items 为引用文本列表；default_regulation 为未写法规名时使用的法规名称或ID；
+    版本依次取 version_ids（{法规ID: 版本ID}）、on_date 当日施行的版本、法规的当前版本。
+    返回与 items 等长的列表，每项为 {'reference', 'clauses': [...]}，未识别到引用时带 'error'。
+    """
+    session = session or db.session
+    names = get_name_map().lookup(session)
+    default_entry = _find_default(names, default_regulation)
+    versions = {}
+
+    parsed = []
+    for text in items:
+        clauses = []
+        for law, article, paragraph, item, section in scan_clauses(text):
+            entry = names.get(law) if law else default_entry
+            if entry is None or article is None:
+                error = '缺少条号' if entry is not None else (f'未找到法规: {law}' if law else '未指定法规')
+                clauses.append({'law': law, 'article': article, 'error': error})
+                continue
+            regulation_id, name, version_id = entry
+            versions.setdefault(regulation_id, version_id)
+            clauses.append({
+                'regulation_id': regulation_id, 'regulation': name,
+                'article': article, 'paragraph': paragraph, 'item': item, 'section': section
+            })
+        parsed.append((text, clauses))
+
+    if on_date is not None and versions:
+        regulation_ids = list(versions)
+        for regulation_id, version in zip(regulation_ids, resolve_effective_versions(
+            [(regulation_id, on_date) for regulation_id in regulation_ids], session
+        )):
+            versions[regulation_id] = version.id if version is not None else None
+    versions.update(version_ids or {})
+
+    targets = set()
+    for _, clauses in parsed:
+        for clause in clauses:
+            if 'error' in clause:
+                continue
+            clause['version_id'] = versions[clause['regulation_id']]
+            clause['range'] = _anchor_range(clause['article'], clause['paragraph'], clause['item'], clause['section'])
+            targets.add((clause['regulation_id'], clause['version_id']) + clause['range'])
+
+    rows_by_version = _fetch_structures(session, targets) if targets else {}
+
+    results = []
+    for text, clauses in parsed:
+        result = {'reference': text, 'clauses': clauses}
+        if not clauses:
+            result['error'] = '未识别到条款引用'
+        for clause in clauses:
+            if 'range' not in clause:
+                continue
+            low, high = clause.pop('range')
+            rows = rows_by_version.get((clause['regulation_id'], clause['version_id']), [])
+            begin = bisect.bisect_left(rows, low, key=lambda pair: pair[0])
+            end = bisect.bisect_right(rows, high, key=lambda pair: pair[0])
+            matched = [row for _, row in rows[begin:end]]
+            clause['anchor'] = format_anchor(clause['article'], clause['paragraph'], clause['item'], clause['section'])
+            clause['found'] = bool(matched)
+            clause['text'] = '\n'.join(row.content for row in matched)
+            clause['structures'] = [{
+                'id': row.id, 'article': row.article, 'paragraph': row.paragraph,
+                'item': row.item, 'section': row.section, 'content': row.content
+            } for row in matched]
+        results.append(result)
+    return results
@@ -0,0 +1,210 @@
+# app/services/counters.py
+"""
+数据计数汇总维护
+在会话提交前按受影响的法规重新汇总条文、事由、处罚数量，
+列表页与首页只需读取 legal_counter 表；读取时不重建、不写入，
+计数表由迁移初始化，数据修复用 python import_db.py --rebuild-counters。
+"""
+import logging
+from flask import g, has_app_context
+from sqlalchemy import event, func, select, inspect
+from app.extensions import db
+from app.models import (
+    LegalRegulation, LegalRegulationVersion, LegalStructure,
+    LegalCause, LegalPunishment, LegalCounter
+)
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = 'global'
+REGULATION_SCOPE = 'regulation'
+VERSION_SCOPE = 'version'
+
+COUNT_FIELDS = ('regulation_count', 'structure_count', 'cause_count', 'punishment_count')
+
+# 会话中待刷新计数的法规ID
+_PENDING_KEY = 'counter_regulation_ids'
+# 请求内已读取的法规计数（flask.g）
+_REQUEST_CACHE_KEY = 'regulation_counts'
+
+
+def _history_values(obj, attr):
+    """取属性的当前值与修改前的值"""
+    state = inspect(obj)
+    history = state.attrs[attr].history
+    values = set(history.added or ()) | set(history.deleted or ()) | set(history.unchanged or ())
+    values.add(state.dict.get(attr))
+    return {v for v in values if v is not None}
+
+
+def notify_bulk_change(regulation_ids, session=None):
+    """登记通过批量语句（未经过ORM对象）修改过数据的法规，提交时刷新计数"""
+    session = session or db.session
+    session.info.setdefault(_PENDING_KEY, set()).update(
+        rid for rid in regulation_ids if rid is not None
+    )
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changes(session, flush_context):
+    """记录本次flush中涉及的法规"""
+    regulation_ids = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, LegalRegulation):
+            if obj.id is not None:
+                regulation_ids.add(obj.id)
+        elif isinstance(obj, (LegalStructure, LegalCause, LegalPunishment, LegalRegulationVersion)):
+            regulation_ids |= _history_values(obj, 'regulation_id')
+
+    if regulation_ids:
+        notify_bulk_change(regulation_ids, session)
+
+
+@event.listens_for(db.session, 'before_commit')
+def _refresh_before_commit(session):
+    """提交前刷新受影响法规的计数"""
+    # 先flush，使本次提交中的改动都被记录
+    session.flush()
+    regulation_ids = session.info.pop(_PENDING_KEY, set())
+    if regulation_ids:
+        refresh_regulation_counters(regulation_ids, session)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _grouped_counts(session, query):
+    return {version_id: count for version_id, count in session.execute(query)}
+
+
+def refresh_regulation_counters(regulation_ids, session=None):
+    """重新汇总指定法规及其各版本的计数，并更新全局合计（不提交事务）"""
+    session = session or db.session
+    counter_table = LegalCounter.__table__
+
+    existing_ids = set(session.execute(
+        select(LegalRegulation.id).where(LegalRegulation.id.in_(regulation_ids))
+    ).scalars())
+
+    rows = []
+    for regulation_id in existing_ids:
+        structure_counts = _grouped_counts(session, select(
+            LegalStructure.version_id, func.count(LegalStructure.id)
+        ).where(LegalStructure.regulation_id == regulation_id).group_by(LegalStructure.version_id))
+        cause_counts = _grouped_counts(session, select(
+            LegalCause.version_id, func.count(LegalCause.id)
+        ).where(LegalCause.regulation_id == regulation_id).group_by(LegalCause.version_id))
+        punishment_counts = _grouped_counts(session, select(
+            LegalPunishment.version_id, func.count(LegalPunishment.id)
+        ).where(LegalPunishment.regulation_id == regulation_id).group_by(LegalPunishment.version_id))
+        version_ids = session.execute(
+            select(LegalRegulationVersion.id).where(LegalRegulationVersion.regulation_id == regulation_id)
+        ).scalars().all()
+
+        rows.append({
+            'scope': REGULATION_SCOPE,
+            'scope_id': regulation_id,
+            'regulation_id': regulation_id,
+            'regulation_count': 1,
+            'structure_count': sum(structure_counts.values()),
+            'cause_count': sum(cause_counts.values()),
+            'punishment_count': sum(punishment_counts.values())
+        })
+        for version_id in version_ids:
+            rows.append({
+                'scope': VERSION_SCOPE,
+                'scope_id': version_id,
+                'regulation_id': regulation_id,
+                'regulation_count': 1,
+                'structure_count': structure_counts.get(version_id, 0),
+                'cause_count': cause_counts.get(version_id, 0),
+                'punishment_count': punishment_counts.get(version_id, 0)
+            })
+
+    session.execute(counter_table.delete().where(counter_table.c.regulation_id.in_(regulation_ids)))
+    if rows:
+        session.execute(counter_table.insert(), rows)
+    _refresh_global_counter(session)
+    logger.info(f"已刷新 {len(existing_ids)} 个法规的计数")
+
+
+def _refresh_global_counter(session):
+    """全局合计由各法规计数相加得到"""
+    counter_table = LegalCounter.__table__
+    c = counter_table.c
+    totals = session.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(c.structure_count), 0),
+            func.coalesce(func.sum(c.cause_count), 0),
+            func.coalesce(func.sum(c.punishment_count), 0)
+        ).where(c.scope == REGULATION_SCOPE)
+    ).one()
+    session.execute(counter_table.delete().where(c.scope == GLOBAL_SCOPE))
+    session.execute(counter_table.insert(), [{
+        'scope': GLOBAL_SCOPE,
+        'scope_id': 0,
+        'regulation_id': None,
+        **dict(zip(COUNT_FIELDS, totals))
+    }])
+
+
+def rebuild_all_counters():
+    """重建全部计数，用于初始化或数据修复（python import_db.py --rebuild-counters）"""
+    regulation_ids = db.session.execute(select(LegalRegulation.id)).scalars().all()
+    counter_table = LegalCounter.__table__
+    db.session.execute(counter_table.delete())
+    refresh_regulation_counters(regulation_ids)
+    db.session.commit()
+    return len(regulation_ids)
+
+
+def _counts(counter):
+    if counter is None:
+        return dict.fromkeys(COUNT_FIELDS, 0)
+    return {field: getattr(counter, field) for field in COUNT_FIELDS}
+
+
+def get_global_counts():
+    """全局计数；计数表尚未生成时直接统计，不写入"""
+    counter = db.session.get(LegalCounter, (GLOBAL_SCOPE, 0))
+    if counter is not None:
+        return _counts(counter)
+    logger.warning("计数表为空，请运行 python import_db.py --rebuild-counters")
+    totals = db.session.execute(select(
+        select(func.count(LegalRegulation.id)).scalar_subquery(),
+        select(func.count(LegalStructure.id)).scalar_subquery(),
+        select(func.count(LegalCause.id)).scalar_subquery(),
+        select(func.count(LegalPunishment.id)).scalar_subquery(),
+    )).one()
+    return dict(zip(COUNT_FIELDS, totals))
+
+
+def load_regulation_counts(regulation_ids):
+    """
+    一次查询读取多个法规的计数，返回 {法规ID: 计数}
+    结果在本次请求内缓存，列表页先按本页的法规ID调用一次，模板中的 get_regulation_counts 不再查询
+    """
+    cache = g.setdefault(_REQUEST_CACHE_KEY, {}) if has_app_context() else {}
+    missing = [rid for rid in dict.fromkeys(regulation_ids) if rid not in cache]
+    if missing:
+        counters = db.session.execute(select(LegalCounter).where(
+            LegalCounter.scope == REGULATION_SCOPE, LegalCounter.scope_id.in_(missing)
+        )).scalars()
+        found = {counter.scope_id: _counts(counter) for counter in counters}
+        for regulation_id in missing:
+            cache[regulation_id] = found.get(regulation_id) or _counts(None)
+    return {rid: cache[rid] for rid in regulation_ids}
+
+
+def get_regulation_counts(regulation_id):
+    """法规计数（条文、事由、处罚）"""
+    return load_regulation_counts([regulation_id])[regulation_id]
+
+
+def get_version_counts(version_id):
+    """法规版本计数"""
+    return _counts(db.session.get(LegalCounter, (VERSION_SCOPE, version_id)))
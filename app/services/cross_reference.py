@@ -0,0 +1,154 @@
+# app/services/cross_reference.py
+import logging
+from app.extensions import db
+from app.models import LegalStructure, LegalCause, LegalStructureCauseLink
+from process.tools.clause_parser import scan_clauses
+
+logger = logging.getLogger(__name__)
+
+# 事由字段与条文角色的对应关系
+ROLE_FIELDS = (
+    ('violation', 'violation_type'),   # 违则
+    ('punishment', 'penalty_type'),    # 罚则
+    ('behavior', 'behavior'),          # 行为
+)
+
+
+def extract_article_references(text):
+    """从条款文本中提取条文引用（去重），返回 [{'article', 'paragraph', 'item'}]"""
+    references = []
+    seen = set()
+    for ref in scan_clauses(text):
+        key = (ref.article, ref.paragraph, ref.item)
+        if ref.article is None or key in seen:
+            continue
+        seen.add(key)
+        references.append({'article': ref.article, 'paragraph': ref.paragraph, 'item': ref.item})
+    return references
+
+
+def match_structure(structure, reference):
+    """判断条文是否匹配引用"""
+    # 匹配条
+    if structure.article != reference['article']:
+        return False
+    
+    # 如果引用指定了款，但条文不匹配，则不匹配
+    if reference['paragraph'] is not None and structure.paragraph != reference['paragraph']:
+        return False
+    
+    # 如果引用指定了项，但条文不匹配，则不匹配
+    if reference['item'] is not None and structure.item != reference['item']:
+        return False
+    
+    return True
+
+
+def _version_filter(column, version_id):
+    """版本筛选条件，未指定版本时不限版本"""
+    if version_id:
+        return column == version_id
+    return db.true()
+
+
+def build_links(regulation_id, version_id, structures, causes):
+    """按事由的违则、罚则、行为字段匹配条文，返回待写入的关联行
+
+    structures 需有 id、article、paragraph、item，causes 需有 id 与 ROLE_FIELDS 中的字段；
+    ORM 对象与 Core 查询的结果行均可（数据库迁移中使用后者）。
+    """
+    # 按条号分组，引用只需在同条的条文中匹配
+    structures_by_article = {}
+    for structure in structures:
+        structures_by_article.setdefault(structure.article, []).append(structure)
+    
+    links = []
+    seen = set()
+    for cause in causes:
+        for role, field in ROLE_FIELDS:
+            for reference in extract_article_references(getattr(cause, field)):
+                for structure in structures_by_article.get(reference['article'], ()):
+                    key = (structure.id, cause.id, role)
+                    if key in seen or not match_structure(structure, reference):
+                        continue
+                    seen.add(key)
+                    links.append({
+                        'regulation_id': regulation_id,
+                        'version_id': version_id,
+                        'structure_id': structure.id,
+                        'cause_id': cause.id,
+                        'role': role
+                    })
+    return links
+
+
+def rebuild_cause_links(regulation_id, version_id=None):
+    """重建指定法规版本的条文-事由关联，返回关联数量
+
+    只在会话中写入，由调用方负责提交事务。
+    """
+    structures = LegalStructure.query.filter(
+        LegalStructure.regulation_id == regulation_id,
+        _version_filter(LegalStructure.version_id, version_id)
+    ).all()
+    causes = LegalCause.query.filter(
+        LegalCause.regulation_id == regulation_id,
+        _version_filter(LegalCause.version_id, version_id)
+    ).all()
+    links = build_links(regulation_id, version_id, structures, causes)
+    
+    link_table = LegalStructureCauseLink.__table__
+    db.session.execute(link_table.delete().where(
+        link_table.c.regulation_id == regulation_id,
+        link_table.c.version_id == version_id if version_id else link_table.c.version_id.is_(None)
+    ))
+    if links:
+        db.session.execute(link_table.insert(), links)
+    
+    logger.info(f"已重建法规 {regulation_id} 版本 {version_id} 的条文关联: {len(links)} 条")
+    return len(links)
+
+
+def rebuild_regulation_cause_links(regulation_id):
+    """重建法规所有版本的条文-事由关联，由调用方负责提交事务"""
+    from app.models import LegalRegulationVersion
+    
+    version_ids = [v.id for v in LegalRegulationVersion.query.filter_by(regulation_id=regulation_id)]
+    return sum(rebuild_cause_links(regulation_id, version_id) for version_id in version_ids)
+
+
+def rebuild_all_cause_links():
+    """重建所有法规的条文-事由关联"""
+    from app.models import LegalRegulation
+    
+    total = 0
+    for regulation in LegalRegulation.query.all():
+        total += rebuild_regulation_cause_links(regulation.id)
+        db.session.commit()
+    return total
+
+
+def get_structure_links(regulation_id, version_id=None):
+    """读取法规版本的条文角色与关联事由
+
+    返回 (structure_roles, structure_causes)，分别为
+    {条文ID: [角色]} 与 {条文ID: [事由]}。
+    """
+    query = db.session.query(LegalStructureCauseLink, LegalCause).\
+        join(LegalCause, LegalStructureCauseLink.cause_id == LegalCause.id).\
+        filter(LegalStructureCauseLink.regulation_id == regulation_id)
+    if version_id:
+        query = query.filter(LegalStructureCauseLink.version_id == version_id)
+    else:
+        query = query.filter(LegalStructureCauseLink.version_id.is_(None))
+    
+    structure_roles = {}
+    structure_causes = {}
+    for link, cause in query.order_by(LegalStructureCauseLink.id):
+        roles = structure_roles.setdefault(link.structure_id, [])
+        if link.role not in roles:
+            roles.append(link.role)
+        related = structure_causes.setdefault(link.structure_id, [])
+        if cause not in related:
+            related.append(cause)
+    return structure_roles, structure_causes
@@ -0,0 +1,27 @@
+# app/services/maintenance.py
+"""
+数据库维护：更新查询规划器统计信息
+批量导入或大量修改数据后调用，也可通过 import_db.py --analyze 定期执行。
+"""
+import logging
+from sqlalchemy import text
+from app.extensions import db
+from app.services.write_queue import acquire_write_lock
+
+logger = logging.getLogger(__name__)
+
+
+def analyze_database(session=None):
+    """执行 ANALYZE，使查询规划器按最新的数据分布选择索引"""
+    session = session or db.session
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        acquire_write_lock(session)
+        # analysis_limit 限制每个索引的采样行数，避免大表上耗时过长
+        session.execute(text('PRAGMA analysis_limit=1000'))
+        session.execute(text('ANALYZE'))
+        session.execute(text('PRAGMA optimize'))
+    else:
+        session.execute(text('ANALYZE'))
+    session.commit()
+    logger.info("已更新数据库统计信息")
@@ -0,0 +1,36 @@
+# app/services/query_guard.py
+"""
+请求查询数检查
+配置 MAX_QUERIES_PER_REQUEST 后统计每个请求执行的 SQL 条数，超过上限时请求失败，
+用于测试中发现模板或视图里的逐行懒加载（N+1 查询）。
+python check_page_queries.py 在 TestingConfig 下逐个请求主要页面，超过上限即失败。
+"""
+from flask import g, request, current_app, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryLimitExceeded(RuntimeError):
+    """单个请求执行的查询数超过上限"""
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and current_app.config.get('MAX_QUERIES_PER_REQUEST'):
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def init_query_guard(app):
+    """按配置注册请求结束时的查询数检查"""
+    limit = app.config.get('MAX_QUERIES_PER_REQUEST')
+    if not limit:
+        return
+
+    @app.after_request
+    def check_query_count(response):
+        count = g.get('query_count', 0)
+        if count > limit:
+            raise QueryLimitExceeded(
+                f"{request.method} {request.path} 执行了 {count} 条查询，超过上限 {limit}"
+            )
+        return response
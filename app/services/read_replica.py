@@ -0,0 +1,182 @@
+# app/services/read_replica.py
+"""
+SQLite 内存只读副本
+开启 SQLITE_READ_REPLICA 后，每个 worker 启动时用 SQLite backup API 将主库复制到内存，
+查询（SELECT）走内存副本，flush、INSERT/UPDATE/DELETE 以及已写入过的事务走主库。
+每个请求开始时检查主库的 PRAGMA data_version，主库有新的提交时副本标记为过期，
+本进程提交写入后同样标记过期。过期期间读请求回到主库，后台线程重新复制完成后再切换到新副本。
+
+注意：副本在 create_app 中创建，gunicorn 不要使用 --preload，以免 fork 后共享连接。
+"""
+import os
+import time
+import logging
+import sqlite3
+import threading
+from flask import current_app, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.elements import TextClause
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = 'read_replica'
+
+# 会话中本事务已写入、读取需走主库的标记
+_PRIMARY_KEY = 'replica_use_primary'
+
+DEFAULT_MIN_INTERVAL = 5
+
+
+class ReadReplica:
+    """主库的内存副本及其刷新"""
+
+    def __init__(self, database_path, min_interval=DEFAULT_MIN_INTERVAL):
+        self.database_path = database_path
+        self.min_interval = min_interval
+        self.engine = None
+        self.stale = True
+        self._anchor = None
+        self._generation = 0
+        self._data_version = None
+        self._last_refresh = 0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        # 专用连接：data_version 只反映其他连接提交的改动
+        self._monitor = sqlite3.connect(database_path, check_same_thread=False)
+
+    def _primary_data_version(self):
+        with self._lock:
+            return self._monitor.execute('PRAGMA data_version').fetchone()[0]
+
+    def refresh(self):
+        """复制主库到新的内存库并切换，旧副本上进行中的查询不受影响"""
+        data_version = self._primary_data_version()
+        self._generation += 1
+        uri = f"file:lawcause_replica_{os.getpid()}_{id(self)}_{self._generation}?mode=memory&cache=shared"
+        started = time.monotonic()
+
+        # 共享缓存的内存库在最后一个连接关闭后释放，anchor 保持其存活
+        anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        source = sqlite3.connect(self.database_path)
+        try:
+            source.backup(anchor)
+        finally:
+            source.close()
+
+        def connect():
+            connection = sqlite3.connect(uri, uri=True)
+            connection.execute('PRAGMA query_only=ON')
+            return connection
+
+        engine = create_engine('sqlite://', creator=connect, poolclass=NullPool)
+        old_engine, old_anchor = self.engine, self._anchor
+        self.engine, self._anchor = engine, anchor
+        self._data_version = data_version
+        self._last_refresh = time.monotonic()
+        self.stale = False
+        if old_engine is not None:
+            old_engine.dispose()
+            old_anchor.close()
+        logger.info(f"已刷新内存只读副本，耗时 {self._last_refresh - started:.2f} 秒")
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"刷新内存只读副本时出错: {str(e)}")
+        finally:
+            self._refreshing = False
+
+    def mark_stale(self):
+        """本进程提交了写入，在副本刷新前读取走主库"""
+        self.stale = True
+
+    def check(self):
+        """主库有新的提交时标记过期，并在间隔允许时后台刷新"""
+        if self._primary_data_version() != self._data_version:
+            self.stale = True
+        if not self.stale or self._refreshing:
+            return
+        if time.monotonic() - self._last_refresh < self.min_interval:
+            return
+        self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+
+def get_replica():
+    # 仅 Web 请求读取副本，命令行与后台任务直接使用主库
+    if not has_request_context():
+        return None
+    return current_app.extensions.get(EXTENSION_KEY)
+
+
+def _is_read(clause):
+    if clause is None or getattr(clause, 'is_dml', False):
+        return False
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip().upper().startswith('SELECT')
+    return getattr(clause, 'is_select', False)
+
+
+class RoutingSession(Session):
+    """未写入的事务中的查询走内存副本，其余走主库"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _PRIMARY_KEY not in self.info and _is_read(clause):
+            replica = get_replica()
+            if replica is not None and not replica.stale:
+                return replica.engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _use_primary(session):
+    session.info[_PRIMARY_KEY] = True
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _primary_after_flush(session, flush_context, instances):
+    _use_primary(session)
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _primary_after_write(orm_execute_state):
+    if not _is_read(orm_execute_state.statement):
+        _use_primary(orm_execute_state.session)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _stale_after_commit(session):
+    if _PRIMARY_KEY in session.info:
+        replica = get_replica()
+        if replica is not None:
+            replica.mark_stale()
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _reset_after_transaction(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_PRIMARY_KEY, None)
+
+
+def init_read_replica(app, engine):
+    """按配置为文件型 SQLite 主库创建内存副本"""
+    if not app.config.get('SQLITE_READ_REPLICA'):
+        return None
+    database = engine.url.database
+    if engine.dialect.name != 'sqlite' or not database or database == ':memory:':
+        logger.warning("内存只读副本仅支持文件型 SQLite 数据库，已忽略")
+        return None
+
+    replica = ReadReplica(
+        database, app.config.get('SQLITE_REPLICA_MIN_INTERVAL', DEFAULT_MIN_INTERVAL)
+    )
+    replica.refresh()
+    app.extensions[EXTENSION_KEY] = replica
+
+    @app.before_request
+    def check_read_replica():
+        replica.check()
+
+    return replica
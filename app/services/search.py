@@ -0,0 +1,406 @@
+# app/services/search.py
+"""
+全文检索（SQLite FTS5 + jieba 分词）
+索引条文内容、事由描述/违法行为与处罚明细。文本先经 jieba 切分为以空格分隔的词，
+再写入 FTS5 表 legal_search_fts，rowid 与 legal_search_document.id 对应。
+"""
+import re
+import logging
+import jieba
+from markupsafe import escape
+from sqlalchemy import event, func, select, text, inspect
+from app.extensions import db
+from app.models import (
+    LegalRegulation, LegalRegulationVersion, LegalStructure, LegalCause, LegalPunishment,
+    LegalSearchDocument, LegalText
+)
+from app.services.cross_reference import extract_article_references
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'legal_search_fts'
+CREATE_FTS_SQL = f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(body, tokenize='unicode61')"
+
+DOC_MODELS = {
+    'structure': LegalStructure,
+    'cause': LegalCause,
+    'punishment': LegalPunishment,
+}
+MODEL_DOC_TYPES = {model: doc_type for doc_type, model in DOC_MODELS.items()}
+
+WORD_PATTERN = re.compile(r'\w')
+SNIPPET_WIDTH = 60
+
+# 会话中待同步的文档
+_UPSERT_KEY = 'search_upserts'
+_DELETE_KEY = 'search_deletes'
+_DELETED_REGULATIONS_KEY = 'search_deleted_regulations'
+_REINDEX_KEY = 'search_reindex_regulations'
+_ORPHAN_KEY = 'search_orphan_regulations'
+# 违则（定位来源）改变的事由，其处罚文档需重建
+_ANCHOR_CAUSES_KEY = 'search_anchor_causes'
+
+# 已确认存在FTS表的数据库引擎
+_fts_ready = set()
+
+
+def tokenize(content):
+    """将文本切分为以空格分隔的检索词"""
+    if not content:
+        return ''
+    return ' '.join(word for word in jieba.cut_for_search(content) if WORD_PATTERN.search(word))
+
+
+def query_words(keyword):
+    """切分用户输入的检索词"""
+    return [word for word in jieba.cut(keyword or '') if WORD_PATTERN.search(word)]
+
+
+def build_match_query(words):
+    """将检索词转换为 FTS5 查询表达式（各词之间为 AND 关系）"""
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def make_snippet(content, words, width=SNIPPET_WIDTH):
+    """截取原文中首个命中词附近的片段，并用 <mark> 标出命中词"""
+    content = content or ''
+    positions = [content.find(word) for word in words if word in content]
+    start = max(min(positions) - width // 3, 0) if positions else 0
+    fragment = content[start:start + width]
+    pattern = re.compile('|'.join(re.escape(word) for word in sorted(set(words), key=len, reverse=True)))
+    highlighted = ''
+    last = 0
+    for match in pattern.finditer(fragment):
+        highlighted += f"{escape(fragment[last:match.start()])}<mark>{escape(match.group(0))}</mark>"
+        last = match.end()
+    highlighted += str(escape(fragment[last:]))
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if start + width < len(content) else ''
+    return prefix + highlighted + suffix
+
+
+def search_available(session=None):
+    """当前数据库是否支持全文检索：SQLite 且已有FTS表（由迁移创建），只检查不创建"""
+    session = session or db.session
+    bind = session.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return False
+    engine_key = id(getattr(bind, 'engine', bind))
+    if engine_key not in _fts_ready:
+        row = session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+        ).first()
+        if row is None:
+            return False
+        _fts_ready.add(engine_key)
+    return True
+
+
+def create_search_table(session=None):
+    """创建FTS表（迁移之外按模型建表时使用，如 db.create_all 之后），返回是否支持全文检索"""
+    session = session or db.session
+    if session.get_bind().dialect.name != 'sqlite':
+        return False
+    session.execute(text(CREATE_FTS_SQL))
+    return search_available(session)
+
+
+def clause_anchor(clause_text):
+    """取条款文本中第一个条文引用作为定位"""
+    references = extract_article_references(clause_text)
+    if not references:
+        return {'article': None, 'paragraph': None, 'item': None}
+    # 同一条中取最具体的引用（条/款/项）
+    candidates = [ref for ref in references if ref['article'] == references[0]['article']]
+    reference = max(candidates, key=lambda ref: (ref['paragraph'] is not None, ref['item'] is not None))
+    return {'article': reference['article'], 'paragraph': reference['paragraph'], 'item': reference['item']}
+
+
+def _structure_documents(session, ids):
+    rows = session.execute(select(
+        LegalStructure.id, LegalStructure.regulation_id, LegalStructure.version_id,
+        LegalStructure.article, LegalStructure.paragraph, LegalStructure.item,
+        LegalStructure.section, LegalText.content
+    ).join(LegalText, LegalStructure.content_hash == LegalText.hash).where(LegalStructure.id.in_(ids)))
+    for row in rows:
+        yield {
+            'doc_type': 'structure', 'doc_id': row.id,
+            'regulation_id': row.regulation_id, 'version_id': row.version_id,
+            'article': row.article, 'paragraph': row.paragraph,
+            'item': row.item, 'section': row.section
+        }, row.content
+
+
+def _cause_documents(session, ids):
+    rows = session.execute(select(
+        LegalCause.id, LegalCause.regulation_id, LegalCause.version_id,
+        LegalCause.description, LegalCause.illegal_behavior, LegalCause.violation_type
+    ).where(LegalCause.id.in_(ids)))
+    for row in rows:
+        document = {
+            'doc_type': 'cause', 'doc_id': row.id,
+            'regulation_id': row.regulation_id, 'version_id': row.version_id
+        }
+        document.update(clause_anchor(row.violation_type))
+        yield document, '\n'.join(part for part in (row.description, row.illegal_behavior) if part)
+
+
+def _punishment_documents(session, ids):
+    rows = session.execute(select(
+        LegalPunishment.id, LegalPunishment.regulation_id, LegalPunishment.version_id,
+        LegalPunishment.punishment_details, LegalCause.violation_type
+    ).join(LegalCause, LegalPunishment.cause_id == LegalCause.id).where(LegalPunishment.id.in_(ids)))
+    for row in rows:
+        document = {
+            'doc_type': 'punishment', 'doc_id': row.id,
+            'regulation_id': row.regulation_id, 'version_id': row.version_id
+        }
+        document.update(clause_anchor(row.violation_type))
+        yield document, row.punishment_details
+
+
+DOC_LOADERS = {
+    'structure': _structure_documents,
+    'cause': _cause_documents,
+    'punishment': _punishment_documents,
+}
+
+
+def _delete_documents(session, condition):
+    """删除满足条件的检索文档及其FTS行"""
+    doc_table = LegalSearchDocument.__table__
+    doc_ids = session.execute(select(doc_table.c.id).where(condition)).scalars().all()
+    if not doc_ids:
+        return
+    session.execute(
+        text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"),
+        [{'rowid': doc_id} for doc_id in doc_ids]
+    )
+    session.execute(doc_table.delete().where(doc_table.c.id.in_(doc_ids)))
+
+
+def index_documents(doc_type, ids, session=None):
+    """（重新）索引指定类型的文档，不提交事务"""
+    session = session or db.session
+    ids = list(ids)
+    if not ids or not search_available(session):
+        return 0
+    doc_table = LegalSearchDocument.__table__
+    _delete_documents(session, (doc_table.c.doc_type == doc_type) & doc_table.c.doc_id.in_(ids))
+
+    documents = []
+    bodies = []
+    for document, content in DOC_LOADERS[doc_type](session, ids):
+        body = tokenize(content)
+        if body:
+            documents.append(document)
+            bodies.append(body)
+    if not documents:
+        return 0
+
+    # 预先分配文档ID，使文档表与FTS表都能批量写入
+    next_id = (session.execute(select(func.max(doc_table.c.id))).scalar() or 0) + 1
+    for offset, (document, body) in enumerate(zip(documents, bodies)):
+        document['id'] = next_id + offset
+    session.execute(doc_table.insert(), documents)
+    session.execute(
+        text(f"INSERT INTO {FTS_TABLE}(rowid, body) VALUES (:rowid, :body)"),
+        [{'rowid': document['id'], 'body': body} for document, body in zip(documents, bodies)]
+    )
+    return len(documents)
+
+
+def remove_documents(doc_type, ids, session=None):
+    """从索引中删除指定文档，不提交事务"""
+    session = session or db.session
+    ids = list(ids)
+    if not ids or not search_available(session):
+        return
+    doc_table = LegalSearchDocument.__table__
+    _delete_documents(session, (doc_table.c.doc_type == doc_type) & doc_table.c.doc_id.in_(ids))
+
+
+def reindex_regulation(regulation_id, session=None):
+    """重建单个法规的索引，不提交事务"""
+    session = session or db.session
+    if not search_available(session):
+        return 0
+    doc_table = LegalSearchDocument.__table__
+    _delete_documents(session, doc_table.c.regulation_id == regulation_id)
+
+    structure_ids = session.execute(
+        select(LegalStructure.id).where(LegalStructure.regulation_id == regulation_id)
+    ).scalars().all()
+    cause_ids = session.execute(
+        select(LegalCause.id).where(LegalCause.regulation_id == regulation_id)
+    ).scalars().all()
+    punishment_ids = session.execute(
+        select(LegalPunishment.id).where(LegalPunishment.regulation_id == regulation_id)
+    ).scalars().all()
+
+    return (index_documents('structure', structure_ids, session)
+            + index_documents('cause', cause_ids, session)
+            + index_documents('punishment', punishment_ids, session))
+
+
+def rebuild_search_index():
+    """重建全部法规的索引（FTS表不存在时先创建）"""
+    create_search_table()
+    total = 0
+    regulation_ids = db.session.execute(select(LegalRegulation.id)).scalars().all()
+    for regulation_id in regulation_ids:
+        total += reindex_regulation(regulation_id)
+        db.session.commit()
+    logger.info(f"已重建 {len(regulation_ids)} 个法规的全文索引，共 {total} 个文档")
+    return total
+
+
+def notify_reindex(regulation_ids, session=None):
+    """登记通过批量语句修改过数据的法规，提交时重建其索引"""
+    session = session or db.session
+    session.info.setdefault(_REINDEX_KEY, set()).update(
+        rid for rid in regulation_ids if rid is not None
+    )
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changes(session, flush_context):
+    """记录本次flush中需要同步索引的文档"""
+    upserts = session.info.setdefault(_UPSERT_KEY, set())
+    deletes = session.info.setdefault(_DELETE_KEY, set())
+    deleted_regulations = session.info.setdefault(_DELETED_REGULATIONS_KEY, set())
+    orphan_regulations = session.info.setdefault(_ORPHAN_KEY, set())
+    anchor_causes = session.info.setdefault(_ANCHOR_CAUSES_KEY, set())
+
+    for obj in list(session.new) + list(session.dirty):
+        doc_type = MODEL_DOC_TYPES.get(type(obj))
+        if doc_type and inspect(obj).dict.get('id') is not None:
+            upserts.add((doc_type, obj.id))
+        # 处罚文档的条款定位取自所属事由的违则
+        if isinstance(obj, LegalCause) and obj in session.dirty \
+                and inspect(obj).attrs.violation_type.history.has_changes():
+            anchor_causes.add(obj.id)
+
+    for obj in session.deleted:
+        if isinstance(obj, LegalRegulation):
+            deleted_regulations.add(obj.id)
+            continue
+        # 子记录由数据库级联删除或置空，ORM 不会加载，需另行处理其文档
+        if isinstance(obj, LegalCause) and obj.regulation_id is not None:
+            orphan_regulations.add(obj.regulation_id)
+        elif isinstance(obj, LegalRegulationVersion) and obj.regulation_id is not None:
+            notify_reindex([obj.regulation_id], session)
+        doc_type = MODEL_DOC_TYPES.get(type(obj))
+        if doc_type:
+            deletes.add((doc_type, obj.id))
+            upserts.discard((doc_type, obj.id))
+
+
+@event.listens_for(db.session, 'before_commit')
+def _sync_before_commit(session):
+    """提交前同步全文索引"""
+    session.flush()
+    upserts = session.info.pop(_UPSERT_KEY, set())
+    deletes = session.info.pop(_DELETE_KEY, set())
+    deleted_regulations = session.info.pop(_DELETED_REGULATIONS_KEY, set())
+    reindex_regulations = session.info.pop(_REINDEX_KEY, set())
+    orphan_regulations = session.info.pop(_ORPHAN_KEY, set())
+    anchor_causes = session.info.pop(_ANCHOR_CAUSES_KEY, set())
+    if not (upserts or deletes or deleted_regulations or reindex_regulations or orphan_regulations
+            or anchor_causes):
+        return
+    if not search_available(session):
+        return
+    if anchor_causes:
+        upserts |= {('punishment', punishment_id) for punishment_id in session.execute(
+            select(LegalPunishment.id).where(LegalPunishment.cause_id.in_(anchor_causes))
+        ).scalars()}
+
+    doc_table = LegalSearchDocument.__table__
+    if deleted_regulations:
+        _delete_documents(session, doc_table.c.regulation_id.in_(deleted_regulations))
+    for regulation_id in reindex_regulations - deleted_regulations:
+        reindex_regulation(regulation_id, session)
+    orphan_regulations -= deleted_regulations | reindex_regulations
+    if orphan_regulations:
+        # 事由删除时其处罚已被级联删除
+        _delete_documents(session, db.and_(
+            doc_table.c.doc_type == 'punishment',
+            doc_table.c.regulation_id.in_(orphan_regulations),
+            doc_table.c.doc_id.not_in(select(LegalPunishment.id))
+        ))
+
+    for doc_type in DOC_MODELS:
+        remove_documents(doc_type, [doc_id for t, doc_id in deletes if t == doc_type], session)
+        index_documents(doc_type, [doc_id for t, doc_id in upserts if t == doc_type], session)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_after_rollback(session):
+    for key in (_UPSERT_KEY, _DELETE_KEY, _DELETED_REGULATIONS_KEY, _REINDEX_KEY, _ORPHAN_KEY,
+                _ANCHOR_CAUSES_KEY):
+        session.info.pop(key, None)
+
+
+def format_anchor(article, paragraph=None, item=None, section=None):
+    """条款定位文字，如"第3条第2款第1项" """
+    if not article:
+        return ''
+    anchor = f"第{article}条"
+    for value, unit in ((paragraph, '款'), (item, '项'), (section, '目')):
+        if not value:
+            break
+        anchor += f"第{value}{unit}"
+    return anchor
+
+
+def search(keyword, doc_type=None, regulation_id=None, version_id=None, limit=20, offset=0):
+    """检索并按 bm25 相关度排序，返回 (命中列表, 总数)"""
+    words = query_words(keyword)
+    if not words or not search_available():
+        return [], 0
+
+    conditions = [f"{FTS_TABLE} MATCH :query"]
+    params = {'query': build_match_query(words), 'limit': limit, 'offset': offset}
+    if doc_type:
+        conditions.append("d.doc_type = :doc_type")
+        params['doc_type'] = doc_type
+    if regulation_id:
+        conditions.append("d.regulation_id = :regulation_id")
+        params['regulation_id'] = regulation_id
+    if version_id:
+        conditions.append("d.version_id = :version_id")
+        params['version_id'] = version_id
+    where_clause = ' AND '.join(conditions)
+
+    from_clause = f"""
+        FROM {FTS_TABLE}
+        JOIN legal_search_document d ON d.id = {FTS_TABLE}.rowid
+        JOIN legal_regulation r ON r.id = d.regulation_id
+        WHERE {where_clause}
+    """
+    total = db.session.execute(text(f"SELECT count(*) {from_clause}"), params).scalar()
+    rows = db.session.execute(text(f"""
+        SELECT d.doc_type, d.doc_id, d.regulation_id, d.version_id,
+               d.article, d.paragraph, d.item, d.section, r.name AS regulation_name,
+               bm25({FTS_TABLE}) AS score
+        {from_clause}
+        ORDER BY score
+        LIMIT :limit OFFSET :offset
+    """), params).mappings().all()
+
+    # 片段取自原文（只加载当前页命中的文档）
+    contents = {}
+    for doc_type in DOC_MODELS:
+        ids = [row['doc_id'] for row in rows if row['doc_type'] == doc_type]
+        if ids:
+            for document, content in DOC_LOADERS[doc_type](db.session, ids):
+                contents[(doc_type, document['doc_id'])] = content
+
+    hits = []
+    for row in rows:
+        hit = dict(row)
+        hit['snippet'] = make_snippet(contents.get((row['doc_type'], row['doc_id'])), words)
+        hit['anchor'] = format_anchor(row['article'], row['paragraph'], row['item'], row['section'])
+        hits.append(hit)
+    return hits, total
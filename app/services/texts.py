@@ -0,0 +1,103 @@
+# app/services/texts.py
+"""
+条文文本存储
+条文的内容与原始文本按 SHA-256 哈希存入 legal_text，legal_structure 只保存哈希，
+各版本中相同的条文共用同一行文本，判断条文是否变化只需比较哈希。
+ORM 写入的文本在 flush 前补写；Core 批量插入的记录先经 store_structure_texts 转换。
+文本只增不改，不再被引用的文本由 prune_unused_texts 清理。
+"""
+import logging
+from sqlalchemy import event, select, exists, or_
+from app.extensions import db
+from app.models import LegalStructure, LegalText
+from app.models.regulation import text_hash, pending_texts
+from app.services.bulk_loader import conflict_insert
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+
+# (记录中的文本字段, 哈希列)
+TEXT_FIELDS = (('content', 'content_hash'), ('original_text', 'original_text_hash'))
+
+
+def store_texts(texts, session=None):
+    """写入 {哈希: 文本}，已存在的哈希跳过（不提交事务）"""
+    if not texts:
+        return
+    session = session or db.session
+    text_table = LegalText.__table__
+    statement = conflict_insert(text_table, session)
+    if statement is None:
+        # 不支持 ON CONFLICT 的数据库：先查出已有的哈希
+        keys = list(texts)
+        existing = set()
+        for start in range(0, len(keys), BATCH_SIZE):
+            existing.update(session.execute(select(text_table.c.hash).where(
+                text_table.c.hash.in_(keys[start:start + BATCH_SIZE])
+            )).scalars())
+        statement = text_table.insert()
+        texts = {key: value for key, value in texts.items() if key not in existing}
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=['hash'])
+    rows = [{'hash': key, 'content': value} for key, value in texts.items()]
+    for start in range(0, len(rows), BATCH_SIZE):
+        session.execute(statement, rows[start:start + BATCH_SIZE])
+
+
+def store_structure_texts(records, session=None):
+    """将条文记录中的 content/original_text 换成哈希并写入文本表，返回记录列表"""
+    texts = {}
+    for record in records:
+        for field, hash_column in TEXT_FIELDS:
+            value = record.pop(field, None)
+            key = text_hash(value) if value is not None else None
+            record[hash_column] = key
+            if key is not None:
+                texts[key] = value
+    store_texts(texts, session)
+    return records
+
+
+def prune_unused_texts(hashes=None, session=None):
+    """删除不再被条文引用的文本，hashes 限定检查范围（默认全部），返回删除条数"""
+    session = session or db.session
+    text_table = LegalText.__table__
+    structure_table = LegalStructure.__table__
+    unused = ~exists().where(or_(
+        structure_table.c.content_hash == text_table.c.hash,
+        structure_table.c.original_text_hash == text_table.c.hash
+    ))
+    if hashes is None:
+        return session.execute(text_table.delete().where(unused)).rowcount
+    hashes = list(hashes)
+    deleted = 0
+    for start in range(0, len(hashes), BATCH_SIZE):
+        deleted += session.execute(text_table.delete().where(
+            text_table.c.hash.in_(hashes[start:start + BATCH_SIZE]), unused
+        )).rowcount
+    return deleted
+
+
+def structure_text_hashes(condition, session=None):
+    """符合条件的条文引用的全部文本哈希"""
+    session = session or db.session
+    structure_table = LegalStructure.__table__
+    hashes = set()
+    for content_hash, original_text_hash in session.execute(
+        select(structure_table.c.content_hash, structure_table.c.original_text_hash).where(condition)
+    ):
+        hashes.add(content_hash)
+        if original_text_hash is not None:
+            hashes.add(original_text_hash)
+    return hashes
+
+
+@event.listens_for(db.session, 'before_flush')
+def _store_pending_texts(session, flush_context, instances):
+    """条文插入或更新前写入其引用的文本"""
+    texts = {}
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, LegalStructure):
+            texts.update(pending_texts(obj))
+    store_texts(texts, session)
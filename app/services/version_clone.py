@@ -0,0 +1,99 @@
+# app/services/version_clone.py
+"""
+法规版本内容复制
+以 INSERT ... SELECT 在数据库内复制条文、事由与处罚，事由新旧ID的对应关系写入临时表，
+语句条数与数据量无关。
+"""
+import logging
+from datetime import datetime
+from sqlalchemy import Table, Column, Integer, MetaData, select, insert, func, literal
+from app.extensions import db
+from app.models import LegalStructure, LegalCause, LegalPunishment
+from app.services.bulk_loader import after_bulk_write
+
+logger = logging.getLogger(__name__)
+
+# 事由旧ID -> 新ID
+_cause_id_map = Table(
+    'cause_id_map', MetaData(),
+    Column('old_id', Integer, primary_key=True),
+    Column('new_id', Integer, nullable=False),
+    prefixes=['TEMPORARY']
+)
+
+
+def _copy_rows(session, table, source, overrides):
+    """将 source 查询出的行复制到 table，overrides 为替换的列值，返回插入行数"""
+    # 生成列（如条文位置键）由数据库计算，不能写入
+    columns = [c.name for c in table.c if c.name != 'id' and c.computed is None]
+    values = [overrides[name] if name in overrides else source.c[name] for name in columns]
+    statement = insert(table).from_select(columns, select(*values).order_by(source.c.id))
+    return session.execute(statement).rowcount
+
+
+def clone_version_content(regulation_id, source_version_id, target_version_id, session=None):
+    """复制法规版本的条文、事由及事由下的处罚到目标版本（不提交事务），返回 (条文数, 事由数, 处罚数)"""
+    session = session or db.session
+    now = datetime.now()
+    stamps = {'created_at': literal(now), 'updated_at': literal(now)}
+    structure_table = LegalStructure.__table__
+    cause_table = LegalCause.__table__
+    punishment_table = LegalPunishment.__table__
+
+    source_structures = select(structure_table).where(
+        structure_table.c.regulation_id == regulation_id,
+        structure_table.c.version_id == source_version_id
+    ).subquery()
+    structure_count = _copy_rows(session, structure_table, source_structures, {
+        'version_id': literal(target_version_id), **stamps
+    })
+
+    # 新事由按旧ID顺序插入，按行号与旧事由一一对应
+    max_cause_id = session.execute(select(func.max(cause_table.c.id))).scalar() or 0
+    source_causes = select(cause_table).where(
+        cause_table.c.regulation_id == regulation_id,
+        cause_table.c.version_id == source_version_id
+    ).subquery()
+    cause_count = _copy_rows(session, cause_table, source_causes, {
+        'version_id': literal(target_version_id), **stamps
+    })
+
+    connection = session.connection()
+    _cause_id_map.create(connection, checkfirst=True)
+    try:
+        session.execute(_cause_id_map.delete())
+        old_ids = select(
+            cause_table.c.id.label('old_id'),
+            func.row_number().over(order_by=cause_table.c.id).label('n')
+        ).where(
+            cause_table.c.regulation_id == regulation_id,
+            cause_table.c.version_id == source_version_id
+        ).subquery()
+        new_ids = select(
+            cause_table.c.id.label('new_id'),
+            func.row_number().over(order_by=cause_table.c.id).label('n')
+        ).where(
+            cause_table.c.regulation_id == regulation_id,
+            cause_table.c.version_id == target_version_id,
+            cause_table.c.id > max_cause_id
+        ).subquery()
+        session.execute(insert(_cause_id_map).from_select(
+            ['old_id', 'new_id'],
+            select(old_ids.c.old_id, new_ids.c.new_id).join(new_ids, old_ids.c.n == new_ids.c.n)
+        ))
+
+        source_punishments = select(
+            punishment_table, _cause_id_map.c.new_id
+        ).join(_cause_id_map, punishment_table.c.cause_id == _cause_id_map.c.old_id).subquery()
+        punishment_count = _copy_rows(session, punishment_table, source_punishments, {
+            'cause_id': source_punishments.c.new_id,
+            'version_id': literal(target_version_id),
+            **stamps
+        })
+    finally:
+        _cause_id_map.drop(connection, checkfirst=True)
+
+    after_bulk_write([regulation_id], session)
+    logger.info(f"已复制法规 {regulation_id} 版本 {source_version_id} 到版本 {target_version_id}: "
+                f"{structure_count} 条条文, {cause_count} 个事由, {punishment_count} 条处罚")
+    return structure_count, cause_count, punishment_count
@@ -0,0 +1,188 @@
+# app/services/version_diff.py
+"""
+法规版本比较
+只读取两个版本条文的位置键与文本哈希（不读取文本），按位置与哈希对齐，一次遍历完成分类：
+    unchanged  位置与内容均相同
+    renumbered 内容相同、位置不同（条款号调整）
+    modified   位置相同、内容不同
+    added / removed  新版本新增 / 旧版本删除
+结果以 JSON 缓存在 legal_version_diff，两个版本条文的签名（行数、最大ID、最近更新时间）
+变化后重新计算，Core 批量写入与其他进程的修改同样能使缓存失效。
+写入缓存不提交事务，由调用方决定是否提交。
+"""
+import json
+import logging
+from datetime import datetime
+from sqlalchemy import select, func
+from app.extensions import db
+from app.models import LegalStructure, LegalText, LegalVersionDiff
+from app.services.bulk_loader import conflict_insert
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ('added', 'removed', 'modified', 'renumbered', 'unchanged')
+STATUS_LABELS = {
+    'added': '新增',
+    'removed': '删除',
+    'modified': '修改',
+    'renumbered': '条款号调整',
+    'unchanged': '未变化',
+}
+
+POSITION_FIELDS = ('article', 'paragraph', 'item', 'section')
+
+
+def _version_rows(session, regulation_id, version_id):
+    structure_table = LegalStructure.__table__
+    return session.execute(select(
+        structure_table.c.id, structure_table.c.path_key, structure_table.c.content_hash,
+        *[structure_table.c[field] for field in POSITION_FIELDS]
+    ).where(
+        structure_table.c.regulation_id == regulation_id,
+        structure_table.c.version_id == version_id
+    ).order_by(structure_table.c.path_key, structure_table.c.id)).all()
+
+
+def _version_signature(session, regulation_id, version_id):
+    structure_table = LegalStructure.__table__
+    count, max_id, last_updated = session.execute(select(
+        func.count(structure_table.c.id), func.max(structure_table.c.id), func.max(structure_table.c.updated_at)
+    ).where(
+        structure_table.c.regulation_id == regulation_id,
+        structure_table.c.version_id == version_id
+    )).one()
+    return f"{count}:{max_id}:{last_updated}"
+
+
+def _position(row):
+    position = {'structure_id': row.id, 'content_hash': row.content_hash}
+    position.update({field: getattr(row, field) for field in POSITION_FIELDS})
+    return position
+
+
+def compute_diff(old_rows, new_rows):
+    """对齐两个版本的条文行（需含 id/path_key/content_hash/条款号），返回 (汇总, 变化列表)"""
+    # 同一位置可能有多行（如重复导入），按位置分组，组内按表中顺序依次对齐
+    unmatched_old = {}
+    for row in old_rows:
+        unmatched_old.setdefault(row.path_key, []).append(row)
+    unmatched_new = []
+    summary = dict.fromkeys(STATUSES, 0)
+    changes = []
+
+    # 位置与内容都相同
+    for row in new_rows:
+        same_path = unmatched_old.get(row.path_key, [])
+        old = next((old for old in same_path if old.content_hash == row.content_hash), None)
+        if old is not None:
+            same_path.remove(old)
+            summary['unchanged'] += 1
+        else:
+            unmatched_new.append(row)
+
+    # 剩余旧条文按哈希建立候选，内容相同而位置不同即为条款号调整
+    old_by_hash = {}
+    for rows in unmatched_old.values():
+        for row in rows:
+            old_by_hash.setdefault(row.content_hash, []).append(row)
+    remaining_new = []
+    for row in unmatched_new:
+        candidates = old_by_hash.get(row.content_hash)
+        if candidates:
+            old = candidates.pop(0)
+            unmatched_old[old.path_key].remove(old)
+            summary['renumbered'] += 1
+            changes.append({'status': 'renumbered', 'old': _position(old), 'new': _position(row)})
+        else:
+            remaining_new.append(row)
+
+    # 位置相同、内容不同为修改，其余为新增
+    for row in remaining_new:
+        same_path = unmatched_old.get(row.path_key)
+        if same_path:
+            old = same_path.pop(0)
+            summary['modified'] += 1
+            changes.append({'status': 'modified', 'old': _position(old), 'new': _position(row)})
+        else:
+            summary['added'] += 1
+            changes.append({'status': 'added', 'old': None, 'new': _position(row)})
+
+    for old in (old for rows in unmatched_old.values() for old in rows):
+        summary['removed'] += 1
+        changes.append({'status': 'removed', 'old': _position(old), 'new': None})
+
+    # 按新版本位置排序，删除的条文按旧位置插入
+    changes.sort(key=lambda change: _sort_key(change['new'] or change['old']))
+    return summary, changes
+
+
+def _sort_key(position):
+    return tuple(position[field] or 0 for field in POSITION_FIELDS)
+
+
+def diff_versions(regulation_id, old_version_id, new_version_id, session=None, use_cache=True):
+    """比较法规的两个版本，返回 {'old_version_id', 'new_version_id', 'summary', 'changes'}"""
+    session = session or db.session
+    signature = (f"{_version_signature(session, regulation_id, old_version_id)}|"
+                 f"{_version_signature(session, regulation_id, new_version_id)}")
+    if use_cache:
+        cached = session.get(LegalVersionDiff, (old_version_id, new_version_id))
+        if cached is not None and cached.signature == signature:
+            return json.loads(cached.result)
+
+    summary, changes = compute_diff(
+        _version_rows(session, regulation_id, old_version_id),
+        _version_rows(session, regulation_id, new_version_id)
+    )
+    result = {
+        'old_version_id': old_version_id,
+        'new_version_id': new_version_id,
+        'summary': summary,
+        'changes': changes,
+    }
+    logger.info(f"已比较法规 {regulation_id} 版本 {old_version_id} 与 {new_version_id}: {summary}")
+
+    if use_cache:
+        _store_diff(session, old_version_id, new_version_id, signature, result)
+    return result
+
+
+def _store_diff(session, old_version_id, new_version_id, signature, result):
+    """写入（覆盖）比较结果缓存，不提交事务"""
+    diff_table = LegalVersionDiff.__table__
+    values = {
+        'old_version_id': old_version_id, 'new_version_id': new_version_id, 'signature': signature,
+        'result': json.dumps(result, ensure_ascii=False), 'created_at': datetime.now()
+    }
+    statement = conflict_insert(diff_table, session)
+    if statement is None:
+        session.execute(diff_table.delete().where(
+            diff_table.c.old_version_id == old_version_id,
+            diff_table.c.new_version_id == new_version_id
+        ))
+        session.execute(diff_table.insert().values(**values))
+        return
+    statement = statement.values(**values)
+    session.execute(statement.on_conflict_do_update(
+        index_elements=['old_version_id', 'new_version_id'],
+        set_={'signature': statement.excluded.signature, 'result': statement.excluded.result,
+              'created_at': statement.excluded.created_at}
+    ))
+
+
+def attach_texts(changes, session=None):
+    """为变化列表补充条文文本（按哈希一次查询），返回 changes"""
+    session = session or db.session
+    hashes = {position['content_hash'] for change in changes
+              for position in (change['old'], change['new']) if position}
+    texts = {}
+    hashes = list(hashes)
+    for start in range(0, len(hashes), 500):
+        texts.update(session.execute(
+            select(LegalText.hash, LegalText.content).where(LegalText.hash.in_(hashes[start:start + 500]))
+        ).all())
+    for change in changes:
+        for position in (change['old'], change['new']):
+            if position:
+                position['content'] = texts.get(position['content_hash'])
+    return changes
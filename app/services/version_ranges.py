@@ -0,0 +1,149 @@
+# app/services/version_ranges.py
+"""
+法规版本生效区间
+每个版本的生效区间为 [effective_date, effective_until)，effective_until 取同一法规下一个
+生效日期更晚的版本的生效日期（最新版本为空）。区间在版本变化的会话提交前按法规重新计算，
+与 (regulation_id, effective_date, effective_until) 索引配合，"某日施行的是哪个版本"
+只需一次区间查询；多组 (法规, 日期) 以 JSON 参数传入后与版本表联结，一条语句全部解析
+（SQLite 的 json_each；其他数据库改为分批的 UNION ALL 派生表），解析过程不写数据库。
+"""
+import json
+import logging
+from datetime import datetime, date
+from sqlalchemy import (
+    Integer, DateTime, String, event, select, union_all, literal, bindparam, func, and_, or_, inspect
+)
+from sqlalchemy.orm import aliased
+from app.extensions import db
+from app.models import LegalRegulationVersion
+
+logger = logging.getLogger(__name__)
+
+# 会话中待重算区间的法规ID
+_PENDING_KEY = 'version_range_regulation_ids'
+
+# 不支持 json_each 时每条语句包含的 (法规, 日期) 数
+FALLBACK_BATCH_SIZE = 200
+
+# SQLite 中 DateTime 列的存储格式，JSON 传入的日期按此格式与列值比较
+SQLITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changes(session, flush_context):
+    """记录本次flush中版本有变化的法规"""
+    regulation_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, LegalRegulationVersion):
+            history = inspect(obj).attrs.regulation_id.history
+            regulation_ids.update(rid for rid in history.sum() if rid is not None)
+    if regulation_ids:
+        session.info.setdefault(_PENDING_KEY, set()).update(regulation_ids)
+
+
+@event.listens_for(db.session, 'before_commit')
+def _refresh_before_commit(session):
+    session.flush()
+    regulation_ids = session.info.pop(_PENDING_KEY, set())
+    if regulation_ids:
+        refresh_effective_ranges(regulation_ids, session)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def refresh_effective_ranges(regulation_ids=None, session=None):
+    """重新计算指定法规（默认全部）各版本的 effective_until（不提交事务），返回更新行数"""
+    session = session or db.session
+    version_table = LegalRegulationVersion.__table__
+    later = version_table.alias('later')
+    next_effective = select(func.min(later.c.effective_date)).where(
+        later.c.regulation_id == version_table.c.regulation_id,
+        later.c.effective_date > version_table.c.effective_date
+    ).scalar_subquery()
+    statement = version_table.update().values(effective_until=next_effective)
+    if regulation_ids is not None:
+        statement = statement.where(version_table.c.regulation_id.in_(list(regulation_ids)))
+    count = session.execute(statement).rowcount
+    logger.debug(f"已重算 {count} 个版本的生效区间")
+    return count
+
+
+def _as_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.strptime(value, '%Y-%m-%d')
+
+
+def _ranked_statement(lookup):
+    """lookup 为 (idx, regulation_id, on_date) 的派生表，取每个 idx 当日施行的版本"""
+    version = aliased(LegalRegulationVersion)
+    ranked = select(
+        lookup.c.idx,
+        version.id.label('version_id'),
+        func.row_number().over(
+            partition_by=lookup.c.idx,
+            order_by=(version.effective_date.desc(), version.revision_date.desc(), version.id.desc())
+        ).label('rank')
+    ).join(version, and_(
+        version.regulation_id == lookup.c.regulation_id,
+        version.effective_date <= lookup.c.on_date,
+        or_(version.effective_until.is_(None), version.effective_until > lookup.c.on_date)
+    )).subquery()
+    return select(ranked.c.idx, LegalRegulationVersion).join(
+        LegalRegulationVersion, LegalRegulationVersion.id == ranked.c.version_id
+    ).where(ranked.c.rank == 1)
+
+
+def _pairs_statement():
+    """按 JSON 数组 [[序号, 法规ID, 日期], ...] 解析版本的语句，语句形状与数量无关"""
+    pair = func.json_each(bindparam('pairs', type_=String)).table_valued('value').alias('pair')
+    lookup = select(
+        func.json_extract(pair.c.value, '$[0]').label('idx'),
+        func.json_extract(pair.c.value, '$[1]').label('regulation_id'),
+        func.json_extract(pair.c.value, '$[2]').label('on_date'),
+    ).subquery('lookup')
+    return _ranked_statement(lookup)
+
+
+PAIRS_STATEMENT = _pairs_statement()
+
+
+def _pairs_fallback(pairs):
+    """不支持 json_each 的数据库：(法规, 日期) 以 UNION ALL 组成派生表，分批查询"""
+    for start in range(0, len(pairs), FALLBACK_BATCH_SIZE):
+        lookup = union_all(*(select(
+            literal(idx, Integer).label('idx'),
+            literal(regulation_id, Integer).label('regulation_id'),
+            literal(on_date, DateTime).label('on_date'),
+        ) for idx, (regulation_id, on_date) in enumerate(pairs[start:start + FALLBACK_BATCH_SIZE], start))
+        ).subquery('lookup')
+        yield _ranked_statement(lookup)
+
+
+def resolve_effective_versions(pairs, session=None):
+    """解析多组 (法规ID, 日期) 当日施行的版本，返回与 pairs 等长的版本列表（无则为 None）
+
+    日期可为 date、datetime 或 'YYYY-MM-DD' 字符串。生效日期相同的版本取修订日期最新者。
+    """
+    session = session or db.session
+    pairs = [(regulation_id, _as_datetime(on_date)) for regulation_id, on_date in pairs]
+    if not pairs:
+        return []
+
+    if session.get_bind().dialect.name == 'sqlite':
+        results = [session.execute(PAIRS_STATEMENT, {'pairs': json.dumps([
+            [idx, regulation_id, on_date.strftime(SQLITE_DATETIME_FORMAT)]
+            for idx, (regulation_id, on_date) in enumerate(pairs)
+        ])})]
+    else:
+        results = [session.execute(statement) for statement in _pairs_fallback(pairs)]
+
+    versions = [None] * len(pairs)
+    for idx, resolved in (row for result in results for row in result):
+        versions[idx] = resolved
+    return versions
@@ -0,0 +1,135 @@
+# app/services/write_queue.py
+"""
+SQLite 单写入者队列
+SQLite 同一时刻只允许一个写事务。会话第一次写入（flush 或 INSERT/UPDATE/DELETE 语句）时
+获取写锁，事务结束（提交或回滚）时释放，Web 编辑、/process 导入与导入脚本的写事务依次排队执行。
+进程内以线程锁排队，多个进程（gunicorn 多 worker、命令行导入）之间以数据库文件旁的文件锁排队；
+配合 WAL 模式，读请求不会被写事务阻塞。
+"""
+import os
+import time
+import logging
+import threading
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from app.extensions import db
+
+try:
+    import fcntl
+except ImportError:  # Windows 下仅在进程内排队
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 会话中已持有写锁的标记
+_HELD_KEY = 'write_lock_held'
+
+DEFAULT_TIMEOUT = 300
+POLL_INTERVAL = 0.05
+
+
+class WriteLockTimeout(RuntimeError):
+    """等待写锁超时"""
+
+
+class _WriteLock:
+    """线程锁 + 文件锁，同一线程可重入"""
+
+    def __init__(self):
+        self._thread_lock = threading.RLock()
+        self._local = threading.local()
+        self._files = {}
+
+    def acquire(self, lock_path, timeout):
+        deadline = time.monotonic() + timeout
+        if not self._thread_lock.acquire(timeout=timeout):
+            raise WriteLockTimeout(f"等待数据库写锁超时（{timeout} 秒）")
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0 and lock_path and fcntl is not None:
+            try:
+                self._lock_file(lock_path, deadline, timeout)
+            except Exception:
+                self._thread_lock.release()
+                raise
+        self._local.depth = depth + 1
+
+    def release(self, lock_path):
+        self._local.depth -= 1
+        if self._local.depth == 0 and lock_path and fcntl is not None:
+            fcntl.flock(self._files[lock_path], fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    def _lock_file(self, lock_path, deadline, timeout):
+        handle = self._files.get(lock_path)
+        if handle is None:
+            handle = self._files[lock_path] = open(lock_path, 'a')
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise WriteLockTimeout(f"等待数据库写锁超时（{timeout} 秒）")
+                time.sleep(POLL_INTERVAL)
+
+
+_write_lock = _WriteLock()
+
+
+def _settings():
+    if has_app_context():
+        config = current_app.config
+        return config.get('SQLITE_SERIALIZE_WRITES', True), config.get('SQLITE_WRITE_LOCK_TIMEOUT', DEFAULT_TIMEOUT)
+    return True, DEFAULT_TIMEOUT
+
+
+def _lock_path(bind):
+    """文件型 SQLite 数据库返回锁文件路径，内存库返回 None"""
+    database = bind.url.database
+    if not database or database == ':memory:' or database.startswith('file:'):
+        return None
+    return f"{os.path.abspath(database)}.write.lock"
+
+
+def _acquire_for_session(session):
+    if _HELD_KEY in session.info:
+        return
+    bind = session.get_bind()
+    enabled, timeout = _settings()
+    if bind.dialect.name != 'sqlite' or not enabled:
+        return
+    lock_path = _lock_path(bind)
+    started = time.monotonic()
+    _write_lock.acquire(lock_path, timeout)
+    waited = time.monotonic() - started
+    if waited > 1:
+        logger.info(f"等待数据库写锁 {waited:.1f} 秒")
+    session.info[_HELD_KEY] = lock_path
+
+
+def _release_for_session(session):
+    if _HELD_KEY in session.info:
+        _write_lock.release(session.info.pop(_HELD_KEY))
+
+
+@event.listens_for(db.session, 'before_flush')
+def _lock_before_flush(session, flush_context, instances):
+    _acquire_for_session(session)
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _lock_before_write_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _acquire_for_session(orm_execute_state.session)
+
+
+@event.listens_for(db.session, 'after_transaction_end')
+def _unlock_after_transaction(session, transaction):
+    # 仅在最外层事务结束（提交、回滚或关闭会话）时释放
+    if transaction.parent is None:
+        _release_for_session(session)
+
+
+def acquire_write_lock(session=None):
+    """显式获取写锁，用于 ANALYZE 等不经过 flush 或 DML 语句的写操作；锁在事务结束时释放"""
+    _acquire_for_session(session or db.session)
@@ -1,14 +1,20 @@
 # app/views/admin.py
 from flask import Blueprint, redirect, url_for, request, abort, render_template
 from flask_admin.contrib.sqla import ModelView
+from flask_admin import tools
 from flask_admin import Admin, BaseView, expose  # 添加 BaseView 和 expose
 from flask_login import current_user, login_required
 from app.extensions import db, admin
 from app.models.user import User
 from app.models.regulation import LegalRegulation, LegalStructure, LegalCause, LegalPunishment, LegalRegulationVersion
+from app.services.cross_reference import rebuild_cause_links
+from app.services.counters import get_global_counts
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload
 from functools import wraps
 from datetime import datetime
-from wtforms import PasswordField
+from wtforms import PasswordField, TextAreaField
+from wtforms.validators import InputRequired
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -40,11 +46,62 @@ class SecureModelView(ModelView):
         if hasattr(model, 'updated_at'):
             model.updated_at = datetime.now()
         return super(SecureModelView, self).on_model_change(form, model, is_created)
+    
+    # 编辑页表单读取的关联（模型关联默认不允许懒加载）
+    form_load_related = ()
+    
+    def get_one(self, id):
+        return self.session.query(self.model).options(
+            *[joinedload(attr) for attr in self.form_load_related]
+        ).get(tools.iterdecode(id))
+
+# 版本下拉框显示“法规 - 版本号”，需同时加载法规
+def version_query_factory():
+    return LegalRegulationVersion.query.options(joinedload(LegalRegulationVersion.regulation))
+
+# 条文或事由变更后重建条文关联
+class CauseLinkMixin:
+    # 会话中记录的修改前 (法规ID, 版本ID)，按模型对象区分
+    _previous_scope_key = 'cause_link_previous_scope'
+
+    def on_model_change(self, form, model, is_created):
+        # 改到其他法规或版本时，原版本的关联也需重建；此时尚未 flush，属性历史中仍是原值
+        if not is_created:
+            state = inspect(model)
+            previous = tuple(
+                (state.attrs[name].history.non_added() or [None])[0] for name in ('regulation_id', 'version_id')
+            )
+            self.session.info.setdefault(self._previous_scope_key, {})[model] = previous
+        return super().on_model_change(form, model, is_created)
+
+    def after_model_change(self, form, model, is_created):
+        scopes = [(model.regulation_id, model.version_id)]
+        previous = self.session.info.get(self._previous_scope_key, {}).pop(model, None)
+        if previous is not None and previous[0] is not None and previous not in scopes:
+            scopes.append(previous)
+        for regulation_id, version_id in scopes:
+            rebuild_cause_links(regulation_id, version_id)
+        self.session.commit()
+        return super().after_model_change(form, model, is_created)
+
+    def after_model_delete(self, model):
+        rebuild_cause_links(model.regulation_id, model.version_id)
+        self.session.commit()
+        return super().after_model_delete(model)
 
 # 条文管理视图
-class LegalStructureView(SecureModelView):
+class LegalStructureView(CauseLinkMixin, SecureModelView):
     column_list = ['regulation.name', 'article', 'paragraph', 'item', 'section', 'content']
-    column_searchable_list = ['content']
+    column_select_related_list = [LegalStructure.regulation]
+    form_load_related = [LegalStructure.regulation, LegalStructure.version]
+    # 条文关联由事由条款解析生成，不在表单中编辑；文本按哈希存储，以文本框编辑
+    form_excluded_columns = ['cause_links', 'content_text', 'original_text_text']
+    form_extra_fields = {
+        'content': TextAreaField('内容', validators=[InputRequired()]),
+        'original_text': TextAreaField('原文')
+    }
+    form_args = {'version': {'query_factory': version_query_factory}}
+    column_searchable_list = ['content_text.content']
     column_filters = ['regulation.name', 'article']
     column_labels = {
         'regulation.name': '所属法规',
@@ -123,6 +180,9 @@ class LegalRegulationView(SecureModelView):
 #法规版本管理视图
 class LegalRegulationVersionView(SecureModelView):
     column_list = ['regulation.name', 'version_number', 'revision_date', 'status']
+    column_select_related_list = [LegalRegulationVersion.regulation]
+    form_load_related = [LegalRegulationVersion.regulation]
+    form_excluded_columns = ['structures', 'causes']
     column_searchable_list = ['regulation.name', 'version_number']
     column_filters = ['status', 'revision_date']
     form_ajax_refs = {
@@ -143,14 +203,17 @@ class LegalRegulationVersionView(SecureModelView):
     }
 
 # 事由管理视图
-class LegalCauseView(SecureModelView):
+class LegalCauseView(CauseLinkMixin, SecureModelView):
      # 添加删除确认消息
     delete_message = '删除此事由将同时删除其包含的所有处罚信息。您确定要继续吗？'
 
     column_list = ['regulation.name', 'code', 'description', 'violation_type', 'severity']
+    column_select_related_list = [LegalCause.regulation]
+    form_load_related = [LegalCause.regulation, LegalCause.version]
     column_searchable_list = ['code', 'description', 'violation_type']
     column_filters = ['regulation.name', 'severity', 'penalty_type']  # 添加了penalty_type字段
-    form_excluded_columns = ['punishments']
+    form_excluded_columns = ['punishments', 'structure_links']
+    form_args = {'version': {'query_factory': version_query_factory}}
     column_labels = {
         'regulation.name': '所属法规',
         'regulation': '所属法规',
@@ -174,6 +237,9 @@ class LegalCauseView(SecureModelView):
 # 处罚管理视图
 class LegalPunishmentView(SecureModelView):
     column_list = ['cause.description', 'punishment_type', 'circumstance', 'punishment_target']
+    column_select_related_list = [LegalPunishment.cause]
+    form_load_related = [LegalPunishment.cause, LegalPunishment.version]
+    form_args = {'version': {'query_factory': version_query_factory}}
     column_searchable_list = ['punishment_type', 'punishment_details']
     column_filters = ['cause.regulation.name', 'punishment_type', 'industry']
     column_labels = {
@@ -221,20 +287,17 @@ class UserView(SecureModelView):
 class DataStatsView(BaseView):
     @expose('/')
     def index(self):
-        regulation_count = LegalRegulation.query.count()
-        structure_count = LegalStructure.query.count()
-        cause_count = LegalCause.query.count()
-        punishment_count = LegalPunishment.query.count()
+        counts = get_global_counts()
+        regulation_count = counts['regulation_count']
+        structure_count = counts['structure_count']
+        cause_count = counts['cause_count']
+        punishment_count = counts['punishment_count']
         
         # 每个法规的平均事由数
-        avg_causes_per_regulation = db.session.query(
-            func.avg(func.count(LegalCause.id))
-        ).group_by(LegalCause.regulation_id).scalar() or 0
+        avg_causes_per_regulation = cause_count / regulation_count if regulation_count else 0
         
         # 每个事由的平均处罚数
-        avg_punishments_per_cause = db.session.query(
-            func.avg(func.count(LegalPunishment.id))
-        ).group_by(LegalPunishment.cause_id).scalar() or 0
+        avg_punishments_per_cause = punishment_count / cause_count if cause_count else 0
         
         return self.render('admin/stats.html',
                           regulation_count=regulation_count,
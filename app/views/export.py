@@ -3,7 +3,7 @@ from flask import Blueprint, render_template, redirect, url_for, flash, send_fil
 from flask_login import login_required
 from app.models import LegalRegulation, LegalCause, LegalPunishment, LegalRegulationVersion
 from app.extensions import db
-from sqlalchemy import or_
+from sqlalchemy import true
 from datetime import datetime
 import pandas as pd
 import tempfile
@@ -58,11 +58,9 @@ def export_regulation_page(regulation_id):
             version_id=current_version_id
         ).count()
         
-        punishments_count = LegalPunishment.query.join(
-            LegalCause, LegalPunishment.cause_id == LegalCause.id
-        ).filter(
-            LegalCause.regulation_id == regulation.id,
-            LegalCause.version_id == current_version_id
+        punishments_count = LegalPunishment.query.filter_by(
+            regulation_id=regulation.id,
+            version_id=current_version_id
         ).count()
         print("准备渲染export_regulation.html模板")
         return render_template('export_regulation.html', 
@@ -79,6 +77,17 @@ def export_regulation_page(regulation_id):
         # 临时直接返回错误信息而不是重定向
         return f"导出页面错误：{str(e)}"
 
+def punishment_query(regulation, version):
+    """法规（指定版本）的处罚及其事由，按处罚表上的法规与版本过滤"""
+    query = db.session.query(
+        LegalPunishment, LegalCause
+    ).join(
+        LegalCause, LegalPunishment.cause_id == LegalCause.id
+    ).filter(LegalPunishment.regulation_id == regulation.id)
+    if version:
+        query = query.filter(LegalPunishment.version_id == version.id)
+    return query
+
 # 修复后的export_as_excel函数
 def export_as_excel(regulation, version, version_condition, export_content, 
                    cause_fields, punishment_fields, filename_base):
@@ -168,14 +177,7 @@ def export_as_excel(regulation, version, version_condition, export_content,
             BATCH_SIZE = 500
             punishments_data = []
             
-            query = db.session.query(
-                LegalPunishment, LegalCause
-            ).join(
-                LegalCause, LegalPunishment.cause_id == LegalCause.id
-            ).filter(
-                LegalCause.regulation_id == regulation.id,
-                version_condition
-            )
+            query = punishment_query(regulation, version)
             
             # 获取总数
             total_count = query.count()
@@ -321,14 +323,7 @@ def export_as_csv(regulation, version, version_condition, export_content,
                 
                 # 分批查询处罚数据
                 BATCH_SIZE = 500
-                query = db.session.query(
-                    LegalPunishment, LegalCause
-                ).join(
-                    LegalCause, LegalPunishment.cause_id == LegalCause.id
-                ).filter(
-                    LegalCause.regulation_id == regulation.id,
-                    version_condition
-                )
+                query = punishment_query(regulation, version)
                 
                 # 获取总数
                 total_count = query.count()
@@ -440,14 +435,7 @@ def export_as_csv(regulation, version, version_condition, export_content,
         
         # 分批查询处罚数据
         BATCH_SIZE = 500
-        query = db.session.query(
-            LegalPunishment, LegalCause
-        ).join(
-            LegalCause, LegalPunishment.cause_id == LegalCause.id
-        ).filter(
-            LegalCause.regulation_id == regulation.id,
-            version_condition
-        )
+        query = punishment_query(regulation, version)
         
         # 获取总数
         total_count = query.count()
@@ -524,7 +512,7 @@ def export_regulation_data():
         version_condition = LegalCause.version_id == version.id
     else:
         # 如果没有版本信息，则导出所有数据
-        version_condition = or_(LegalCause.version_id.is_(None), LegalCause.version_id != None)
+        version_condition = true()
     
     # 准备文件名
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
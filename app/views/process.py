@@ -2,7 +2,9 @@
 from flask import Blueprint, jsonify, request, current_app, render_template
 from flask_login import login_required, current_user
 from app.models import LegalRegulation, LegalStructure, LegalCause, LegalPunishment,LegalRegulationVersion
+from app.models.regulation import make_path_key
 from app.extensions import db
+from app.services.cross_reference import rebuild_regulation_cause_links
 import os
 import tempfile
 import pandas as pd
@@ -188,14 +190,9 @@ def export_regulation_to_excel(regulation, output_path, version_id=None):
         # 构建查询以支持版本
         structures_query = LegalStructure.query.filter_by(regulation_id=regulation.id)
         if version_id:
-            structures_query = structures_query.filter(
-                db.or_(
-                    LegalStructure.version_id == version_id,
-                    LegalStructure.version_id.is_(None)  # 兼容旧数据
-                )
-            )
-        # 获取法规条文
-        structures = structures_query.all()
+            structures_query = structures_query.filter(LegalStructure.version_id == version_id)
+        # 获取法规条文（按条款顺序）
+        structures = structures_query.order_by(LegalStructure.path_key).all()
 
         # 准备DataFrame数据
         data = []
@@ -248,25 +245,20 @@ def export_regulation_to_excel(regulation, output_path, version_id=None):
         writer.close()
         return len(structures)
 
-def import_processed_data(regulation, input_path):
-    """从处理后的Excel导入数据回数据库"""
+def import_processed_data(regulation, input_path, version_id=None):
+    """从处理后的Excel导入数据回数据库（未指定版本时导入到当前版本）"""
     with current_app.app_context():
+        version_id = version_id or regulation.current_version_id
         # 读取处理后的数据
         df = pd.read_excel(input_path)
         
-        # 获取现有条文
-        existing_structures = LegalStructure.query.filter_by(regulation_id=regulation.id).all()
+        # 获取该版本的现有条文
+        existing_structures = LegalStructure.query.filter_by(
+            regulation_id=regulation.id, version_id=version_id
+        ).all()
         
-        # 创建映射以快速查找
-        structure_map = {}
-        for structure in existing_structures:
-            key = (
-                structure.article if structure.article is not None else 0,
-                structure.paragraph if structure.paragraph is not None else 0,
-                structure.item if structure.item is not None else 0,
-                structure.section if structure.section is not None else 0
-            )
-            structure_map[key] = structure
+        # 按位置键建立映射以快速查找
+        structure_map = {structure.path_key: structure for structure in existing_structures}
         
         # 更新条文内容
         for _, row in df.iterrows():
@@ -276,12 +268,7 @@ def import_processed_data(regulation, input_path):
             section = int(row['目']) if pd.notna(row['目']) else None
             content = row['内容'] if pd.notna(row['内容']) else ""
             
-            key = (
-                article if article is not None else 0,
-                paragraph if paragraph is not None else 0,
-                item if item is not None else 0,
-                section if section is not None else 0
-            )
+            key = make_path_key(article, paragraph, item, section)
             
             if key in structure_map:
                 # 更新现有条文
@@ -291,6 +278,7 @@ def import_processed_data(regulation, input_path):
                 # 创建新条文
                 new_structure = LegalStructure(
                     regulation_id=regulation.id,
+                    version_id=version_id,
                     article=article,
                     paragraph=paragraph,
                     item=item,
@@ -298,6 +286,10 @@ def import_processed_data(regulation, input_path):
                     content=content
                 )
                 db.session.add(new_structure)
+        
+        # 重建条文与事由的关联
+        db.session.flush()
+        rebuild_regulation_cause_links(regulation.id)
     
     # 提交更改
     db.session.commit()
\ No newline at end of file
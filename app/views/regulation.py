@@ -1,9 +1,20 @@
 # app/views/regulation.py
-from flask import Blueprint, render_template, redirect, url_for, request, flash, abort
+from flask import Blueprint, render_template, redirect, url_for, request, flash, abort, jsonify
 from flask_login import login_required, current_user
 from app.models import LegalRegulation, LegalStructure, LegalCause, LegalPunishment, LegalRegulationVersion
 from app.extensions import db
+from app.services.cross_reference import (
+    extract_article_references, match_structure, get_structure_links, rebuild_cause_links
+)
+from app.services.counters import get_global_counts, load_regulation_counts
+from app.services.search import search as fulltext_search, DOC_MODELS
+from app.services.version_clone import clone_version_content
+from app.services.version_diff import diff_versions, attach_texts
+from app.services.version_ranges import resolve_effective_versions
+from app.services.clause_lookup import resolve_references
 from sqlalchemy import or_
+from sqlalchemy.orm import selectinload, joinedload
+from collections import Counter
 from datetime import datetime
 import logging
 
@@ -23,11 +34,12 @@ logger = logging.getLogger(__name__)
 @regulation_bp.route('/')
 def index():
     """首页"""
-    # 统计数据
+    # 统计数据（读取计数汇总表）
+    counts = get_global_counts()
     stats = {
-        'regulation_count': LegalRegulation.query.count(),
-        'cause_count': LegalCause.query.count(),
-        'punishment_count': LegalPunishment.query.count()
+        'regulation_count': counts['regulation_count'],
+        'cause_count': counts['cause_count'],
+        'punishment_count': counts['punishment_count']
     }
     return render_template('index.html', **stats)
 
@@ -48,17 +60,51 @@ def search_regulations():
     
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     regulations = pagination.items
+    load_regulation_counts([regulation.id for regulation in regulations])
 
     return render_template('regulations/list.html', 
                            regulations=regulations, 
                            pagination=pagination, 
                            keyword=keyword)
+
+# 全文检索（条文、事由、处罚）
+@regulation_bp.route('/search/fulltext')
+def search_fulltext():
+    keyword = request.args.get('q', '').strip()
+    doc_type = request.args.get('type')
+    regulation_id = request.args.get('regulation_id', type=int)
+    version_id = request.args.get('version_id', type=int)
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 20, type=int), 100)
+    
+    if not keyword:
+        return jsonify(success=False, message='请输入检索关键词'), 400
+    if doc_type and doc_type not in DOC_MODELS:
+        return jsonify(success=False, message=f'不支持的检索类型: {doc_type}'), 400
+    
+    hits, total = fulltext_search(keyword, doc_type=doc_type, regulation_id=regulation_id,
+                                  version_id=version_id, limit=per_page, offset=(page - 1) * per_page)
+    for hit in hits:
+        if hit['doc_type'] == 'structure':
+            hit['url'] = url_for('regulation.regulation_detail', regulation_id=hit['regulation_id'],
+                                 version_id=hit['version_id']) + f"#articleModal-{hit['doc_id']}"
+        elif hit['doc_type'] == 'cause':
+            hit['url'] = url_for('regulation.cause_detail', cause_id=hit['doc_id'])
+        else:
+            hit['url'] = url_for('regulation.regulation_detail', regulation_id=hit['regulation_id'],
+                                 version_id=hit['version_id'])
+    
+    return jsonify(success=True, keyword=keyword, total=total, page=page, per_page=per_page, results=hits)
+
 #法规详情
 @regulation_bp.route('/regulations/<int:regulation_id>')
 def regulation_detail(regulation_id):
     logger.info(f"开始处理法规详情请求: regulation_id={regulation_id}")
     
-    regulation = LegalRegulation.query.get_or_404(regulation_id)
+    # 模板中遍历 regulation.versions 与 cause.punishments，需预先加载
+    regulation = LegalRegulation.query.options(
+        selectinload(LegalRegulation.versions)
+    ).get_or_404(regulation_id)
     logger.info(f"已获取法规信息: {regulation.name}")
     
     # 获取版本参数，如果未指定则默认使用当前版本
@@ -90,26 +136,18 @@ def regulation_detail(regulation_id):
     
     # 如果版本ID存在，则进一步筛选版本相关的条文
     if version and version.id:
-        structures_query = structures_query.filter(
-            db.or_(
-                LegalStructure.version_id == version.id,
-                LegalStructure.version_id.is_(None)  # 兼容尚未关联版本的旧数据
-            )
-        )
+        structures_query = structures_query.filter(LegalStructure.version_id == version.id)
     
-    structures = structures_query.all()
+    structures = structures_query.order_by(LegalStructure.path_key).all()
     logger.info(f"已查询到条文数量: {len(structures)}")
     
     # 类似地查询事由
-    causes_query = LegalCause.query.filter_by(regulation_id=regulation.id)
+    causes_query = LegalCause.query.options(
+        selectinload(LegalCause.punishments)
+    ).filter_by(regulation_id=regulation.id)
     
     if version and version.id:
-        causes_query = causes_query.filter(
-            db.or_(
-                LegalCause.version_id == version.id,
-                LegalCause.version_id.is_(None)  # 兼容尚未关联版本的旧数据
-            )
-        )
+        causes_query = causes_query.filter(LegalCause.version_id == version.id)
     
     causes = causes_query.all()
     logger.info(f"已查询到事由数量: {len(causes)}")
@@ -120,99 +158,9 @@ def regulation_detail(regulation_id):
     ).order_by(LegalRegulationVersion.revision_date.desc()).all()
     logger.info(f"已查询到版本数量: {len(versions)}")
     
-    # 新增代码：确定每个条文的角色
-    structure_roles = {}
-    structure_causes = {}
-    
-    logger.info("开始分析条文角色和关联关系...")
-    
-    # 遍历所有事由，确定条文角色并建立条文与事由的关联
-    for cause in causes:
-        logger.debug(f"处理事由: id={cause.id}, code={cause.code}")
-        
-        # 解析违则条款，查找对应的条文
-        if cause.violation_type:
-            logger.debug(f"事由 {cause.code} 的违则条款: {cause.violation_type}")
-            article_refs = extract_article_references(cause.violation_type)
-            logger.debug(f"从违则条款中提取的条文引用: {article_refs}")
-            
-            for article_ref in article_refs:
-                # 查找对应的条文
-                for structure in structures:
-                    if match_structure(structure, article_ref):
-                        logger.debug(f"找到匹配的违则条文: structure_id={structure.id}, article={structure.article}")
-                        # 标记为违则条文
-                        if structure.id not in structure_roles:
-                            structure_roles[structure.id] = []
-                        if 'violation' not in structure_roles[structure.id]:
-                            structure_roles[structure.id].append('violation')
-                        
-                        # 关联事由到条文
-                        if structure.id not in structure_causes:
-                            structure_causes[structure.id] = []
-                        if cause not in structure_causes[structure.id]:
-                            structure_causes[structure.id].append(cause)
-        
-        # 解析罚则条款，查找对应的条文
-        if cause.penalty_type:
-            logger.debug(f"事由 {cause.code} 的罚则条款: {cause.penalty_type}")
-            article_refs = extract_article_references(cause.penalty_type)
-            logger.debug(f"从罚则条款中提取的条文引用: {article_refs}")
-            
-            for article_ref in article_refs:
-                # 查找对应的条文
-                for structure in structures:
-                    if match_structure(structure, article_ref):
-                        logger.debug(f"找到匹配的罚则条文: structure_id={structure.id}, article={structure.article}")
-                        # 标记为罚则条文
-                        if structure.id not in structure_roles:
-                            structure_roles[structure.id] = []
-                        if 'punishment' not in structure_roles[structure.id]:
-                            structure_roles[structure.id].append('punishment')
-                        
-                        # 关联事由到条文
-                        if structure.id not in structure_causes:
-                            structure_causes[structure.id] = []
-                        if cause not in structure_causes[structure.id]:
-                            structure_causes[structure.id].append(cause)
-
-        # 解析行为条款，查找对应的条文
-        if cause.behavior:
-            logger.debug(f"事由 {cause.code} 的行为条款: {cause.behavior}")
-            article_refs = extract_article_references(cause.behavior)
-            logger.debug(f"从行这条款中提取的条文引用: {article_refs}")
-            
-            for article_ref in article_refs:
-                # 查找对应的条文
-                for structure in structures:
-                    if match_structure(structure, article_ref):
-                        logger.debug(f"找到匹配的行为条文: structure_id={structure.id}, article={structure.article}")
-                        # 标记为行为条文
-                        if structure.id not in structure_roles:
-                            structure_roles[structure.id] = []
-                        if 'behavior' not in structure_roles[structure.id]:
-                            structure_roles[structure.id].append('behavior')
-                        
-                        # 关联事由到条文
-                        if structure.id not in structure_causes:
-                            structure_causes[structure.id] = []
-                        if cause not in structure_causes[structure.id]:
-                            structure_causes[structure.id].append(cause)
-    
-    
-    # 记录详细的角色分配情况
-    role_distribution = {'violation': 0, 'punishment': 0, 'behavior': 0}
-    for roles in structure_roles.values():
-        for role in roles:
-            role_distribution[role] += 1
-    logger.info(f"角色统计: 违则={role_distribution['violation']}, 罚则={role_distribution['punishment']}, 行为={role_distribution['behavior']}")
-    
-    # 记录一些关联的事由数量信息用于调试
-    if structure_causes:
-        related_counts = [len(causes) for causes in structure_causes.values()]
-        max_related = max(related_counts) if related_counts else 0
-        avg_related = sum(related_counts) / len(related_counts) if related_counts else 0
-        logger.info(f"每个条文关联的平均事由数: {avg_related:.2f}, 最大关联数: {max_related}")
+    # 读取预先建立的条文角色和关联事由
+    structure_roles, structure_causes = get_structure_links(regulation.id, version.id if version else None)
+    logger.info(f"已读取条文关联: {len(structure_roles)} 个条文")
     
     return render_template('regulations/detail.html', 
                            regulation=regulation, 
@@ -223,75 +171,6 @@ def regulation_detail(regulation_id):
                            structure_roles=structure_roles,
                            structure_causes=structure_causes)
 
-# 辅助函数：从条款文本中提取条文引用
-def extract_article_references(text):
-    if not text:
-        return []
-    
-    references = []
-    
-    logger.debug(f"开始从文本中提取条文引用: {text}")
-    
-    # 简单的正则匹配可能不足以处理所有情况，这里只是示例
-    # 匹配常见的引用模式，如"第x条"、"第x条第y款"等
-    import re
-    
-    # 匹配"第X条"模式
-    pattern1 = r'第(\d+)条'
-    matches1 = re.findall(pattern1, text)
-    for match in matches1:
-        reference = {
-            'article': int(match),
-            'paragraph': None,
-            'item': None
-        }
-        references.append(reference)
-        logger.debug(f"提取到引用: 第{match}条")
-    
-    # 匹配"第X条第Y款"模式
-    pattern2 = r'第(\d+)条第(\d+)款'
-    matches2 = re.findall(pattern2, text)
-    for match in matches2:
-        reference = {
-            'article': int(match[0]),
-            'paragraph': int(match[1]),
-            'item': None
-        }
-        references.append(reference)
-        logger.debug(f"提取到引用: 第{match[0]}条第{match[1]}款")
-    
-    # 匹配"第X条第Y款第Z项"模式
-    pattern3 = r'第(\d+)条第(\d+)款第(\d+)项'
-    matches3 = re.findall(pattern3, text)
-    for match in matches3:
-        reference = {
-            'article': int(match[0]),
-            'paragraph': int(match[1]),
-            'item': int(match[2])
-        }
-        references.append(reference)
-        logger.debug(f"提取到引用: 第{match[0]}条第{match[1]}款第{match[2]}项")
-    
-    logger.debug(f"提取完成，共找到 {len(references)} 个条文引用")
-    return references
-
-# 辅助函数：判断条文是否匹配引用
-def match_structure(structure, reference):
-    # 匹配条
-    if structure.article != reference['article']:
-        return False
-    
-    # 如果引用指定了款，但条文不匹配，则不匹配
-    if reference['paragraph'] is not None and structure.paragraph != reference['paragraph']:
-        return False
-    
-    # 如果引用指定了项，但条文不匹配，则不匹配
-    if reference['item'] is not None and structure.item != reference['item']:
-        return False
-    
-    logger.debug(f"条文匹配成功: structure_id={structure.id}, article={structure.article}, paragraph={structure.paragraph}, item={structure.item}")
-    return True
-
 @regulation_bp.route('/regulations/level/<level>')
 def regulations_by_level(level):
     page = request.args.get('page', 1, type=int)
@@ -331,6 +210,7 @@ def regulations_by_level(level):
     
     pagination = base_query.paginate(page=page, per_page=per_page, error_out=False)
     regulations = pagination.items
+    load_regulation_counts([regulation.id for regulation in regulations])
     
     return render_template('regulations/level_list.html', 
                            regulations=regulations, 
@@ -347,10 +227,7 @@ def regulation_stats(regulation_id):
     structures_count = LegalStructure.query.filter_by(regulation_id=regulation_id).count()
     
     # 获取该法规的所有处罚
-    punishments = db.session.query(LegalPunishment).\
-        join(LegalCause).\
-        filter(LegalCause.regulation_id == regulation_id).\
-        all()
+    punishments = LegalPunishment.query.filter_by(regulation_id=regulation_id).all()
     
     punishments_count = len(punishments)
     
@@ -426,20 +303,128 @@ def regulation_stats(regulation_id):
                           punishment_targets=punishment_targets,
                           punishment_by_cause=punishment_by_cause)
 
-# 添加辅助函数来获取处罚计数
-def get_punishment_count(regulation_id):
-    """获取特定法规的处罚总数"""
-    return db.session.query(LegalPunishment).\
-        join(LegalCause).\
-        filter(LegalCause.regulation_id == regulation_id).\
-        count()
+# 版本比较（old/new 为版本ID，text=1 时附带条文文本）
+@regulation_bp.route('/regulations/<int:regulation_id>/compare')
+def regulation_compare(regulation_id):
+    regulation = LegalRegulation.query.get_or_404(regulation_id)
+    old_version_id = request.args.get('old', type=int)
+    new_version_id = request.args.get('new', type=int) or regulation.current_version_id
+    with_text = request.args.get('text', 0, type=int)
 
-# 添加处罚计数辅助函数到应用上下文
-@regulation_bp.context_processor
-def utility_processor():
-    return {
-        'get_punishment_count': get_punishment_count
-    }
+    if not old_version_id or not new_version_id:
+        return jsonify(success=False, message='请指定要比较的版本'), 400
+    if old_version_id == new_version_id:
+        return jsonify(success=False, message='请选择两个不同的版本'), 400
+    versions = LegalRegulationVersion.query.filter(
+        LegalRegulationVersion.id.in_([old_version_id, new_version_id]),
+        LegalRegulationVersion.regulation_id == regulation_id
+    ).count()
+    if versions != 2:
+        return jsonify(success=False, message='版本不存在或不属于该法规'), 404
+
+    result = diff_versions(regulation_id, old_version_id, new_version_id)
+    # 未命中缓存时写入了比较结果，命中时没有待提交的改动
+    db.session.commit()
+    if with_text:
+        attach_texts(result['changes'])
+    return jsonify(success=True, regulation_id=regulation_id, **result)
+
+# 单次批量查询最多解析的 (法规, 日期) 组数
+MAX_EFFECTIVE_QUERIES = 200
+
+def _format_date(value):
+    return value.strftime('%Y-%m-%d') if value else None
+
+# 某日施行的版本（批量）
+# GET  ?regulation_id=1&regulation_id=2&date=2021-06-01&include=structures
+# POST {"queries": [{"regulation_id": 1, "date": "2021-06-01"}, ...], "include": "causes"}
+@regulation_bp.route('/versions/effective', methods=['GET', 'POST'])
+def effective_versions():
+    if request.method == 'POST':
+        payload = request.get_json(silent=True) or {}
+        default_date = payload.get('date')
+        queries = payload.get('queries') or [
+            {'regulation_id': regulation_id} for regulation_id in payload.get('regulation_ids', [])
+        ]
+        include = payload.get('include')
+    else:
+        default_date = request.args.get('date')
+        queries = [{'regulation_id': regulation_id}
+                   for regulation_id in request.args.getlist('regulation_id', type=int)]
+        include = request.args.get('include')
+
+    if not queries:
+        return jsonify(success=False, message='请指定要查询的法规'), 400
+    if len(queries) > MAX_EFFECTIVE_QUERIES:
+        return jsonify(success=False, message=f'单次最多查询 {MAX_EFFECTIVE_QUERIES} 组'), 400
+    if include not in (None, 'structures', 'causes'):
+        return jsonify(success=False, message=f'不支持的返回内容: {include}'), 400
+    try:
+        pairs = [(int(query['regulation_id']), datetime.strptime(query.get('date') or default_date, '%Y-%m-%d'))
+                 for query in queries]
+    except (KeyError, TypeError, ValueError):
+        return jsonify(success=False, message='法规ID或日期格式错误（日期格式为 YYYY-MM-DD）'), 400
+
+    versions = resolve_effective_versions(pairs)
+    version_ids = {version.id for version in versions if version is not None}
+    contents = {version_id: [] for version_id in version_ids}
+    if include == 'structures' and version_ids:
+        for structure in LegalStructure.query.filter(
+            LegalStructure.version_id.in_(version_ids)
+        ).order_by(LegalStructure.version_id, LegalStructure.path_key):
+            contents[structure.version_id].append({
+                'id': structure.id, 'article': structure.article, 'paragraph': structure.paragraph,
+                'item': structure.item, 'section': structure.section, 'content': structure.content
+            })
+    elif include == 'causes' and version_ids:
+        for cause in LegalCause.query.filter(
+            LegalCause.version_id.in_(version_ids)
+        ).order_by(LegalCause.version_id, LegalCause.code):
+            contents[cause.version_id].append({
+                'id': cause.id, 'code': cause.code, 'description': cause.description,
+                'violation_clause': cause.violation_clause, 'penalty_clause': cause.penalty_clause
+            })
+
+    results = []
+    for (regulation_id, on_date), version in zip(pairs, versions):
+        result = {'regulation_id': regulation_id, 'date': _format_date(on_date), 'version': None}
+        if version is not None:
+            result['version'] = {
+                'id': version.id, 'version_number': version.version_number, 'status': version.status,
+                'effective_date': _format_date(version.effective_date),
+                'effective_until': _format_date(version.effective_until)
+            }
+            if include:
+                result[include] = contents[version.id]
+        results.append(result)
+
+    return jsonify(success=True, total=len(results), results=results)
+
+# 单次批量解析最多的引用数
+MAX_CLAUSE_REFERENCES = 1000
+
+# 条款引用批量解析
+# POST {"references": ["《中华人民共和国统计法》第37条第1款", ...],
+#       "regulation": "未写法规名时使用的法规名称或ID", "date": "2021-06-01", "versions": {"法规ID": 版本ID}}
+@regulation_bp.route('/clauses/resolve', methods=['POST'])
+def resolve_clauses():
+    payload = request.get_json(silent=True) or {}
+    references = payload.get('references')
+    if not isinstance(references, list) or not references:
+        return jsonify(success=False, message='请提供条款引用列表'), 400
+    if len(references) > MAX_CLAUSE_REFERENCES:
+        return jsonify(success=False, message=f'单次最多解析 {MAX_CLAUSE_REFERENCES} 条引用'), 400
+    try:
+        on_date = datetime.strptime(payload['date'], '%Y-%m-%d') if payload.get('date') else None
+        version_ids = {int(regulation_id): int(version_id)
+                       for regulation_id, version_id in (payload.get('versions') or {}).items()}
+    except (TypeError, ValueError, AttributeError):
+        return jsonify(success=False, message='日期或版本格式错误（日期格式为 YYYY-MM-DD）'), 400
+
+    results = resolve_references([str(reference) for reference in references],
+                                 default_regulation=payload.get('regulation'),
+                                 version_ids=version_ids, on_date=on_date)
+    return jsonify(success=True, total=len(results), results=results)
 
 #法规编辑
 @regulation_bp.route('/regulations/<int:regulation_id>/edit', methods=['GET', 'POST'])
@@ -486,7 +471,7 @@ def regulation_edit(regulation_id):
     structures = LegalStructure.query.filter_by(
         regulation_id=regulation_id,
         version_id=current_version.id
-    ).all()
+    ).order_by(LegalStructure.path_key).all()
     
     causes = LegalCause.query.filter_by(
         regulation_id=regulation_id,
@@ -579,6 +564,7 @@ def regulation_edit(regulation_id):
             structure.original_text = request.form.get('original_text')
             
             try:
+                rebuild_cause_links(regulation.id, current_version.id)
                 db.session.commit()
                 flash('条文信息已成功更新', 'success')
                 return redirect(url_for('regulation.regulation_edit', regulation_id=regulation_id, version_id=current_version.id, _anchor='structure-' + structure_id))
@@ -608,6 +594,7 @@ def regulation_edit(regulation_id):
             cause.severity = request.form.get('severity')
             
             try:
+                rebuild_cause_links(regulation.id, current_version.id)
                 db.session.commit()
                 flash('事由信息已成功更新', 'success')
                 return redirect(url_for('regulation.regulation_edit', regulation_id=regulation_id, version_id=current_version.id, _anchor='cause-' + cause_id))
@@ -631,6 +618,7 @@ def regulation_edit(regulation_id):
                 db.session.add(new_structure)
                 db.session.flush()  # 获取新创建条文的ID
                 
+                rebuild_cause_links(regulation.id, current_version.id)
                 db.session.commit()
                 flash('新条文已成功添加', 'success')
                 return redirect(url_for('regulation.regulation_edit', regulation_id=regulation_id, version_id=current_version.id, _anchor=f'structure-{new_structure.id}'))
@@ -657,6 +645,7 @@ def regulation_edit(regulation_id):
                 db.session.add(new_cause)
                 db.session.flush()  # 获取新创建事由的ID
                 
+                rebuild_cause_links(regulation.id, current_version.id)
                 db.session.commit()
                 flash('新事由已成功添加', 'success')
                 return redirect(url_for('regulation.regulation_edit', regulation_id=regulation_id, version_id=current_version.id, _anchor=f'cause-{new_cause.id}'))
@@ -676,6 +665,7 @@ def regulation_edit(regulation_id):
             
             try:
                 db.session.delete(structure)
+                rebuild_cause_links(regulation.id, current_version.id)
                 db.session.commit()
                 flash('条文已成功删除', 'success')
             except Exception as e:
@@ -701,6 +691,7 @@ def regulation_edit(regulation_id):
                 
                 # 删除事由
                 db.session.delete(cause)
+                rebuild_cause_links(regulation.id, current_version.id)
                 db.session.commit()
                 flash('事由已成功删除', 'success')
                 
@@ -742,53 +733,9 @@ def regulation_edit(regulation_id):
                 # 处理内容复制选项
                 copy_option = request.form.get('copy_option')
                 if copy_option == 'copy_current':
-                    # 复制当前版本的内容到新版本
-                    for structure in structures:
-                        new_structure = LegalStructure(
-                            regulation_id=regulation.id,
-                            version_id=new_version.id,
-                            article=structure.article,
-                            paragraph=structure.paragraph,
-                            item=structure.item,
-                            section=structure.section,
-                            content=structure.content,
-                            original_text=structure.original_text
-                        )
-                        db.session.add(new_structure)
-                    
-                    for cause in causes:
-                        new_cause = LegalCause(
-                            regulation_id=regulation.id,
-                            version_id=new_version.id,
-                            code=cause.code,
-                            description=cause.description,
-                            violation_type=cause.violation_type,
-                            violation_clause=cause.violation_clause,
-                            behavior=cause.behavior,
-                            illegal_behavior=cause.illegal_behavior,
-                            penalty_type=cause.penalty_type,
-                            penalty_clause=cause.penalty_clause,
-                            severity=cause.severity
-                        )
-                        db.session.add(new_cause)
-                        db.session.flush()  # 获取新事由ID
-                        
-                        # 复制处罚信息
-                        punishments = LegalPunishment.query.filter_by(cause_id=cause.id).all()
-                        for punishment in punishments:
-                            new_punishment = LegalPunishment(
-                                cause_id=new_cause.id,
-                                version_id=new_version.id,
-                                circumstance=punishment.circumstance,
-                                punishment_type=punishment.punishment_type,
-                                progressive_punishment=punishment.progressive_punishment,
-                                industry=punishment.industry,
-                                subject_level=punishment.subject_level,
-                                punishment_target=punishment.punishment_target,
-                                punishment_details=punishment.punishment_details,
-                                additional_notes=punishment.additional_notes
-                            )
-                            db.session.add(new_punishment)
+                    # 复制当前版本的条文、事由与处罚到新版本
+                    clone_version_content(regulation.id, current_version.id, new_version.id)
+                    rebuild_cause_links(regulation.id, new_version.id)
                 
                 db.session.commit()
                 flash('新版本已成功创建', 'success')
@@ -800,8 +747,7 @@ def regulation_edit(regulation_id):
     # 获取所有版本
     all_versions = LegalRegulationVersion.query.filter_by(regulation_id=regulation.id).order_by(LegalRegulationVersion.revision_date.desc()).all()
     
-    # 对条文和事由进行排序，以便在界面上更好地显示
-    structures = sorted(structures, key=lambda x: (x.article or 0, x.paragraph or 0, x.item or 0, x.section or 0))
+    # 条文已按位置键排序，事由按编号排序，以便在界面上更好地显示
     causes = sorted(causes, key=lambda x: x.code)
     
     return render_template('regulations/edit/edit.html', 
@@ -822,7 +768,7 @@ def punishment_edit(cause_id):
         return redirect(url_for('cause_detail', cause_id=cause_id))
     
         # 获取事由信息
-    cause = LegalCause.query.get_or_404(cause_id)
+    cause = LegalCause.query.options(joinedload(LegalCause.regulation)).get_or_404(cause_id)
     regulation = cause.regulation  # 这里确保获取了regulation变量
     
     # 获取该事由下的所有处罚措施
@@ -865,6 +811,8 @@ def punishment_edit(cause_id):
             try:
                 new_punishment = LegalPunishment(
                     cause_id=cause.id,
+                    regulation_id=cause.regulation_id,
+                    version_id=cause.version_id,
                     circumstance=request.form.get('circumstance'),
                     punishment_type=request.form.get('punishment_type'),
                     progressive_punishment=request.form.get('progressive_punishment'),
@@ -913,7 +861,7 @@ def punishment_edit(cause_id):
 # 事由详情
 @regulation_bp.route('/causes/<int:cause_id>')
 def cause_detail(cause_id):
-    cause = LegalCause.query.get_or_404(cause_id)
+    cause = LegalCause.query.options(joinedload(LegalCause.regulation)).get_or_404(cause_id)
     regulation = cause.regulation  # 确保提供regulation变量
     punishments = LegalPunishment.query.filter_by(cause_id=cause_id).all()
     
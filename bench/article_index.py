@@ -0,0 +1,151 @@
+"""
+条款索引基准
+比较 process/tools/article_index 与此前各步骤在逐行循环中对整表做布尔筛选（原实现见 legacy_lookups）的耗时，
+并逐行核对两者取到的行一致。每一行依次做各步骤的查找：下级各行（add_evidence）、同条罚则为 1 的行
+（process_complex）、所在款的款本身（add_vio_ass）、条款号不限级别的筛选（export_cause）、
+条款号完全相同的行（format_law_result 与 get_coze_discretion）。
+语料为 laws_folder 下的 docx（按 import_db_structure 的方式切分为条款行），或 --input 指定的法规导出表；
+--sizes 把全部法规依次接成一部大法规后截取前 N 行计时，看耗时随行数的增长。
+
+用法：
+    python -m bench.article_index                                # 默认语料
+    python -m bench.article_index --input law_structure.xlsx --sizes 1000,4000,16000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from process.tools.article_index import ArticleIndex
+from bench.legacy.add_evidence import find_children
+from bench.legacy.export_cause import filter_records
+
+PENALTY_WORDS = '罚款|没收|吊销|责令'
+
+
+# ---- 此前的实现（用于对比） ----
+
+# find_children、filter_records 的原实现见 bench/legacy；其余查找原为各步骤循环中的内联代码，在这里按原样写出
+def legacy_lookups(df):
+    """各步骤原来的查找方式，df 的条、款、项、目已将空值填为 0（add_vio_ass 之后各步骤的输入）"""
+    found = []
+    nullable = df.replace({'款': {0: None}, '项': {0: None}, '目': {0: None}})
+    for label, row in df.iterrows():
+        if row['目'] == 0:
+            found.append(list(find_children(nullable, nullable.loc[label]).index))
+        relevant_rows = df[df['条'] == row['条']]
+        found.append([index for index, rel_row in relevant_rows.iterrows() if rel_row['罚则'] == 1])
+        if row['项'] and not row['目']:
+            superior_rows = df[(df['条'] == row['条']) & (df['款'] == row['款']) & (df['项'] == 0)]
+            found.append(superior_rows.index[0] if not superior_rows.empty else None)
+        conditions = {'条': row['条'], '款': 0, '项': row['项'], '目': 0}
+        found.append(list(filter_records(df, conditions).index))
+        strip, kuan, xiang, mu = row['条'], row['款'], row['项'], row['目']
+        results = df.query("条 == @strip and 款 == @kuan and 项 == @xiang and 目 == @mu")
+        found.append(results.index[0] if not results.empty else None)
+    return found
+
+
+def index_lookups(df):
+    """同样的查找改用 ArticleIndex"""
+    found = []
+    article_index = ArticleIndex(df)
+    for label in df.index:
+        article, paragraph, item, subitem = article_index.key(label)
+        if subitem == 0:
+            found.append(article_index.children(label))
+        found.append(article_index.where(article_index.article(article), 罚则=1))
+        if item and not subitem:
+            found.append(article_index.parent(label))
+        found.append(article_index.match(article, 0, item, 0))
+        found.append(article_index.first(article, paragraph, item, subitem))
+    return found
+
+
+# ---- 语料 ----
+
+def prepare(df):
+    """条、款、项、目空值填为 0，没有罚则列时按处罚用语标出"""
+    df = df.reset_index(drop=True)
+    for column in ('条', '款', '项', '目'):
+        df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype(int)
+    if '罚则' not in df.columns:
+        df['罚则'] = df['内容'].astype(str).str.contains(PENALTY_WORDS).astype(int)
+    return df[['条', '款', '项', '目', '内容', '罚则']]
+
+
+def load_sheets(input_file, folder):
+    if input_file:
+        return [prepare(df) for df in pd.read_excel(input_file, sheet_name=None).values()]
+    from import_db_structure import extract_law_structure_from_docx
+    sheets = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith('.docx'):
+            continue
+        rows = extract_law_structure_from_docx(os.path.join(folder, name))
+        if not rows:
+            continue
+        sheets.append(prepare(pd.DataFrame([{
+            '条': row['条'], '款': row['款'], '项': row['项'], '目': row['目'], '内容': row['内容']
+        } for row in rows])))
+    return sheets
+
+
+def concatenated(sheets, size):
+    """各法规依次接成一部法规（条号顺延），取前 size 行"""
+    frames = []
+    offset = total = 0
+    for df in sheets:
+        df = df.copy()
+        df['条'] += offset
+        offset = int(df['条'].max())
+        frames.append(df)
+        total += len(df)
+        if total >= size:
+            break
+    return pd.concat(frames, ignore_index=True).head(size)
+
+
+def timed(function, sheets, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for df in sheets:
+            function(df)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='条款索引基准')
+    parser.add_argument('--input', help='法规导出表（含 条/款/项/目/内容 列），不指定时读取 --folder')
+    parser.add_argument('--folder', default='laws_folder', help='法规 docx 所在目录')
+    parser.add_argument('--sizes', default='500,2000,8000', help='接成一部大法规后截取的行数，逗号分隔')
+    parser.add_argument('--repeat', type=int, default=1, help='每项重复次数，取最快一次')
+    args = parser.parse_args()
+
+    sheets = load_sheets(args.input, args.folder)
+    if not sheets:
+        print('没有可用的语料')
+        return 1
+    print(f"语料: {len(sheets)} 部法规, {sum(len(df) for df in sheets)} 行\n")
+
+    mismatches = sum(legacy_lookups(df) != index_lookups(df) for df in sheets)
+    print(f"核对: {mismatches} 部法规的查找结果不一致\n")
+
+    print(f"{'':<24} {'原布尔筛选':>12} {'ArticleIndex':>14} {'加速':>8}")
+    cases = [('全部法规（逐部）', sheets)]
+    cases += [(f'接成一部 {size} 行', [concatenated(sheets, size)])
+              for size in map(int, args.sizes.split(',')) if size]
+    for name, corpus in cases:
+        legacy_time = timed(legacy_lookups, corpus, args.repeat)
+        indexed = timed(index_lookups, corpus, args.repeat)
+        print(f"{name:<24} {legacy_time * 1000:10.0f} ms {indexed * 1000:12.1f} ms {legacy_time / indexed:7.0f}x")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+中文数字转换基准
+列出此前两处实现（import_db_structure 与 process/law_format_num，见 bench/legacy）
+与 process/tools/chinese_numerals 数字表不一致的写法数量和示例，并比较三者的耗时。
+数字表本身的穷举核对见 check_chinese_numerals.py。
+
+用法：
+    python -m bench.chinese_numerals
+    python -m bench.chinese_numerals --repeat 5
+"""
+import argparse
+import sys
+import time
+
+from process.tools.chinese_numerals import CHINESE_NUMERALS, BRACKETS, MAX_NUMBER, chinese_to_int, int_to_chinese
+from bench.legacy.import_db_structure import chinese_to_arabic as import_chinese_to_arabic
+from bench.legacy.law_format_num import chinese_number
+
+
+def report_legacy(name, function):
+    wrong = []
+    for text, number in CHINESE_NUMERALS.items():
+        if text[0] in BRACKETS:
+            continue
+        try:
+            value = int(function(text))
+        except (KeyError, ValueError):
+            value = None
+        if value != number:
+            wrong.append((text, number, value))
+    examples = '，'.join(f"{text}={number}(得 {value})" for text, number, value in wrong[:4])
+    print(f"{name:<28} {len(wrong):6d} 种写法不一致  {examples}")
+
+
+def timed(function, texts, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            function(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='中文数字转换基准')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数，取最快一次')
+    args = parser.parse_args()
+
+    # 原实现带 lru_cache，计时取未缓存的函数
+    format_chinese_number = chinese_number.__wrapped__
+
+    report_legacy('原 import_db_structure', import_chinese_to_arabic)
+    report_legacy('原 law_format_num', format_chinese_number)
+    print()
+
+    texts = [int_to_chinese(number) for number in range(1, MAX_NUMBER + 1)]
+    cases = [
+        ('原 import_db_structure', import_chinese_to_arabic),
+        ('原 law_format_num', format_chinese_number),
+        ('chinese_to_int', chinese_to_int),
+    ]
+    for name, function in cases:
+        elapsed = timed(function, texts, args.repeat)
+        print(f"{name:<28} {elapsed * 1000:8.2f} ms  {elapsed / len(texts) * 1e9:7.0f} ns/次")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
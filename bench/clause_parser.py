@@ -0,0 +1,125 @@
+"""
+条款引用解析基准
+在法规全文（laws_folder 下的 docx）与事由表的条款列上，比较 process/tools/clause_parser
+与此前各处独立实现的解析函数（见 bench/legacy）的耗时与识别到的引用数。
+process/ 各步骤处理的是条款号已转为阿拉伯数字的文本，语料按同样方式转换后再计时。
+
+用法：
+    python -m bench.clause_parser                        # 默认语料
+    python -m bench.clause_parser --folder laws_folder --cause data/law_cause.xlsx --repeat 3
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import docx
+import pandas as pd
+
+from process.tools.clause_parser import scan_clauses, parse_number
+from bench.legacy.cross_reference import extract_article_references
+from bench.legacy.export_cause import extract_clause_numbers
+from bench.legacy.extract_violation_articles import get_clause_array
+from bench.legacy.format_law_result import parse_clause
+
+CAUSE_COLUMNS = ('违则', '违则条款', '罚则', '罚则条款', '行为')
+
+
+# ---- 此前的实现（用于对比） ----
+
+def tolerant(function):
+    """原 parse_clause 遇到非数字的条款号时抛出 ValueError，计为没有结果"""
+    def call(text):
+        try:
+            return function(text)
+        except ValueError:
+            return ()
+    return call
+
+
+def legacy_penalty_clauses(text):
+    """process/process_penalty_*.py 原内联实现"""
+    return re.findall(r'第(\d+)条(?:第(\d+)款)?(?:第(\d+)项)?', text)
+
+
+# ---- 语料 ----
+
+def to_arabic(text):
+    """条款号转为阿拉伯数字，与 process/ 各步骤的输入一致"""
+    return re.sub(
+        r'第([零〇一二两三四五六七八九十百千]+)([条款项目])',
+        lambda match: f"第{parse_number(match.group(1)) or match.group(1)}{match.group(2)}",
+        text
+    )
+
+
+def load_corpus(folder, cause_file):
+    lines = []
+    if folder and os.path.isdir(folder):
+        for name in sorted(os.listdir(folder)):
+            if not name.lower().endswith('.docx'):
+                continue
+            try:
+                document = docx.Document(os.path.join(folder, name))
+            except Exception as e:
+                print(f"跳过 {name}: {e}")
+                continue
+            lines.extend(para.text.strip() for para in document.paragraphs if para.text.strip())
+    if cause_file and os.path.exists(cause_file):
+        for frame in pd.read_excel(cause_file, sheet_name=None).values():
+            for column in CAUSE_COLUMNS:
+                if column in frame.columns:
+                    lines.extend(str(value) for value in frame[column].dropna())
+    return [to_arabic(line) for line in lines]
+
+
+def timed(function, texts, repeat):
+    best = None
+    found = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = sum(len(function(text)) for text in texts)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='条款引用解析基准')
+    parser.add_argument('--folder', default='laws_folder', help='法规 docx 所在目录')
+    parser.add_argument('--cause', default='data/law_cause.xlsx', help='事由表')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数，取最快一次')
+    args = parser.parse_args()
+
+    texts = load_corpus(args.folder, args.cause)
+    if not texts:
+        print('没有可用的语料')
+        return 1
+    clauses = [text for text in texts if '第' in text and len(text) < 40]
+    print(f"语料: {len(texts)} 段文本, 其中 {len(clauses)} 段短条款串, "
+          f"共 {sum(len(text) for text in texts)} 字\n")
+
+    def scan_uncached(text):
+        return scan_clauses.__wrapped__(text)
+
+    cases = [
+        ('全文 - 原 extract_article_references', extract_article_references, texts),
+        ('全文 - 原 get_clause_array', get_clause_array, texts),
+        ('全文 - 原 process_penalty_* 内联', legacy_penalty_clauses, texts),
+        ('全文 - scan_clauses（不缓存）', scan_uncached, texts),
+        ('全文 - scan_clauses（缓存命中）', scan_clauses, texts),
+        ('条款串 - 原 parse_clause', tolerant(parse_clause), clauses),
+        ('条款串 - 原 extract_clause_numbers', extract_clause_numbers, clauses),
+        ('条款串 - scan_clauses（不缓存）', scan_uncached, clauses),
+    ]
+    for text in texts:
+        scan_clauses(text)
+    for name, function, corpus in cases:
+        elapsed, found = timed(function, corpus, args.repeat)
+        print(f"{name:<40} {elapsed * 1000:9.1f} ms  {found:8d} 个结果")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
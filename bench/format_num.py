@@ -0,0 +1,187 @@
+"""
+条款引用规范化基准
+在法规条文上比较 process/law_format_num 的单遍规范化与此前逐步正则改写的耗时，并逐行核对两者结果一致；
+原实现见 bench/legacy/law_format_num.py。
+语料为 laws_folder 下的 docx（按 import_db_structure 的方式切分为条款行），或 --input 指定的法规导出表；
+--fuzz N 另外用随机拼接的引用片段核对 N 个sheet。
+
+用法：
+    python -m bench.format_num                                  # 默认语料
+    python -m bench.format_num --input law_structure.xlsx --repeat 3 --fuzz 2000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+from process.law_format_num import format_sheet, normalize_references
+from process.tools.chinese_numerals import chinese_to_int, NUMERAL_CHARS
+from bench.legacy import law_format_num as legacy
+
+
+# ---- 此前的实现（用于对比）----
+
+BRACKET_NUMERAL = re.compile(rf'第\(([{NUMERAL_CHARS}]+)\)([条款项目])')
+CHINESE_REFERENCE = re.compile(rf'第([{NUMERAL_CHARS}]+)([条款项目])')
+
+
+def legacy_chinese_to_arabic(text):
+    """
+    原第 1 步：去掉括号后把"第X条/款/项/目"中的中文数字换成阿拉伯数字
+    原换算把"一百零三"等算错，已改用共用的 process/tools/chinese_numerals，这一步因而不使用原实现
+    """
+    def replace(match):
+        number = chinese_to_int(match.group(1))
+        return f'第{number}{match.group(2)}' if isinstance(number, int) else match.group(0)
+    return CHINESE_REFERENCE.sub(replace, BRACKET_NUMERAL.sub(r'第\1\2', text))
+
+
+def legacy_normalize(content, current_tiao, current_kuan, df):
+    """原 process_legal_document 中对一行内容依次执行的改写"""
+    content = legacy_chinese_to_arabic(content)
+    content = legacy.handle_self_references(content, current_tiao, current_kuan)
+    if current_kuan > 0:
+        content = legacy.handle_previous_references(content, current_tiao, current_kuan)
+    content = legacy.handle_standalone_sections(content)
+    content = legacy.handle_article_item_reference(content)
+    content = legacy.handle_standalone_clauses(content, df, current_tiao)
+    return legacy.handle_range_references(content)
+
+
+def legacy_format_sheet(df):
+    """原 process_legal_document 的逐行循环（不含罚则补充，语料中没有该列）"""
+    for idx, row in df.iterrows():
+        current_kuan = row['款'] if not pd.isna(row['款']) else 0
+        content = legacy_normalize(row['内容'], row['条'], current_kuan, df)
+        df.at[idx, '内容'] = content
+    return df
+
+
+# ---- 语料 ----
+
+def load_sheets(input_file, folder):
+    if input_file:
+        return list(pd.read_excel(input_file, sheet_name=None).values())
+    from import_db_structure import extract_law_structure_from_docx
+    sheets = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith('.docx'):
+            continue
+        rows = extract_law_structure_from_docx(os.path.join(folder, name))
+        if not rows:
+            continue
+        sheets.append(pd.DataFrame([{
+            '条': int(row['条']),
+            '款': int(row['款']),
+            '项': int(row['项']) if row['项'] else None,
+            '目': int(row['目']) if row['目'] else None,
+            '内容': row['内容']
+        } for row in rows]))
+    return sheets
+
+
+FRAGMENTS = [
+    '第', '条', '款', '项', '目', '例', '至', '、', ',', ' ', '(', ')', '下列', '规定', '的',
+    '一', '二', '三', '十', '百', '零', '两', '1', '2', '3', '12', '０',
+    '第3条', '第12条', '第2款', '第1项', '第5项', '第2目', '第三条', '第十二条', '第一百二十条',
+    '第二款', '第(三)项', '第(十)条', '本条', '本款', '本条例', '前款', '前2款', '前5款',
+    '第3条至第5条', '第3条第1款至第3条第3款', '第2条第1款第1项至第4项', '第5条至第3条',
+]
+
+
+def random_sheet(rng):
+    """同一条下的几行随机内容，第一款可能含"下列" """
+    article = rng.randint(1, 30)
+    rows = []
+    for paragraph in range(1, rng.randint(2, 5)):
+        text = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 14)))
+        if paragraph == 1 and rng.random() < 0.5:
+            text = '有下列行为之一的' + text
+        rows.append({'条': article, '款': paragraph, '项': None, '目': None, '内容': text})
+    return pd.DataFrame(rows)
+
+
+# ---- 核对与计时 ----
+
+def compare(sheets, label):
+    mismatches = 0
+    for df in sheets:
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = legacy_format_sheet(df.copy())['内容'].tolist()
+        actual = format_sheet(df.copy())['内容'].tolist()
+        for before, old, new in zip(df['内容'], expected, actual):
+            if old != new:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"  不一致: {before!r}\n    原: {old!r}\n    新: {new!r}")
+    print(f"{label}: {sum(len(df) for df in sheets)} 行, {mismatches} 行不一致")
+    return mismatches
+
+
+def timed(function, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='条款引用规范化基准')
+    parser.add_argument('--input', help='法规导出表（含 条/款/项/目/内容 列），不指定时读取 --folder')
+    parser.add_argument('--folder', default='laws_folder', help='法规 docx 所在目录')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数，取最快一次')
+    parser.add_argument('--fuzz', type=int, default=0, help='随机核对的sheet数')
+    args = parser.parse_args()
+
+    sheets = load_sheets(args.input, args.folder)
+    if not sheets:
+        print('没有可用的语料')
+        return 1
+    rows = [
+        (content, article, paragraph if not pd.isna(paragraph) else 0, df)
+        for df in sheets
+        for content, article, paragraph in zip(df['内容'], df['条'], df['款'])
+    ]
+    print(f"语料: {len(sheets)} 个sheet, {len(rows)} 行\n")
+
+    mismatches = compare(sheets, '语料核对')
+    if args.fuzz:
+        rng = random.Random(0)
+        mismatches += compare([random_sheet(rng) for _ in range(args.fuzz)], '随机核对')
+    print()
+
+    def run_legacy_rows():
+        for content, article, paragraph, df in rows:
+            legacy_normalize(content, article, paragraph, df)
+
+    def run_rows():
+        for content, article, paragraph, _ in rows:
+            normalize_references(content, article, paragraph)
+
+    cases = [
+        ('逐行改写 - 原 7 步正则', run_legacy_rows),
+        ('逐行改写 - normalize_references', run_rows),
+        ('整表 - 原 iterrows 循环', lambda: [legacy_format_sheet(df.copy()) for df in sheets]),
+        ('整表 - format_sheet', lambda: [format_sheet(df.copy()) for df in sheets]),
+    ]
+    results = {}
+    for name, function in cases:
+        results[name] = timed(function, args.repeat)
+        print(f"{name:<36} {results[name] * 1000:9.1f} ms  {len(rows) / results[name]:10.0f} 行/秒")
+    elapsed = list(results.values())
+    print(f"\n逐行改写提速 {elapsed[0] / elapsed[1]:.1f} 倍, 整表提速 {elapsed[2] / elapsed[3]:.1f} 倍")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""
+基准对比用的原实现
+各模块按原文件命名，原样复制优化之前的函数及其用到的常量与辅助函数，不随原文件的后续修改而变化。
+"""
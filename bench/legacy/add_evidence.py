@@ -0,0 +1,36 @@
+"""
+process/add_evidence.py 中 find_children 的原实现（改用 process/tools/article_index 之前），
+供 bench/article_index.py 对比
+"""
+import pandas as pd
+
+
+def find_children(df, row):
+    """
+    查找当前行的子节点
+    :param df: 数据框
+    :param row: 当前行
+    :return: 子节点数据框
+    """
+    article = row['条']
+    paragraph = row['款']
+    item = row['项']
+    # 额外检查和转换 item
+    if pd.isna(item):
+        item = None
+    #print(f"item {item} ")
+    if paragraph:
+        if item:
+            # 如果有款和项，查找目
+            condition = (df['条'] == article) & (df['款'] == paragraph) & (df['项'] == item) & (df['目'].notnull())
+            #print(f"condition1 {condition} ")
+        else:
+            # 如果只有款，查找项
+            condition = (df['条'] == article) & (df['款'] == paragraph) & (df['项'].notnull())
+            #print(f"condition2 {condition} ")
+    else:
+        # 如果没有款，查找款
+        condition = (df['条'] == article) & (df['款'].notnull())
+        #print(f"condition3 {condition} ")
+
+    return df[condition]
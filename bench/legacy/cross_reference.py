@@ -0,0 +1,36 @@
+"""
+app/services/cross_reference.py 中 extract_article_references 的原实现（改用 process/tools/clause_parser 之前），
+供 bench/clause_parser.py 对比
+"""
+import re
+
+
+ARTICLE_PATTERN = re.compile(r'第(\d+)条')
+
+
+ARTICLE_PARAGRAPH_PATTERN = re.compile(r'第(\d+)条第(\d+)款')
+
+
+ARTICLE_PARAGRAPH_ITEM_PATTERN = re.compile(r'第(\d+)条第(\d+)款第(\d+)项')
+
+
+def extract_article_references(text):
+    """从条款文本中提取条文引用"""
+    if not text:
+        return []
+    
+    references = []
+    
+    # 匹配"第X条"模式
+    for match in ARTICLE_PATTERN.findall(text):
+        references.append({'article': int(match), 'paragraph': None, 'item': None})
+    
+    # 匹配"第X条第Y款"模式
+    for match in ARTICLE_PARAGRAPH_PATTERN.findall(text):
+        references.append({'article': int(match[0]), 'paragraph': int(match[1]), 'item': None})
+    
+    # 匹配"第X条第Y款第Z项"模式
+    for match in ARTICLE_PARAGRAPH_ITEM_PATTERN.findall(text):
+        references.append({'article': int(match[0]), 'paragraph': int(match[1]), 'item': int(match[2])})
+    
+    return references
@@ -0,0 +1,26 @@
+"""
+process/export_cause.py 中的原实现，供基准对比：
+    extract_clause_numbers  改用 process/tools/clause_parser 之前（bench/clause_parser.py）
+    filter_records          改用 process/tools/article_index 之前（bench/article_index.py）
+"""
+import re
+
+import pandas as pd
+
+
+def extract_clause_numbers(clause): 
+    parts = re.findall(r'\d+', clause)
+    return {
+        '条': int(parts[0]) if parts else 0,
+        '款': int(parts[1]) if len(parts) > 1 else 0,
+        '项': int(parts[2]) if len(parts) > 2 else 0,
+        '目': int(parts[3]) if len(parts) > 3 else 0
+    }
+
+
+def filter_records(df, conditions):
+    filter_conditions = pd.Series([True] * len(df))
+    for key, value in conditions.items():
+        if value:
+            filter_conditions &= (df[key] == value)
+    return df[filter_conditions]
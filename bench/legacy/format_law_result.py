@@ -0,0 +1,35 @@
+"""
+process/format_law_result.py 中 parse_clause 的原实现（改用 process/tools/clause_parser 之前），
+供 bench/clause_parser.py 对比
+"""
+import pandas as pd
+
+
+def parse_clause(clause_str):
+    """解析条款字符串，返回条、款、项、目，处理空格和格式不一致"""
+    if not clause_str or pd.isna(clause_str):
+        return None, None, None, None
+    
+    clause_str = str(clause_str).replace(".1", "").replace(" ", "").strip()
+    if "《" in clause_str and "》" in clause_str:
+        clause_str = clause_str.split("》")[1]
+    
+    parts = clause_str.split("第")
+    strip, kuan, xiang, mu = None, None, None, None
+    
+    for part in parts[1:]:
+        if part.endswith("条"):
+            strip = part[:-1]
+        elif part.endswith("款"):
+            kuan = part[:-1]
+        elif part.endswith("项"):
+            xiang = part[:-1]
+        elif part.endswith("目"):
+            mu = part[:-1]
+    
+    strip = int(strip) if strip else 0
+    kuan = int(kuan) if kuan else 0
+    xiang = int(xiang) if xiang else 0
+    mu = int(mu) if mu else 0
+    
+    return strip, kuan, xiang, mu
@@ -0,0 +1,45 @@
+"""
+import_db_structure.py 中 chinese_to_arabic 的原实现（改用 process/tools/chinese_numerals 之前），
+供 bench/chinese_numerals.py 对比
+"""
+import re
+
+
+# 中文数字转阿拉伯数字的映射
+CHINESE_NUMBERS = {
+    '零': 0, '一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9,
+    '十': 10, '百': 100, '千': 1000, '万': 10000, '亿': 100000000
+}
+
+
+def chinese_to_arabic(chinese_str):
+    """将中文数字转换为阿拉伯数字，支持带'零'的情况"""
+    if not chinese_str or not any(c in CHINESE_NUMBERS for c in chinese_str):
+        return chinese_str
+
+    chinese_str = re.sub(r'[条章款项目]', '', chinese_str.strip())
+    if len(chinese_str) == 1 and chinese_str in CHINESE_NUMBERS:
+        return str(CHINESE_NUMBERS[chinese_str])
+
+    total = 0
+    current_section = 0
+    last_unit = 1
+
+    for char in chinese_str:
+        if char not in CHINESE_NUMBERS:
+            continue
+        value = CHINESE_NUMBERS[char]
+        if value >= 10:
+            if current_section == 0:
+                current_section = 1
+            current_section *= value
+            last_unit = value
+        else:
+            if last_unit >= 10:
+                total += current_section
+                current_section = value
+                last_unit = 1
+            else:
+                current_section = current_section * 10 + value
+    total += current_section
+    return str(total) if total > 0 else chinese_str
@@ -0,0 +1,112 @@
+"""
+可能违则语义匹配基准
+比较 process/add_vio_ass 中按矩阵乘积一次算出相似度的 find_similar_clauses 与此前逐对调用
+is_mostly_contained（原为 update_excel 中的内联代码，见 legacy_similar_clauses）的耗时，
+并逐条核对两者给出的可能违则、可能度一致。
+语料为 add_vio_ass 的输入表（已经 add_evidence、process_complex 处理，含 罚则/违法情形 列），
+对每张工作表中罚则为 0、违法情形为 1 的记录做匹配。
+
+用法：
+    python -m bench.semantic_match --input result/law_structure_format_num_ex.xlsx
+    python -m bench.semantic_match --input law_structure.xlsx --limit 20 --repeat 3
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from process.add_vio_ass import (
+    build_candidates, find_similar_clauses, format_clause, is_mostly_contained, load_pretrained_model
+)
+
+
+# ---- 此前的实现（用于对比） ----
+
+def legacy_similar_clauses(text, current_article, df, model):
+    """add_vio_ass.update_excel 原内联实现"""
+    other_records = df[(df['条'] != current_article) & (df['条'] < 10000) & ~((df['罚则'] == 1) | (df['违法情形'] == 1))]
+    matching_clauses = []
+    matching_similarities = []
+    for _, other_row in other_records.iterrows():
+        is_contained, similarity = is_mostly_contained(text, other_row['内容'], model)
+        if is_contained and similarity > 0.9:
+            matching_clauses.append(format_clause(other_row))
+            matching_similarities.append(similarity)
+    if not matching_clauses:
+        return [], []
+    sorted_indices = np.argsort(matching_similarities)[::-1][:5]
+    return ([matching_clauses[i] for i in sorted_indices],
+            [matching_similarities[i] for i in sorted_indices])
+
+
+# ---- 语料 ----
+
+def load_sheets(input_file, limit):
+    sheets = []
+    for df in pd.read_excel(input_file, sheet_name=None).values():
+        if not {'罚则', '违法情形', '内容'} <= set(df.columns):
+            continue
+        for column in ('条', '款', '项', '目'):
+            df[column] = df[column].fillna(0).astype(int)
+        queries = df[(df['罚则'] == 0) & (df['违法情形'] == 1)]
+        if not queries.empty:
+            sheets.append((df, [(str(text), article) for text, article in zip(queries['内容'], queries['条'])]))
+        if limit and len(sheets) >= limit:
+            break
+    return sheets
+
+
+def run_legacy(sheets, model):
+    return [legacy_similar_clauses(text, article, df, model) for df, queries in sheets for text, article in queries]
+
+
+def run_matrix(sheets, model):
+    results = []
+    for df, queries in sheets:
+        candidates = build_candidates(df, model)
+        results.extend(find_similar_clauses(text, article, candidates, model) for text, article in queries)
+    return results
+
+
+def timed(function, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='可能违则语义匹配基准')
+    parser.add_argument('--input', required=True, help='add_vio_ass 的输入表')
+    parser.add_argument('--limit', type=int, default=0, help='最多处理的工作表数，0 表示全部')
+    parser.add_argument('--repeat', type=int, default=1, help='每项重复次数，取最快一次')
+    args = parser.parse_args()
+
+    model = load_pretrained_model()
+    if model is None:
+        return 1
+    sheets = load_sheets(args.input, args.limit)
+    if not sheets:
+        print('没有可用的语料')
+        return 1
+    print(f"语料: {len(sheets)} 张工作表, {sum(len(df) for df, _ in sheets)} 行, "
+          f"{sum(len(queries) for _, queries in sheets)} 条待匹配记录\n")
+
+    legacy_time, legacy = timed(lambda: run_legacy(sheets, model), args.repeat)
+    matrix_time, matrix = timed(lambda: run_matrix(sheets, model), args.repeat)
+    mismatches = sum(old != new for old, new in zip(legacy, matrix))
+    print(f"核对: {mismatches} 条记录的可能违则或可能度不一致，"
+          f"{sum(1 for clauses, _ in matrix if clauses)} 条有匹配\n")
+    print(f"{'原逐对比较':<20} {legacy_time * 1000:10.0f} ms")
+    print(f"{'矩阵乘积':<20} {matrix_time * 1000:10.0f} ms  {legacy_time / matrix_time:6.0f}x")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
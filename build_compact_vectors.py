@@ -0,0 +1,164 @@
+"""
+精简词向量表生成脚本
+扫描 laws_folder 中的法规、数据库中的条文与事由（以及可选的 process/ 输入表），
+用 add_vio_ass.preprocess 分词，只保留实际出现过的词，从完整模型中取出其向量，
+以 float16 保存为精简表（见 process/tools/word_vectors.py），add_vio_ass 之后优先加载它；
+完整模型也没有的词另行记录，表中缺少的其他词运行时从完整模型读取。
+生成后在语料句子间抽样比较精简表与完整模型给出的相似度。导入新法规后重新运行一次，
+add_vio_ass 输出的覆盖率偏低时也应重新生成。
+
+用法：
+    python build_compact_vectors.py                              # laws_folder + 数据库
+    python build_compact_vectors.py --no-db --excel law_structure.xlsx
+    python build_compact_vectors.py --check                      # 只比较已有精简表与完整模型
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+import docx
+import pandas as pd
+
+from process.add_vio_ass import preprocess_many, get_sentence_vector, cosine_similarity, SIMILARITY_THRESHOLD
+from process.tools.word_vectors import COMPACT_PATH, NATIVE_PATH, SOURCE_PATH, CompactVectors, get_model
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DB_BATCH_SIZE = 2000
+
+
+# ---- 语料 ----
+
+def docx_texts(folder):
+    """法规文件的各段文字"""
+    for file_name in sorted(os.listdir(folder)):
+        if not file_name.lower().endswith('.docx'):
+            continue
+        try:
+            doc = docx.Document(os.path.join(folder, file_name))
+        except Exception as e:
+            logger.error(f"无法读取DOCX文件 {file_name}: {str(e)}")
+            continue
+        for para in doc.paragraphs:
+            if para.text.strip():
+                yield para.text.strip()
+
+
+def database_texts():
+    """数据库中的条文文本与事由的描述、行为、违法行为"""
+    from app import create_app
+    from app.extensions import db
+    from app.models.regulation import LegalText, LegalCause
+
+    app = create_app()
+    with app.app_context():
+        queries = [
+            db.select(LegalText.content),
+            db.select(LegalCause.description, LegalCause.behavior, LegalCause.illegal_behavior),
+        ]
+        for query in queries:
+            for row in db.session.execute(query.execution_options(yield_per=DB_BATCH_SIZE)):
+                yield from (value for value in row if value)
+
+
+def excel_texts(file_path):
+    """process/ 输入表各工作表的 内容 列"""
+    for df in pd.read_excel(file_path, sheet_name=None).values():
+        if '内容' in df.columns:
+            yield from (str(value) for value in df['内容'].dropna())
+
+
+def collect_words(sentences):
+    """分词后出现过的词，按首次出现的顺序"""
+    words = {}
+    for tokens in preprocess_many(sentences):
+        words.update(dict.fromkeys(tokens))
+    return list(words)
+
+
+# ---- 核对 ----
+
+def sample_sentences(sentences, count, seed):
+    sentences = list(sentences)
+    random.Random(seed).shuffle(sentences)
+    return sentences[:count]
+
+
+def compare_similarities(sentences, full_model, compact_model):
+    """句子两两之间的相似度：返回 (最大绝对误差, 比较次数, 跨越 SIMILARITY_THRESHOLD 的次数)"""
+    tokens = preprocess_many(sentences)
+    full = [get_sentence_vector(words, full_model) for words in tokens]
+    compact = [get_sentence_vector(words, compact_model) for words in tokens]
+    max_error = 0.0
+    pairs = 0
+    flips = 0
+    for i in range(len(tokens)):
+        for j in range(i + 1, len(tokens)):
+            expected = cosine_similarity(full[i], full[j])
+            actual = cosine_similarity(compact[i], compact[j])
+            max_error = max(max_error, abs(float(expected) - float(actual)))
+            flips += (expected > SIMILARITY_THRESHOLD) != (actual > SIMILARITY_THRESHOLD)
+            pairs += 1
+    return max_error, pairs, flips
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按法规语料生成精简词向量表')
+    parser.add_argument('--laws', default='laws_folder', help='法规 DOCX 文件夹，空字符串表示不扫描')
+    parser.add_argument('--no-db', action='store_true', help='不读取数据库')
+    parser.add_argument('--excel', nargs='*', default=[], help='另外扫描的 process/ 输入表')
+    parser.add_argument('--target', default=COMPACT_PATH, help='精简表路径（生成 .npy 与 .vocab）')
+    parser.add_argument('--check', action='store_true', help='不生成，只比较已有精简表与完整模型')
+    parser.add_argument('--samples', type=int, default=300, help='核对时抽样的句子数')
+    args = parser.parse_args()
+
+    def texts():
+        if args.laws:
+            yield from docx_texts(args.laws)
+        if not args.no_db:
+            yield from database_texts()
+        for file_path in args.excel:
+            yield from excel_texts(file_path)
+
+    started = time.monotonic()
+    corpus = list(dict.fromkeys(texts()))
+    print(f"语料 {len(corpus)} 句（已去重），读取耗时 {time.monotonic() - started:.1f}s")
+
+    try:
+        full_model = get_model(NATIVE_PATH, SOURCE_PATH, compact_path='')
+    except FileNotFoundError:
+        print(f"未找到完整模型: {NATIVE_PATH} 或 {SOURCE_PATH}")
+        return 1
+
+    if args.check:
+        try:
+            compact_model = CompactVectors.load(args.target)
+        except FileNotFoundError:
+            print(f"未找到精简表: {args.target}")
+            return 1
+    else:
+        started = time.monotonic()
+        words = collect_words(corpus)
+        compact_model = CompactVectors.from_model(full_model, words)
+        compact_model.save(args.target)
+        print(f"分词得到 {len(words)} 个不同的词，模型收录 {len(compact_model)} 个"
+              f"（{len(compact_model.missing)} 个未收录），"
+              f"耗时 {time.monotonic() - started:.1f}s -> {args.target}")
+
+    print(f"向量矩阵: 完整模型 {len(full_model.index_to_key)} 词 {full_model.vectors.nbytes / 2 ** 20:.1f} MB，"
+          f"精简表 {len(compact_model)} 词 {compact_model.nbytes / 2 ** 20:.1f} MB "
+          f"({full_model.vectors.nbytes / max(compact_model.nbytes, 1):.0f}x)")
+
+    sentences = sample_sentences(corpus, args.samples, seed=0)
+    max_error, pairs, flips = compare_similarities(sentences, full_model, compact_model)
+    print(f"相似度核对: {len(sentences)} 句 {pairs} 对，最大误差 {max_error:.2e}，"
+          f"{flips} 对在阈值 {SIMILARITY_THRESHOLD} 两侧不一致")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+法律用语词典生成脚本
+从已有的语料中收集法规名称与法律用语，写成 jieba 用户词典（每行 "词 词频 词性"），
+供 process/tools/tokenizer.py 加载（默认 process/legal_dict.txt），使法规名称、处罚种类等不再被切碎：
+    法规名称      data/law_info.xlsx 的 法规名称、laws_folder 的文件名、数据库中的法规（nz）
+    制定机关      data/law_info.xlsx 的 制定机关、数据库中的法规（nt）
+    处罚种类等    data/law_punish.xlsx 的 处罚类型、行政行为，数据库中的处罚类型，以及 LEGAL_TERMS（nz）
+词频取 jieba 默认词典下恰好不被切开的值。更换词典后分词结果改变，需重新运行 build_compact_vectors.py。
+
+用法：
+    python build_legal_dict.py                     # data/ + laws_folder + 数据库
+    python build_legal_dict.py --no-db --target /tmp/legal_dict.txt
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+
+import jieba
+import pandas as pd
+
+from process.tools.tokenizer import USER_DICT_PATH
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# process/ 中识别处罚、措施所用的用语（见 add_evidence.py、export_cause.py、process_penalty_*.py）
+LEGAL_TERMS = [
+    '行政处罚', '行政处分', '行政措施', '行政许可', '行政复议', '行政诉讼',
+    '罚款', '警告', '通报批评', '没收违法所得', '没收非法财物', '违法所得', '非法财物',
+    '责令改正', '责令限期改正', '责令停产停业', '责令停业整顿', '责令停止', '责令关闭',
+    '暂扣', '吊销许可证', '吊销许可证件', '吊销营业执照', '营业执照',
+    '资格证书', '资质证书', '情节严重', '逾期不改正', '直接负责的主管人员', '其他直接责任人员',
+]
+
+YEAR_SUFFIX = re.compile(r'[（(]\d{4}[）)]$')
+
+
+def clean(name):
+    """去掉空白、书名号与末尾的年份"""
+    name = re.sub(r'\s+', '', str(name)).strip('《》')
+    return YEAR_SUFFIX.sub('', name)
+
+
+def folder_names(folder):
+    """laws_folder 中法规文件的名称"""
+    for file_name in sorted(os.listdir(folder)):
+        if file_name.lower().endswith('.docx'):
+            yield clean(file_name[:-len('.docx')])
+
+
+def excel_column(file_path, column):
+    df = pd.read_excel(file_path)
+    if column not in df.columns:
+        logger.warning(f"{file_path} 中没有 {column} 列")
+        return []
+    return [clean(value) for value in df[column].dropna()]
+
+
+def database_words():
+    """数据库中的 (法规名称, 制定机关, 处罚类型)"""
+    from app import create_app
+    from app.extensions import db
+    from app.models.regulation import LegalRegulation, LegalPunishment
+
+    app = create_app()
+    with app.app_context():
+        regulations = db.session.execute(db.select(LegalRegulation.name, LegalRegulation.issuing_authority)).all()
+        punishments = db.session.scalars(db.select(LegalPunishment.punishment_type).distinct()).all()
+    return ([clean(name) for name, _ in regulations if name],
+            [clean(authority) for _, authority in regulations if authority],
+            [clean(value) for value in punishments if value])
+
+
+def dictionary_lines(groups):
+    """
+    groups: [(词性, 词列表)]；每个词只取第一次出现
+    单字、纯数字以及含书名号、顿号等（jieba 会在这些字符处断开）的词跳过
+    """
+    tokenizer = jieba.Tokenizer()
+    tokenizer.initialize()
+    seen = set()
+    lines = []
+    for tag, words in groups:
+        for word in words:
+            if len(word) < 2 or word.isdigit() or word in seen or not jieba.re_han_default.fullmatch(word):
+                continue
+            seen.add(word)
+            lines.append(f"{word} {tokenizer.suggest_freq(word, tune=False)} {tag}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='从法规名称与法律用语生成 jieba 用户词典')
+    parser.add_argument('--info', default='data/law_info.xlsx', help='法规基础信息表，空字符串表示不读取')
+    parser.add_argument('--punish', default='data/law_punish.xlsx', help='处罚表，空字符串表示不读取')
+    parser.add_argument('--laws', default='laws_folder', help='法规 DOCX 文件夹，空字符串表示不扫描')
+    parser.add_argument('--no-db', action='store_true', help='不读取数据库')
+    parser.add_argument('--target', default=USER_DICT_PATH, help='词典路径')
+    args = parser.parse_args()
+
+    names, authorities, terms = [], [], []
+    if args.info:
+        names += excel_column(args.info, '法规名称')
+        authorities += excel_column(args.info, '制定机关')
+    if args.laws:
+        names += folder_names(args.laws)
+    if args.punish:
+        terms += excel_column(args.punish, '处罚类型') + excel_column(args.punish, '行政行为')
+    if not args.no_db:
+        db_names, db_authorities, db_terms = database_words()
+        names += db_names
+        authorities += db_authorities
+        terms += db_terms
+
+    lines = dictionary_lines([('nz', names), ('nt', authorities), ('nz', LEGAL_TERMS + terms)])
+    with open(args.target, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    print(f"已写入 {len(lines)} 个词 -> {args.target}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+中文数字表检查脚本
+对 process/tools/chinese_numerals 的数字表做穷举核对：表中每一种写法（含括号写法）都与逐位计算的结果一致，
+1–MAX_NUMBER 每个数的规范写法都能查回原数（含括号写法），且不同的数没有相同的写法。
+有任何不一致时返回非零退出码，可用于持续集成；修改数字表的生成规则后运行一次。
+
+用法：
+    python check_chinese_numerals.py
+"""
+import sys
+
+from process.tools.chinese_numerals import (
+    CHINESE_NUMERALS, BRACKETS, MAX_NUMBER, _forms, chinese_to_int, int_to_chinese
+)
+
+REFERENCE_DIGITS = {'零': 0, '〇': 0, '一': 1, '二': 2, '两': 2, '三': 3, '四': 4,
+                    '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+REFERENCE_UNITS = {'十': 10, '百': 100, '千': 1000}
+
+
+def reference_value(text):
+    """逐位计算中文数字的值，作为核对的基准"""
+    if text[0] in BRACKETS and BRACKETS[text[0]] == text[-1]:
+        text = text[1:-1]
+    total, digit = 0, None
+    for char in text:
+        if char in REFERENCE_DIGITS:
+            digit = REFERENCE_DIGITS[char]
+        else:
+            total += (1 if digit is None else digit) * REFERENCE_UNITS[char]
+            digit = None
+    return total + (digit or 0)
+
+
+def check_table():
+    """返回发现的错误说明列表"""
+    errors = []
+    for text, number in CHINESE_NUMERALS.items():
+        if reference_value(text) != number:
+            errors.append(f"{text} -> {number}，逐位计算为 {reference_value(text)}")
+    forms = [form for number in range(1, MAX_NUMBER + 1) for form in _forms(number)]
+    if len(set(forms)) != len(forms):
+        errors.append('存在对应多个数的写法')
+    if len(CHINESE_NUMERALS) != len(forms) * (1 + len(BRACKETS)):
+        errors.append(f'数字表大小 {len(CHINESE_NUMERALS)} 与写法数 {len(forms)} 不符')
+    for number in range(1, MAX_NUMBER + 1):
+        text = int_to_chinese(number)
+        if chinese_to_int(text) != number:
+            errors.append(f"{number} 的规范写法 {text} 查回 {chinese_to_int(text)}")
+        for opening, closing in BRACKETS.items():
+            if chinese_to_int(f'{opening}{text}{closing}') != number:
+                errors.append(f"{opening}{text}{closing} 查不到 {number}")
+    return errors
+
+
+def main():
+    errors = check_table()
+    print(f"数字表: {len(CHINESE_NUMERALS)} 种写法，覆盖 1–{MAX_NUMBER}，{len(errors)} 处错误")
+    for error in errors[:10]:
+        print(f"  {error}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+页面查询数检查脚本
+在 TestingConfig（内存库，MAX_QUERIES_PER_REQUEST 生效）下建表并写入一组示例数据，
+依次请求首页、列表、详情、检索等主要页面；任一页面触发 QueryLimitExceeded 或返回错误时
+返回非零退出码，可用于持续集成，发现模板或视图里的逐行查询（N+1）。
+
+用法：
+    python check_page_queries.py
+    python check_page_queries.py --regulations 30 --causes 5
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from flask import g
+
+from app import create_app
+from app.extensions import db
+from app.models import (
+    LegalRegulation, LegalRegulationVersion, LegalStructure, LegalCause, LegalPunishment
+)
+from app.services.query_guard import QueryLimitExceeded
+from app.services.search import create_search_table
+
+LEVEL = '行政法规'
+
+
+def seed(regulations, articles, causes):
+    """写入示例法规：每部两个版本，每个版本若干条文、事由与处罚"""
+    for number in range(1, regulations + 1):
+        regulation = LegalRegulation(name=f'示例法规{number}', hierarchy_level=LEVEL,
+                                     issuing_authority='国务院', publish_date=datetime(2020, 1, number % 28 + 1))
+        db.session.add(regulation)
+        db.session.flush()
+        for year in (2020, 2024):
+            version = LegalRegulationVersion(regulation_id=regulation.id, version_number=f'{year}年版',
+                                             effective_date=datetime(year, 1, 1))
+            db.session.add(version)
+            db.session.flush()
+            regulation.current_version_id = version.id
+            for article in range(1, articles + 1):
+                db.session.add(LegalStructure(
+                    regulation_id=regulation.id, version_id=version.id, article=article,
+                    content=f'第{article}条 生产经营单位应当遵守安全生产规定（{year}年）'))
+            for index in range(1, causes + 1):
+                cause = LegalCause(
+                    regulation_id=regulation.id, version_id=version.id, code=f'{number}-{year}-{index}',
+                    description=f'未按照规定开展安全生产教育培训{index}',
+                    violation_type='违反安全生产规定', violation_clause=f'第{index}条',
+                    penalty_type='行政处罚', penalty_clause=f'第{articles}条')
+                db.session.add(cause)
+                db.session.flush()
+                db.session.add(LegalPunishment(cause_id=cause.id, punishment_type='罚款',
+                                               punishment_details='处一万元以下罚款'))
+    db.session.commit()
+
+
+def pages(regulation, version_ids, cause_id):
+    """要检查的页面"""
+    return {
+        '首页': '/',
+        '法规搜索': '/search/regulations',
+        '法规搜索-关键词': '/search/regulations?keyword=示例',
+        '位阶列表': f'/regulations/level/{LEVEL}',
+        '全文检索': '/search/fulltext?q=安全生产',
+        '法规详情': f'/regulations/{regulation.id}',
+        '法规统计': f'/regulations/{regulation.id}/stats',
+        '版本比较': f'/regulations/{regulation.id}/compare?old={version_ids[0]}&new={version_ids[-1]}',
+        '某日施行的版本': '/versions/effective?date=2021-06-01&regulation_id=1&regulation_id=2&include=structures',
+        '事由详情': f'/causes/{cause_id}',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查主要页面的查询数是否超过 MAX_QUERIES_PER_REQUEST')
+    parser.add_argument('--regulations', type=int, default=15, help='示例法规数（多于一页）')
+    parser.add_argument('--articles', type=int, default=10, help='每个版本的条文数')
+    parser.add_argument('--causes', type=int, default=3, help='每个版本的事由数')
+    args = parser.parse_args()
+
+    app = create_app('config.TestingConfig')
+    limit = app.config['MAX_QUERIES_PER_REQUEST']
+    failures = []
+    counts = {}
+
+    @app.after_request
+    def record_query_count(response):
+        # 在查询数检查之前执行（after_request 按注册的相反顺序调用）
+        counts['last'] = g.get('query_count', 0)
+        return response
+
+    with app.app_context():
+        db.create_all()
+        create_search_table()
+        seed(args.regulations, args.articles, args.causes)
+        regulation = LegalRegulation.query.order_by(LegalRegulation.id).first()
+        version_ids = [version.id for version in LegalRegulationVersion.query.filter_by(
+            regulation_id=regulation.id).order_by(LegalRegulationVersion.effective_date)]
+        cause_id = LegalCause.query.filter_by(regulation_id=regulation.id).first().id
+        targets = pages(regulation, version_ids, cause_id)
+
+    client = app.test_client()
+    for name, url in targets.items():
+        counts.pop('last', None)
+        try:
+            response = client.get(url)
+        except QueryLimitExceeded as e:
+            print(f"[超出上限] {name}: {e}")
+            failures.append(name)
+            continue
+        except Exception as e:
+            print(f"[出错] {name}: {type(e).__name__}: {e}")
+            failures.append(name)
+            continue
+        if response.status_code >= 400:
+            print(f"[HTTP {response.status_code}] {name}: {url}")
+            failures.append(name)
+        else:
+            print(f"[正常] {name}: {counts.get('last', 0)} 条查询  {url}")
+
+    if failures:
+        print(f"\n共 {len(failures)} 个页面未通过（上限 {limit} 条查询）: {', '.join(failures)}")
+        return 1
+    print(f"\n所有页面的查询数均未超过 {limit} 条")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+查询计划检查脚本
+对页面与导入脚本中的常用查询执行 EXPLAIN QUERY PLAN，
+若 legal_* 表出现全表扫描（SCAN 且未使用索引）则返回非零退出码，可用于持续集成。
+
+用法：
+    python check_query_plans.py            # 检查 DATABASE_URL 指向的数据库
+    python check_query_plans.py --memory   # 在内存库中按当前模型建表后检查
+"""
+import argparse
+import sys
+from datetime import datetime
+from sqlalchemy import text, select, func
+
+from app import create_app
+from app.extensions import db
+from app.models import (
+    LegalRegulation, LegalRegulationVersion, LegalStructure, LegalCause,
+    LegalPunishment, LegalStructureCauseLink
+)
+from app.services.clause_lookup import TARGETS_STATEMENT
+
+
+def representative_queries():
+    """与视图、导出、导入中查询形态一致的语句"""
+    regulation_id, version_id, cause_id = 1, 1, 1
+    return {
+        '法规详情-条文': LegalStructure.query.filter(
+            LegalStructure.regulation_id == regulation_id,
+            LegalStructure.version_id == version_id
+        ).order_by(LegalStructure.path_key),
+        '条文-按条范围': LegalStructure.query.filter(
+            LegalStructure.regulation_id == regulation_id,
+            LegalStructure.version_id == version_id,
+            LegalStructure.within(12)
+        ).order_by(LegalStructure.path_key),
+        '条文-精确定位': LegalStructure.query.filter(
+            LegalStructure.regulation_id == regulation_id,
+            LegalStructure.version_id == version_id,
+            LegalStructure.at(12, 3, 2)
+        ),
+        '法规详情-事由': LegalCause.query.filter(
+            LegalCause.regulation_id == regulation_id,
+            LegalCause.version_id == version_id
+        ).order_by(LegalCause.code),
+        '法规详情-条文关联': db.session.query(LegalStructureCauseLink, LegalCause).join(
+            LegalCause, LegalStructureCauseLink.cause_id == LegalCause.id
+        ).filter(
+            LegalStructureCauseLink.regulation_id == regulation_id,
+            LegalStructureCauseLink.version_id == version_id
+        ),
+        '法规版本列表': LegalRegulationVersion.query.filter_by(
+            regulation_id=regulation_id
+        ).order_by(LegalRegulationVersion.revision_date.desc()),
+        '导入-按版本号查找版本': LegalRegulationVersion.query.filter_by(
+            regulation_id=regulation_id, version_number='2024年版'
+        ),
+        '导入-按施行日期排序版本': LegalRegulationVersion.query.filter_by(
+            regulation_id=regulation_id
+        ).order_by(LegalRegulationVersion.effective_date.desc()),
+        '某日施行的版本': LegalRegulationVersion.query.filter(
+            LegalRegulationVersion.regulation_id == regulation_id,
+            LegalRegulationVersion.effective_date <= datetime(2021, 6, 1),
+            db.or_(LegalRegulationVersion.effective_until.is_(None),
+                   LegalRegulationVersion.effective_until > datetime(2021, 6, 1))
+        ),
+        '导入-按名称查找法规': LegalRegulation.query.filter_by(name='示例法规'),
+        '导入-清除版本条文': LegalStructure.query.filter_by(
+            regulation_id=regulation_id, version_id=version_id
+        ),
+        '导入-清除版本事由': LegalCause.query.filter_by(
+            regulation_id=regulation_id, version_id=version_id
+        ),
+        '位阶列表': LegalRegulation.query.filter_by(
+            hierarchy_level='法律'
+        ).order_by(LegalRegulation.publish_date.desc()),
+        '事由处罚': LegalPunishment.query.filter_by(cause_id=cause_id),
+        '导入-清除版本处罚': LegalPunishment.query.filter_by(
+            regulation_id=regulation_id, version_id=version_id
+        ),
+        '导出-处罚表': db.session.query(LegalPunishment, LegalCause).join(
+            LegalCause, LegalPunishment.cause_id == LegalCause.id
+        ).filter(
+            LegalPunishment.regulation_id == regulation_id,
+            LegalPunishment.version_id == version_id
+        ),
+        '计数-处罚汇总': select(LegalPunishment.version_id, func.count(LegalPunishment.id)).where(
+            LegalPunishment.regulation_id == regulation_id
+        ).group_by(LegalPunishment.version_id),
+        '统计-处罚': LegalPunishment.query.filter_by(regulation_id=regulation_id),
+        '条款引用-批量取条文': TARGETS_STATEMENT.params(targets='[[1, 1, 12000000000, 12999999999]]'),
+    }
+
+
+def full_scans(plan_rows):
+    """找出计划中对 legal_* 表的全表扫描"""
+    scans = []
+    for row in plan_rows:
+        detail = row[-1]
+        if not detail.startswith('SCAN '):
+            continue
+        table = detail.split()[1]
+        if table.startswith('legal_') and 'INDEX' not in detail:
+            scans.append(detail)
+    return scans
+
+
+def check_query_plans():
+    """逐条检查查询计划，返回存在全表扫描的查询"""
+    dialect = db.engine.dialect
+    failures = {}
+    for name, query in representative_queries().items():
+        statement = getattr(query, 'statement', query)
+        sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+        plan = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).fetchall()
+        scans = full_scans(plan)
+        status = '全表扫描' if scans else '正常'
+        print(f"[{status}] {name}")
+        for row in plan:
+            print(f"    {row[-1]}")
+        if scans:
+            failures[name] = scans
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查常用查询是否使用索引')
+    parser.add_argument('--memory', action='store_true', help='使用内存数据库按当前模型建表后检查')
+    args = parser.parse_args()
+
+    app = create_app('config.TestingConfig' if args.memory else 'config.Config')
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            print('仅支持 SQLite 数据库')
+            return 1
+        if args.memory:
+            db.create_all()
+        failures = check_query_plans()
+
+    if failures:
+        print(f"\n共 {len(failures)} 条查询出现全表扫描: {', '.join(failures)}")
+        return 1
+    print('\n所有查询均使用索引')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+法规版本比较脚本
+按位置与文本哈希比较法规两个版本的条文（规则见 app/services/version_diff.py），
+结果缓存在数据库中，版本内容未变化时再次比较直接读取缓存。
+
+用法：
+    python compare_versions.py 12 3 5               # 比较法规 12 的版本 3 与版本 5
+    python compare_versions.py 中华人民共和国安全生产法 2014年版 2021年版
+    python compare_versions.py 12 3 5 --text        # 同时输出条文文本
+    python compare_versions.py 12 3 5 --json        # 输出 JSON
+"""
+import argparse
+import json
+import sys
+
+from app import create_app
+from app.extensions import db
+from app.models import LegalRegulation, LegalRegulationVersion
+from app.services.search import format_anchor
+from app.services.version_diff import STATUS_LABELS, diff_versions, attach_texts
+
+
+def find_regulation(value):
+    if value.isdigit():
+        return LegalRegulation.query.get(int(value))
+    return LegalRegulation.query.filter_by(name=value).first()
+
+
+def find_version(regulation, value):
+    query = LegalRegulationVersion.query.filter_by(regulation_id=regulation.id)
+    version = query.filter_by(version_number=value).first()
+    if version is None and value.isdigit():
+        version = query.filter_by(id=int(value)).first()
+    return version
+
+
+def describe(position):
+    anchor = format_anchor(position['article'], position['paragraph'], position['item'], position['section'])
+    return anchor or f"条文 {position['structure_id']}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比较法规两个版本的条文')
+    parser.add_argument('regulation', help='法规ID或名称')
+    parser.add_argument('old', help='旧版本ID或版本号')
+    parser.add_argument('new', help='新版本ID或版本号')
+    parser.add_argument('--text', action='store_true', help='输出条文文本')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出比较结果')
+    parser.add_argument('--no-cache', action='store_true', help='忽略并且不写入缓存')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        regulation = find_regulation(args.regulation)
+        if regulation is None:
+            print(f"未找到法规: {args.regulation}")
+            return 1
+        versions = []
+        for value in (args.old, args.new):
+            version = find_version(regulation, value)
+            if version is None:
+                print(f"法规 {regulation.name} 没有版本: {value}")
+                return 1
+            versions.append(version)
+        old_version, new_version = versions
+
+        result = diff_versions(regulation.id, old_version.id, new_version.id, use_cache=not args.no_cache)
+        db.session.commit()
+        if args.text:
+            attach_texts(result['changes'])
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+            return 0
+
+        print(f"{regulation.name}: {old_version.version_number} -> {new_version.version_number}")
+        print('，'.join(f"{STATUS_LABELS[status]} {count}" for status, count in result['summary'].items()))
+        for change in result['changes']:
+            old, new = change['old'], change['new']
+            if change['status'] == 'renumbered':
+                line = f"{describe(old)} -> {describe(new)}"
+            else:
+                line = describe(new or old)
+            print(f"[{STATUS_LABELS[change['status']]}] {line}")
+            if args.text:
+                if old and change['status'] != 'renumbered':
+                    print(f"    - {old['content']}")
+                if new:
+                    print(f"    + {new['content']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
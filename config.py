@@ -9,6 +9,22 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///data.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # SQLite 连接参数，每个连接建立时通过 PRAGMA 设置
+    SQLITE_PRAGMAS = {
+        'foreign_keys': 'ON',
+        'busy_timeout': 5000,  # 毫秒，锁被占用时等待而非立即报 database is locked
+    }
+    # 写事务经单写入者队列排队（见 app/services/write_queue.py）
+    SQLITE_SERIALIZE_WRITES = True
+    SQLITE_WRITE_LOCK_TIMEOUT = 300  # 秒
+    # 每个 worker 使用内存只读副本（见 app/services/read_replica.py），设置 SQLITE_READ_REPLICA=1 开启
+    SQLITE_READ_REPLICA = os.environ.get('SQLITE_READ_REPLICA', '').lower() in ('1', 'true')
+    SQLITE_REPLICA_MIN_INTERVAL = 5  # 秒，两次刷新副本的最短间隔
+    
+    # 为 True 时 create_app 即初始化 jieba 分词器与法律用语词典（见 process/tools/tokenizer.py），
+    # 只在 web worker 使用的 ProductionConfig 中开启；脚本与测试在首次分词时再初始化
+    TOKENIZER_EAGER_INIT = False
+    
     # Flask-Admin配置
     FLASK_ADMIN_SWATCH = 'cerulean'
 
@@ -20,7 +36,22 @@ class DevelopmentConfig(Config):
 
 class ProductionConfig(Config):
     DEBUG = False
+    
+    # 多 worker 部署：WAL 模式下读写互不阻塞
+    SQLITE_PRAGMAS = {
+        **Config.SQLITE_PRAGMAS,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # WAL 模式下仅检查点时同步，断电最多丢失最近的事务
+        'mmap_size': 268435456,  # 256MB
+        'cache_size': -65536,  # 负数单位为 KB，即 64MB
+        'busy_timeout': 30000,
+    }
+    
+    # worker 启动时即构建前缀词典，避免第一次处理时才构建
+    TOKENIZER_EAGER_INIT = True
 
 class TestingConfig(Config):
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
\ No newline at end of file
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # 单个请求超过该查询数即失败，用于发现逐行懒加载
+    MAX_QUERIES_PER_REQUEST = 60
\ No newline at end of file
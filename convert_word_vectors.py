@@ -0,0 +1,48 @@
+"""
+词向量模型转换脚本
+将 process/AILab.bin（word2vec 二进制格式）转换为 gensim 原生格式，向量矩阵单独保存为 .npy，
+之后 add_vio_ass 以内存映射方式加载（见 process/tools/word_vectors.py）。更换模型文件后重新运行一次。
+
+用法：
+    python convert_word_vectors.py                                   # 默认路径
+    python convert_word_vectors.py --source AILab.bin --target process/AILab.kv
+    python convert_word_vectors.py --check                           # 只检查转换结果能否映射加载
+"""
+import argparse
+import logging
+import sys
+import time
+
+from process.tools.word_vectors import NATIVE_PATH, SOURCE_PATH, convert_model, get_model
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='将词向量模型转换为可内存映射的格式')
+    parser.add_argument('--source', default=SOURCE_PATH, help='word2vec 二进制模型')
+    parser.add_argument('--target', default=NATIVE_PATH, help='转换后的模型路径（另生成 .vectors.npy）')
+    parser.add_argument('--check', action='store_true', help='不转换，只计时映射加载')
+    args = parser.parse_args()
+
+    if not args.check:
+        try:
+            words = convert_model(args.source, args.target)
+        except FileNotFoundError:
+            print(f"未找到模型文件: {args.source}")
+            return 1
+        print(f"转换完成: {words} 个词 -> {args.target}")
+
+    started = time.monotonic()
+    try:
+        model = get_model(args.target, source_path='', compact_path='')
+    except FileNotFoundError:
+        print(f"未找到转换后的模型: {args.target}")
+        return 1
+    print(f"映射加载耗时 {time.monotonic() - started:.2f}s，向量矩阵 {type(model.vectors).__name__} "
+          f"{model.vectors.shape}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,7 @@
 4. 根据sheet名称中的年份（如"中华人民共和国统计法（2024）"中的2024）确认版本
 5. 保留旧数据并与旧版本关联
 6. 版本排序以施行时间为准
+7. 默认按法规批量写入（整列转换 + Core 批量插入），--orm 保留逐行ORM导入方式
 """
 import pandas as pd
 from sqlalchemy.exc import SQLAlchemyError
@@ -15,6 +16,16 @@ from sqlalchemy.exc import SQLAlchemyError
 from app import create_app
 from app.extensions import db
 from app.models.regulation import LegalRegulation, LegalRegulationVersion, LegalStructure, LegalCause, LegalPunishment
+from sqlalchemy import select
+from app.services.cross_reference import rebuild_cause_links, rebuild_all_cause_links
+from app.services.counters import rebuild_all_counters
+from app.services.search import rebuild_search_index
+from app.services.maintenance import analyze_database
+from app.services.bulk_loader import (
+    frame_to_records, bulk_insert, clear_version_structures, clear_version_causes,
+    clear_version_punishments, after_bulk_write
+)
+from app.services.texts import store_structure_texts, prune_unused_texts
 
 import logging
 from datetime import datetime
@@ -159,7 +170,114 @@ def get_or_create_version(regulation, version_year):
     db.session.flush()
     return version
 
-def import_regulations_structures(structure_file):
+# 批量导入时 Excel 列与字段的对应关系：{字段: (列名, 类型, 空值默认值)}
+STRUCTURE_SPEC = {
+    'article': ('条', 'int', None),
+    'paragraph': ('款', 'int', None),
+    'item': ('项', 'int', None),
+    'section': ('目', 'int', None),
+    'content': ('内容', 'str', ''),
+    'original_text': ('原条款', 'str', None),
+}
+
+CAUSE_SPEC = {
+    'code': ('编号', 'str', ''),
+    'description': ('事由', 'str', ''),
+    'violation_type': ('违则', 'str', None),
+    'violation_clause': ('违则条款', 'str', None),
+    'behavior': ('行为', 'str', None),
+    'illegal_behavior': ('违法行为', 'str', None),
+    'penalty_type': ('罚则', 'str', None),
+    'penalty_clause': ('罚则条款', 'str', None),
+}
+
+PUNISHMENT_SPEC = {
+    'cause_id': ('事由ID', 'int', None),
+    'circumstance': ('情形', 'str', None),
+    'punishment_type': ('处罚类型', 'str', None),
+    'progressive_punishment': ('递进处罚', 'str', None),
+    'industry': ('行业', 'str', None),
+    'subject_level': ('主体级别', 'str', None),
+    'punishment_target': ('处罚对象', 'str', None),
+    'punishment_details': ('处罚明细', 'str', None),
+    'additional_notes': ('行政行为', 'str', None),
+}
+
+def finish_bulk_import(regulation, version, step_id):
+    """批量导入单个法规后重建关联、登记计数与索引刷新，并提交事务"""
+    rebuild_cause_links(regulation.id, version.id)
+    version.step_id = step_id
+    after_bulk_write([regulation.id])
+    db.session.commit()
+
+def bulk_import_structures(regulation, version, df_structure):
+    """批量导入单个法规版本的条文（一个事务），返回导入条数"""
+    deleted = clear_version_structures(regulation.id, version.id)
+    if deleted:
+        logger.info(f"已清除法规 {regulation.name} 的 {deleted} 条旧条文")
+    
+    records, skipped = frame_to_records(df_structure, STRUCTURE_SPEC, {
+        'regulation_id': regulation.id,
+        'version_id': version.id
+    })
+    if skipped:
+        logger.warning(f"法规 {regulation.name} 有 {skipped} 行条文的条款号无法解析，已跳过")
+    bulk_insert(LegalStructure, store_structure_texts(records))
+    
+    finish_bulk_import(regulation, version, 2)
+    return len(records)
+
+def bulk_import_causes(regulation, version, df_cause):
+    """批量导入单个法规版本的事由（一个事务），返回导入条数"""
+    deleted = clear_version_causes(regulation.id, version.id)
+    if deleted:
+        logger.info(f"已清除法规 {regulation.name} 的 {deleted} 条旧事由")
+    
+    records, _ = frame_to_records(df_cause, CAUSE_SPEC, {
+        'regulation_id': regulation.id,
+        'version_id': version.id,
+        'severity': '一般'
+    })
+    bulk_insert(LegalCause, records)
+    
+    finish_bulk_import(regulation, version, 3)
+    return len(records)
+
+def bulk_import_punishments(regulation, version, df_punishment):
+    """批量导入单个法规版本的处罚（一个事务），返回导入条数；没有事由时返回 None"""
+    cause_ids = dict(db.session.execute(
+        select(LegalCause.code, LegalCause.id).where(
+            LegalCause.regulation_id == regulation.id,
+            LegalCause.version_id == version.id
+        )
+    ).all())
+    if not cause_ids:
+        return None
+    
+    deleted = clear_version_punishments(regulation.id, version.id)
+    if deleted:
+        logger.info(f"已清除法规 {regulation.name} 的 {deleted} 条旧处罚")
+    
+    # 按事由编号匹配事由
+    if '编号' in df_punishment.columns:
+        codes = df_punishment['编号'].astype(str).where(df_punishment['编号'].notna())
+    else:
+        codes = pd.Series(None, index=df_punishment.index, dtype=object)
+    matched_ids = codes.map(cause_ids)
+    for cause_code in codes[matched_ids.isna()]:
+        logger.warning(f"法规 {regulation.name}: 未找到编号为 {cause_code if pd.notna(cause_code) else None} 的事由")
+    
+    records, _ = frame_to_records(
+        df_punishment[matched_ids.notna()].assign(事由ID=matched_ids[matched_ids.notna()]),
+        PUNISHMENT_SPEC,
+        {'regulation_id': regulation.id, 'version_id': version.id}
+    )
+    bulk_insert(LegalPunishment, records)
+    
+    finish_bulk_import(regulation, version, 4)
+    return len(records)
+
+def import_regulations_structures(structure_file, use_bulk=True):
     try:
         xls_structure = pd.ExcelFile(structure_file)
         regulation_names = xls_structure.sheet_names
@@ -182,29 +300,22 @@ def import_regulations_structures(structure_file):
                 
                 version = get_or_create_version(regulation, version_year)
                 
+                if use_bulk:
+                    try:
+                        structure_count = bulk_import_structures(regulation, version, xls_structure.parse(sheet_name))
+                    except Exception:
+                        db.session.rollback()
+                        raise
+                    regulation_count += 1
+                    total_structure_count += structure_count
+                    logger.info(f"成功导入法规 {sheet_name} 的 {structure_count} 条条文")
+                    continue
+                
                 # 清除该版本的现有条文
-                existing_structures = LegalStructure.query.filter_by(
-                    regulation_id=regulation.id,
-                    version_id=version.id
-                ).all()
-                if existing_structures:
-                    for structure in existing_structures:
-                        db.session.delete(structure)
+                deleted = clear_version_structures(regulation.id, version.id)
+                if deleted:
                     db.session.commit()
-                    logger.info(f"已清除法规 {sheet_name} 的 {len(existing_structures)} 条旧条文")
-                
-                # 将旧版本的条文关联到最近的 superseded 版本
-                old_versions = LegalRegulationVersion.query.filter(
-                    LegalRegulationVersion.regulation_id == regulation.id,
-                    LegalRegulationVersion.status == 'superseded'
-                ).order_by(LegalRegulationVersion.revision_date.desc()).all()
-                if old_versions:
-                    old_structures = LegalStructure.query.filter(
-                        LegalStructure.regulation_id == regulation.id,
-                        LegalStructure.version_id.is_(None)
-                    ).all()
-                    for structure in old_structures:
-                        structure.version_id = old_versions[0].id
+                    logger.info(f"已清除法规 {sheet_name} 的 {deleted} 条旧条文")
                 
                 df_structure = pd.read_excel(structure_file, sheet_name=sheet_name)
                 structure_count = 0
@@ -226,6 +337,10 @@ def import_regulations_structures(structure_file):
                     except Exception as e:
                         logger.warning(f"处理法规 {sheet_name} 的条文时出错: {str(e)}")
                 
+                # 重建条文与事由的关联
+                db.session.flush()
+                rebuild_cause_links(regulation.id, version.id)
+                
                 # 更新 step_id 为 2
                 version.step_id = 2
                 
@@ -249,7 +364,7 @@ def import_regulations_structures(structure_file):
         logger.error(f"导入法规条文时出错: {str(e)}")
         raise
 
-def import_regulations_causes(cause_file):
+def import_regulations_causes(cause_file, use_bulk=True):
     try:
         xls_cause = pd.ExcelFile(cause_file)
         regulation_names = xls_cause.sheet_names
@@ -274,29 +389,22 @@ def import_regulations_causes(cause_file):
                 
                 version = get_or_create_version(regulation, version_year)
                 
-                # 清除该版本的现有事由
-                existing_causes = LegalCause.query.filter_by(
-                    regulation_id=regulation.id,
-                    version_id=version.id
-                ).all()
-                if existing_causes:
-                    for cause in existing_causes:
-                        db.session.delete(cause)
-                    db.session.commit()
-                    logger.info(f"已清除法规 {sheet_name} 的 {len(existing_causes)} 条旧事由")
+                if use_bulk:
+                    try:
+                        cause_count = bulk_import_causes(regulation, version, xls_cause.parse(sheet_name))
+                    except Exception:
+                        db.session.rollback()
+                        raise
+                    regulation_count += 1
+                    total_cause_count += cause_count
+                    logger.info(f"成功导入法规 {sheet_name} 的 {cause_count} 条事由")
+                    continue
                 
-                # 将旧版本的事由关联到最近的 superseded 版本
-                old_versions = LegalRegulationVersion.query.filter(
-                    LegalRegulationVersion.regulation_id == regulation.id,
-                    LegalRegulationVersion.status == 'superseded'
-                ).order_by(LegalRegulationVersion.revision_date.desc()).all()
-                if old_versions:
-                    old_causes = LegalCause.query.filter(
-                        LegalCause.regulation_id == regulation.id,
-                        LegalCause.version_id.is_(None)
-                    ).all()
-                    for cause in old_causes:
-                        cause.version_id = old_versions[0].id
+                # 清除该版本的现有事由（处罚随之级联删除）
+                deleted = clear_version_causes(regulation.id, version.id)
+                if deleted:
+                    db.session.commit()
+                    logger.info(f"已清除法规 {sheet_name} 的 {deleted} 条旧事由")
                 
                 df_cause = pd.read_excel(cause_file, sheet_name=sheet_name)
                 cause_count = 0
@@ -321,6 +429,10 @@ def import_regulations_causes(cause_file):
                     except Exception as e:
                         logger.warning(f"处理法规 {sheet_name} 的事由时出错: {str(e)}")
                 
+                # 重建条文与事由的关联
+                db.session.flush()
+                rebuild_cause_links(regulation.id, version.id)
+                
                 # 更新 step_id 为 3
                 version.step_id = 3
                 
@@ -344,7 +456,7 @@ def import_regulations_causes(cause_file):
         logger.error(f"导入法规事由时出错: {str(e)}")
         raise
 
-def import_regulations_punishments(punishment_file):
+def import_regulations_punishments(punishment_file, use_bulk=True):
     try:
         xls_punishment = pd.ExcelFile(punishment_file)
         regulation_names = xls_punishment.sheet_names
@@ -367,6 +479,20 @@ def import_regulations_punishments(punishment_file):
                 
                 version = get_or_create_version(regulation, version_year)
                 
+                if use_bulk:
+                    try:
+                        punishment_count = bulk_import_punishments(regulation, version, xls_punishment.parse(sheet_name))
+                    except Exception:
+                        db.session.rollback()
+                        raise
+                    if punishment_count is None:
+                        logger.warning(f"法规 {sheet_name} 没有对应版本的事由信息，请先导入事由")
+                        continue
+                    regulation_count += 1
+                    total_punishment_count += punishment_count
+                    logger.info(f"成功导入法规 {sheet_name} 的 {punishment_count} 条处罚")
+                    continue
+                
                 causes = LegalCause.query.filter_by(regulation_id=regulation.id, version_id=version.id).all()
                 cause_dict = {cause.code: cause for cause in causes}
                 
@@ -375,25 +501,10 @@ def import_regulations_punishments(punishment_file):
                     continue
                 
                 # 清除该版本的现有处罚
-                existing_punishments = LegalPunishment.query.filter_by(version_id=version.id).all()
-                if existing_punishments:
-                    for punishment in existing_punishments:
-                        db.session.delete(punishment)
+                deleted = clear_version_punishments(regulation.id, version.id)
+                if deleted:
                     db.session.commit()
-                    logger.info(f"已清除法规 {sheet_name} 的 {len(existing_punishments)} 条旧处罚")
-                
-                # 将旧版本的处罚关联到最近的 superseded 版本
-                old_versions = LegalRegulationVersion.query.filter(
-                    LegalRegulationVersion.regulation_id == regulation.id,
-                    LegalRegulationVersion.status == 'superseded'
-                ).order_by(LegalRegulationVersion.revision_date.desc()).all()
-                if old_versions:
-                    old_punishments = LegalPunishment.query.filter(
-                        LegalPunishment.version_id.is_(None),
-                        LegalPunishment.cause_id.in_([c.id for c in regulation.causes])
-                    ).all()
-                    for punishment in old_punishments:
-                        punishment.version_id = old_versions[0].id
+                    logger.info(f"已清除法规 {sheet_name} 的 {deleted} 条旧处罚")
                 
                 df_punishment = pd.read_excel(punishment_file, sheet_name=sheet_name)
                 punishment_count = 0
@@ -407,6 +518,7 @@ def import_regulations_punishments(punishment_file):
                         cause = cause_dict[cause_code]
                         punishment = LegalPunishment(
                             cause=cause,
+                            regulation_id=regulation.id,
                             version_id=version.id,
                             circumstance=str(row['情形']) if pd.notna(row.get('情形', None)) else None,
                             punishment_type=str(row['处罚类型']) if pd.notna(row.get('处罚类型', None)) else None,
@@ -450,6 +562,7 @@ def delete_regulation_cascade(regulation_name):
         regulation = LegalRegulation.query.filter_by(name=regulation_name).first()
         if not regulation:
             return False
+        # 版本、条文、事由、处罚与关联由数据库 ON DELETE CASCADE 删除，只需一条 DELETE
         db.session.delete(regulation)
         db.session.commit()
         logger.info(f"成功删除法规: {regulation_name}")
@@ -459,15 +572,15 @@ def delete_regulation_cascade(regulation_name):
         logger.error(f"删除法规 {regulation_name} 时出错: {str(e)}")
         return False
 
-def update_legal_data(info_file, structure_file, cause_file, punish_file):
+def update_legal_data(info_file, structure_file, cause_file, punish_file, use_bulk=True):
     try:
         reg_count = import_regulations_info(info_file)
         logger.info(f"成功导入 {reg_count} 条法规基础信息")
-        reg_count, struct_count = import_regulations_structures(structure_file)
+        reg_count, struct_count = import_regulations_structures(structure_file, use_bulk)
         logger.info(f"成功导入 {reg_count} 个法规的 {struct_count} 条条文")
-        reg_count, cause_count = import_regulations_causes(cause_file)
+        reg_count, cause_count = import_regulations_causes(cause_file, use_bulk)
         logger.info(f"成功导入 {reg_count} 个法规的 {cause_count} 条事由")
-        reg_count, punish_count = import_regulations_punishments(punish_file)
+        reg_count, punish_count = import_regulations_punishments(punish_file, use_bulk)
         logger.info(f"成功导入 {reg_count} 个法规的 {punish_count} 条处罚")
         logger.info("法律法规数据更新完成")
     except Exception as e:
@@ -482,6 +595,12 @@ def main():
     parser.add_argument('--structure', help='仅导入法规结构Excel文件路径')
     parser.add_argument('--cause', help='仅导入法规事由Excel文件路径')
     parser.add_argument('--punishment', help='仅导入法规处罚Excel文件路径')
+    parser.add_argument('--orm', action='store_true', help='逐行创建ORM对象导入（兼容旧的导入方式）')
+    parser.add_argument('--rebuild-links', action='store_true', help='重建所有法规的条文与事由关联')
+    parser.add_argument('--rebuild-counters', action='store_true', help='重建法规条文、事由、处罚计数')
+    parser.add_argument('--rebuild-search', action='store_true', help='重建全文检索索引')
+    parser.add_argument('--prune-texts', action='store_true', help='清理不再被条文引用的文本')
+    parser.add_argument('--analyze', action='store_true', help='更新数据库统计信息（可定期执行）')
     args = parser.parse_args()
     
     default_info_file = 'data/law_info.xlsx'
@@ -497,22 +616,41 @@ def main():
     with app.app_context():
         try:
             if args.all:
-                update_legal_data(default_info_file, default_structure_file, default_cause_file, default_punish_file)
+                update_legal_data(default_info_file, default_structure_file, default_cause_file, default_punish_file,
+                                  use_bulk=not args.orm)
             else:
                 if args.info:
                     count = import_regulations_info(args.info)
                     logger.info(f"成功导入 {count} 条法规基础信息")
                 if args.structure:
-                    reg_count, struct_count = import_regulations_structures(args.structure)
+                    reg_count, struct_count = import_regulations_structures(args.structure, use_bulk=not args.orm)
                     logger.info(f"成功导入 {reg_count} 个法规的 {struct_count} 条条文")
                 if args.cause:
-                    reg_count, cause_count = import_regulations_causes(args.cause)
+                    reg_count, cause_count = import_regulations_causes(args.cause, use_bulk=not args.orm)
                     logger.info(f"成功导入 {reg_count} 个法规的 {cause_count} 条事由")
                 if args.punishment:
-                    reg_count, punish_count = import_regulations_punishments(args.punishment)
+                    reg_count, punish_count = import_regulations_punishments(args.punishment, use_bulk=not args.orm)
                     logger.info(f"成功导入 {reg_count} 个法规的 {punish_count} 条处罚")
-                if not (args.info or args.structure or args.cause or args.punishment):
+                if args.rebuild_links:
+                    link_count = rebuild_all_cause_links()
+                    logger.info(f"成功重建 {link_count} 条条文关联")
+                if args.rebuild_counters:
+                    reg_count = rebuild_all_counters()
+                    logger.info(f"成功重建 {reg_count} 个法规的计数")
+                if args.rebuild_search:
+                    doc_count = rebuild_search_index()
+                    logger.info(f"成功重建全文索引，共 {doc_count} 个文档")
+                if args.prune_texts:
+                    text_count = prune_unused_texts()
+                    db.session.commit()
+                    logger.info(f"已清理 {text_count} 条未引用的文本")
+                if not (args.info or args.structure or args.cause or args.punishment
+                        or args.rebuild_links or args.rebuild_counters or args.rebuild_search
+                        or args.prune_texts or args.analyze):
                     parser.print_help()
+                    return 0
+            # 导入后数据分布变化较大，更新统计信息
+            analyze_database()
             logger.info("法律法规数据导入完成")
             return 0
         except Exception as e:
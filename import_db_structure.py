@@ -10,12 +10,10 @@ import docx
 from app import create_app
 from app.extensions import db
 from app.models.regulation import LegalRegulation, LegalRegulationVersion, LegalStructure
-
-# 中文数字转阿拉伯数字的映射
-CHINESE_NUMBERS = {
-    '零': 0, '一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9,
-    '十': 10, '百': 100, '千': 1000, '万': 10000, '亿': 100000000
-}
+from app.services.cross_reference import rebuild_cause_links
+from app.services.bulk_loader import bulk_insert, clear_version_structures, after_bulk_write
+from app.services.texts import store_structure_texts
+from process.tools.chinese_numerals import chinese_to_int, NUMERAL_CHARS
 
 # 配置日志
 logging.basicConfig(
@@ -26,36 +24,11 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def chinese_to_arabic(chinese_str):
-    """将中文数字转换为阿拉伯数字，支持带'零'的情况"""
-    if not chinese_str or not any(c in CHINESE_NUMBERS for c in chinese_str):
+    """将中文数字转换为阿拉伯数字，支持带'零''两'及括号的写法，无法识别时原样返回"""
+    if not chinese_str:
         return chinese_str
-
-    chinese_str = re.sub(r'[条章款项目]', '', chinese_str.strip())
-    if len(chinese_str) == 1 and chinese_str in CHINESE_NUMBERS:
-        return str(CHINESE_NUMBERS[chinese_str])
-
-    total = 0
-    current_section = 0
-    last_unit = 1
-
-    for char in chinese_str:
-        if char not in CHINESE_NUMBERS:
-            continue
-        value = CHINESE_NUMBERS[char]
-        if value >= 10:
-            if current_section == 0:
-                current_section = 1
-            current_section *= value
-            last_unit = value
-        else:
-            if last_unit >= 10:
-                total += current_section
-                current_section = value
-                last_unit = 1
-            else:
-                current_section = current_section * 10 + value
-    total += current_section
-    return str(total) if total > 0 else chinese_str
+    number = chinese_to_int(re.sub(r'[条章款项目]', '', chinese_str.strip()))
+    return str(number) if number else chinese_str
 
 def extract_law_structure_from_docx(file_path):
     """从DOCX文件中提取法律文本的结构，识别条、款、项、目"""
@@ -66,7 +39,7 @@ def extract_law_structure_from_docx(file_path):
         logger.error(f"无法读取DOCX文件 {file_path}: {str(e)}")
         return []
 
-    article_pattern = re.compile(r'^第\s*([零一二三四五六七八九十百千万]+)\s*条')
+    article_pattern = re.compile(rf'^第\s*([{NUMERAL_CHARS}]+)\s*条')
     item_pattern = re.compile(r'^\s*\(\s*([一二三四五六七八九十]+)\s*\)')
     subitem_pattern = re.compile(r'^\s*(\d+)\s*[\.、]')
     chapter_pattern = re.compile(r'第\s*([零一二三四五六七八九十百千万]+)\s*(章|节)')
@@ -178,7 +151,28 @@ def format_only_article(row):
     """仅格式化独立条的条款编号"""
     return f"第{row['条']}条" if row['条'] and row['条'] != '0' else ''
 
-def import_law_structure_to_db(file_path, app=None):
+def build_structure_records(law_data, regulation_id, version_id):
+    """将解析出的条文转换为可批量插入的记录"""
+    # 计算每个"条"的出现次数，用于判断独立条
+    article_counts = {}
+    for row in law_data:
+        article = row['条']
+        if article:
+            article_counts[article] = article_counts.get(article, 0) + 1
+    single_articles = {article for article, count in article_counts.items() if count == 1}
+    
+    return [{
+        'regulation_id': regulation_id,
+        'version_id': version_id,
+        'article': int(row['条']) if row['条'] else None,
+        'paragraph': int(row['款']) if row['款'] else None,
+        'item': int(row['项']) if row['项'] else None,
+        'section': int(row['目']) if row['目'] else None,
+        'content': row['内容'],
+        'original_text': format_only_article(row) if row['条'] in single_articles else format_clause(row)
+    } for row in law_data]
+
+def import_law_structure_to_db(file_path, app=None, use_bulk=True):
     """从DOCX文件导入法律结构到数据库，并更新step_id"""
     filename = os.path.basename(file_path)
     regulation_name, version_number = parse_filename(filename)
@@ -193,14 +187,6 @@ def import_law_structure_to_db(file_path, app=None):
         logger.warning(f"文件 {file_path} 未提取到有效内容")
         return 0
 
-    # 计算每个"条"的出现次数，用于判断独立条
-    article_counts = {}
-    for row in law_data:
-        article = row['条']
-        if article:
-            article_counts[article] = article_counts.get(article, 0) + 1
-    single_articles = {article for article, count in article_counts.items() if count == 1}
-
     # 使用已有的应用上下文或创建新的
     need_app_context = app is None
     if need_app_context:
@@ -229,34 +215,31 @@ def import_law_structure_to_db(file_path, app=None):
                     return 0
                 version = LegalRegulationVersion.query.get(regulation.current_version_id)
 
+            if use_bulk:
+                # 批量路径：集合删除 + Core 批量插入，单个事务
+                deleted = clear_version_structures(regulation.id, version.id)
+                logger.info(f"已清除法规 {regulation_name} 版本 {version.version_number} 的 {deleted} 条旧条文")
+                records = store_structure_texts(build_structure_records(law_data, regulation.id, version.id))
+                structure_count = bulk_insert(LegalStructure, records)
+                rebuild_cause_links(regulation.id, version.id)
+                version.step_id = 2
+                after_bulk_write([regulation.id])
+                db.session.commit()
+                logger.info(f"成功导入法规 {regulation_name} 版本 {version.version_number} 的 {structure_count} 条条文")
+                return structure_count
+
             # 清除该版本的现有条文
-            existing_structures = LegalStructure.query.filter_by(
-                regulation_id=regulation.id,
-                version_id=version.id
-            ).all()
-            
-            for structure in existing_structures:
-                db.session.delete(structure)
-            
+            deleted = clear_version_structures(regulation.id, version.id)
             db.session.commit()
-            logger.info(f"已清除法规 {regulation_name} 版本 {version.version_number} 的 {len(existing_structures)} 条旧条文")
+            logger.info(f"已清除法规 {regulation_name} 版本 {version.version_number} 的 {deleted} 条旧条文")
 
             structure_count = 0
-            for row in law_data:
-                original_text = format_only_article(row) if row['条'] in single_articles else format_clause(row)
-                structure = LegalStructure(
-                    regulation_id=regulation.id,
-                    version_id=version.id,
-                    article=int(row['条']) if row['条'] else None,
-                    paragraph=int(row['款']) if row['款'] else None,
-                    item=int(row['项']) if row['项'] else None,
-                    section=int(row['目']) if row['目'] else None,
-                    content=row['内容'],
-                    original_text=original_text
-                )
-                db.session.add(structure)
+            for record in build_structure_records(law_data, regulation.id, version.id):
+                db.session.add(LegalStructure(**record))
                 structure_count += 1
 
+            db.session.flush()
+            rebuild_cause_links(regulation.id, version.id)
             db.session.commit()
             logger.info(f"成功导入法规 {regulation_name} 版本 {version.version_number} 的 {structure_count} 条条文")
 
@@ -280,7 +263,7 @@ class nullcontext:
     def __enter__(self): pass
     def __exit__(self, *args): pass
 
-def process_law_files(folder_path):
+def process_law_files(folder_path, use_bulk=True):
     """处理文件夹中的所有DOCX文件并直接入库"""
     if not os.path.exists(folder_path):
         logger.error(f"文件夹 {folder_path} 不存在")
@@ -302,7 +285,7 @@ def process_law_files(folder_path):
         for file_name in tqdm(docx_files, desc="处理法律文件"):
             file_path = os.path.join(folder_path, file_name)
             try:
-                structure_count = import_law_structure_to_db(file_path, app)
+                structure_count = import_law_structure_to_db(file_path, app, use_bulk)
                 if structure_count > 0:
                     total_structures += structure_count
                     successful_files += 1
@@ -321,6 +304,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='法律法规结构导入工具')
     parser.add_argument('--folder', default='laws_folder', help='包含法律DOCX文件的文件夹路径')
     parser.add_argument('--file', help='单个要导入的DOCX文件路径')
+    parser.add_argument('--orm', action='store_true', help='逐行创建ORM对象导入（兼容旧的导入方式）')
     
     args = parser.parse_args()
     
@@ -332,7 +316,7 @@ if __name__ == "__main__":
         else:
             app = create_app()
             with app.app_context():
-                count = import_law_structure_to_db(args.file, app)
+                count = import_law_structure_to_db(args.file, app, use_bulk=not args.orm)
                 print(f"导入完成! 条文数: {count}")
     else:
         # 导入整个文件夹
@@ -342,4 +326,4 @@ if __name__ == "__main__":
             logger.info(f"已创建文件夹 {folder_path}，请将法律DOCX文件放入其中，然后重新运行程序")
             print(f"已创建文件夹 {folder_path}，请将法律DOCX文件放入其中，然后重新运行程序")
         else:
-            process_law_files(folder_path)
\ No newline at end of file
+            process_law_files(folder_path, use_bulk=not args.orm)
\ No newline at end of file
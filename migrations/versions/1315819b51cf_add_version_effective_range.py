@@ -0,0 +1,38 @@
+"""add version effective range
+
+Revision ID: 1315819b51cf
+Revises: 4e6f5c84633d
+Create Date: 2026-10-18 12:23:59.018148
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1315819b51cf'
+down_revision = '4e6f5c84633d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('legal_regulation_version', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('effective_until', sa.DateTime(), nullable=True))
+        batch_op.drop_index('ix_version_regulation_effective')
+        batch_op.create_index('ix_version_effective_range', ['regulation_id', 'effective_date', 'effective_until'], unique=False)
+
+    # 失效日期取同一法规下一个生效日期更晚的版本的生效日期
+    op.execute(
+        "UPDATE legal_regulation_version SET effective_until = ("
+        "SELECT MIN(later.effective_date) FROM legal_regulation_version AS later "
+        "WHERE later.regulation_id = legal_regulation_version.regulation_id "
+        "AND later.effective_date > legal_regulation_version.effective_date)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('legal_regulation_version', schema=None) as batch_op:
+        batch_op.drop_index('ix_version_effective_range')
+        batch_op.create_index('ix_version_regulation_effective', ['regulation_id', 'effective_date'], unique=False)
+        batch_op.drop_column('effective_until')
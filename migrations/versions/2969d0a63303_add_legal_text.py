@@ -0,0 +1,122 @@
+"""add legal_text
+
+Revision ID: 2969d0a63303
+Revises: 7463af257c56
+Create Date: 2026-10-18 12:18:45.181115
+
+"""
+import hashlib
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2969d0a63303'
+down_revision = '7463af257c56'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 2000
+
+PATH_KEY_SQL = (
+    'COALESCE(article, 0) * 1000000000 + COALESCE(paragraph, 0) * 1000000'
+    ' + COALESCE(item, 0) * 1000 + COALESCE(section, 0)'
+)
+
+
+def _text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _drop_path_key(batch_op):
+    # 重建表时生成列不能随数据复制，先删除再重新添加
+    batch_op.drop_index('ix_structure_regulation_version_path')
+    batch_op.drop_column('path_key')
+
+
+def _add_path_key():
+    with op.batch_alter_table('legal_structure', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('path_key', sa.BigInteger(), sa.Computed(PATH_KEY_SQL), nullable=True))
+        batch_op.create_index('ix_structure_regulation_version_path', ['regulation_id', 'version_id', 'path_key'], unique=False)
+
+
+def _batches(connection, sql):
+    """按主键分批读取条文"""
+    last_id = 0
+    while True:
+        rows = connection.execute(sa.text(sql), {'last_id': last_id, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    op.create_table('legal_text',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    with op.batch_alter_table('legal_structure', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('original_text_hash', sa.String(length=64), nullable=True))
+
+    # 文本按哈希去重写入 legal_text，条文改为引用哈希
+    connection = op.get_bind()
+    for rows in _batches(connection, 'SELECT id, content, original_text FROM legal_structure '
+                                     'WHERE id > :last_id ORDER BY id LIMIT :limit'):
+        texts = {}
+        updates = []
+        for structure_id, content, original_text in rows:
+            content_hash = _text_hash(content or '')
+            texts[content_hash] = content or ''
+            original_text_hash = None
+            if original_text is not None:
+                original_text_hash = _text_hash(original_text)
+                texts[original_text_hash] = original_text
+            updates.append({'id': structure_id, 'content_hash': content_hash, 'original_text_hash': original_text_hash})
+        connection.execute(
+            sa.text('INSERT OR IGNORE INTO legal_text (hash, content) VALUES (:hash, :content)'),
+            [{'hash': key, 'content': value} for key, value in texts.items()]
+        )
+        connection.execute(
+            sa.text('UPDATE legal_structure SET content_hash = :content_hash, '
+                    'original_text_hash = :original_text_hash WHERE id = :id'),
+            updates
+        )
+
+    with op.batch_alter_table('legal_structure', schema=None) as batch_op:
+        _drop_path_key(batch_op)
+        batch_op.alter_column('content_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_index('ix_structure_content_hash', ['content_hash'], unique=False)
+        batch_op.create_index('ix_structure_original_text_hash', ['original_text_hash'], unique=False)
+        batch_op.create_foreign_key('fk_structure_original_text_hash', 'legal_text', ['original_text_hash'], ['hash'])
+        batch_op.create_foreign_key('fk_structure_content_hash', 'legal_text', ['content_hash'], ['hash'])
+        batch_op.drop_column('content')
+        batch_op.drop_column('original_text')
+    _add_path_key()
+
+
+def downgrade():
+    with op.batch_alter_table('legal_structure', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('original_text', sa.TEXT(), nullable=True))
+        batch_op.add_column(sa.Column('content', sa.TEXT(), nullable=True))
+
+    op.execute(
+        'UPDATE legal_structure SET '
+        'content = (SELECT content FROM legal_text WHERE hash = legal_structure.content_hash), '
+        'original_text = (SELECT content FROM legal_text WHERE hash = legal_structure.original_text_hash)'
+    )
+
+    with op.batch_alter_table('legal_structure', schema=None) as batch_op:
+        _drop_path_key(batch_op)
+        batch_op.alter_column('content', existing_type=sa.TEXT(), nullable=False)
+        batch_op.drop_constraint('fk_structure_content_hash', type_='foreignkey')
+        batch_op.drop_constraint('fk_structure_original_text_hash', type_='foreignkey')
+        batch_op.drop_index('ix_structure_original_text_hash')
+        batch_op.drop_index('ix_structure_content_hash')
+        batch_op.drop_column('original_text_hash')
+        batch_op.drop_column('content_hash')
+    _add_path_key()
+
+    op.drop_table('legal_text')
@@ -0,0 +1,41 @@
+"""add punishment regulation_id
+
+Revision ID: 48e365d17126
+Revises: 65ebac49d0cf
+Create Date: 2026-10-18 12:10:49.247444
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '48e365d17126'
+down_revision = '65ebac49d0cf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('legal_punishment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('regulation_id', sa.Integer(), nullable=True))
+
+    # 从所属事由回填法规与缺失的版本
+    op.execute(
+        "UPDATE legal_punishment SET "
+        "regulation_id = (SELECT regulation_id FROM legal_cause WHERE legal_cause.id = legal_punishment.cause_id), "
+        "version_id = COALESCE(version_id, "
+        "(SELECT version_id FROM legal_cause WHERE legal_cause.id = legal_punishment.cause_id))"
+    )
+
+    with op.batch_alter_table('legal_punishment', schema=None) as batch_op:
+        batch_op.alter_column('regulation_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index('ix_punishment_regulation_version', ['regulation_id', 'version_id'], unique=False)
+        batch_op.create_foreign_key('fk_punishment_regulation_id', 'legal_regulation', ['regulation_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    with op.batch_alter_table('legal_punishment', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_punishment_regulation_id', type_='foreignkey')
+        batch_op.drop_index('ix_punishment_regulation_version')
+        batch_op.drop_column('regulation_id')
@@ -0,0 +1,215 @@
+"""require version_id
+
+Revision ID: 7463af257c56
+Revises: 48e365d17126
+Create Date: 2026-10-18 12:14:19.430923
+
+"""
+import logging
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.cross_reference import build_links
+
+logger = logging.getLogger('alembic.env')
+
+
+# revision identifiers, used by Alembic.
+revision = '7463af257c56'
+down_revision = '48e365d17126'
+branch_labels = None
+depends_on = None
+
+# (表, 版本外键名)
+TABLES = [
+    ('legal_cause', 'fk_cause_version_id'),
+    ('legal_punishment', 'fk_punishment_version_id'),
+    ('legal_structure', 'fk_structure_version_id'),
+]
+
+PATH_KEY_SQL = (
+    'COALESCE(article, 0) * 1000000000 + COALESCE(paragraph, 0) * 1000000'
+    ' + COALESCE(item, 0) * 1000 + COALESCE(section, 0)'
+)
+
+
+def _drop_path_key(batch_op):
+    # 重建表时生成列不能随数据复制，先删除再重新添加
+    batch_op.drop_index('ix_structure_regulation_version_path')
+    batch_op.drop_column('path_key')
+
+
+def _add_path_key():
+    with op.batch_alter_table('legal_structure', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('path_key', sa.BigInteger(), sa.Computed(PATH_KEY_SQL), nullable=True))
+        batch_op.create_index('ix_structure_regulation_version_path', ['regulation_id', 'version_id', 'path_key'], unique=False)
+
+
+# 以下表结构与本迁移时的数据库一致，回填不使用 ORM 模型（模型对应最新的表结构）
+regulation_table = sa.table(
+    'legal_regulation', sa.column('id'), sa.column('name'), sa.column('current_version_id'),
+    sa.column('effective_date', sa.DateTime), sa.column('publish_date', sa.DateTime),
+    sa.column('latest_revision_date', sa.DateTime),
+)
+version_table = sa.Table(
+    'legal_regulation_version', sa.MetaData(), sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('regulation_id', sa.Integer), sa.Column('version_number', sa.String),
+    sa.Column('revision_date', sa.DateTime), sa.Column('effective_date', sa.DateTime),
+    sa.Column('publish_date', sa.DateTime), sa.Column('status', sa.String), sa.Column('changes_summary', sa.Text),
+    sa.Column('created_at', sa.DateTime), sa.Column('updated_at', sa.DateTime),
+)
+link_table = sa.table(
+    'legal_structure_cause_link', sa.column('regulation_id'), sa.column('version_id'),
+    sa.column('structure_id'), sa.column('cause_id'), sa.column('role'),
+)
+
+
+def _create_initial_version(connection, regulation_id):
+    """为没有版本的法规创建初始版本并设为当前版本"""
+    regulation = connection.execute(
+        sa.select(regulation_table).where(regulation_table.c.id == regulation_id)).one()
+    effective_date = regulation.effective_date or regulation.publish_date
+    now = datetime.now()
+    version_id = connection.execute(version_table.insert().values(
+        regulation_id=regulation_id,
+        version_number=f"{effective_date.year}年版" if effective_date else "初始版本",
+        revision_date=regulation.latest_revision_date or effective_date or now,
+        effective_date=effective_date,
+        publish_date=regulation.publish_date,
+        status='current',
+        changes_summary="初始版本",
+        created_at=now,
+        updated_at=now,
+    )).inserted_primary_key[0]
+    connection.execute(regulation_table.update().where(regulation_table.c.id == regulation_id).
+                       values(current_version_id=version_id))
+    logger.info(f"法规 {regulation.name} 没有版本，已创建初始版本 {version_id}")
+    return version_id
+
+
+def _target_version_id(connection, regulation_id, table):
+    """
+    遗留数据应归入的版本，规则与导入脚本一致：当前版本已有同类数据时归入最近的 superseded 版本，
+    否则归入当前版本；法规还没有版本时创建初始版本
+    """
+    current_version_id = connection.execute(sa.text(
+        'SELECT current_version_id FROM legal_regulation WHERE id = :id'), {'id': regulation_id}).scalar()
+    versions = connection.execute(sa.text(
+        'SELECT id, status FROM legal_regulation_version WHERE regulation_id = :id '
+        'ORDER BY revision_date DESC, id DESC'), {'id': regulation_id}).all()
+    if not versions:
+        return _create_initial_version(connection, regulation_id)
+
+    current = (next((v for v in versions if v.id == current_version_id), None)
+               or next((v for v in versions if v.status == 'current'), None)
+               or versions[0])
+    superseded = next((v for v in versions if v.status == 'superseded'), None)
+    if superseded is not None:
+        current_has_rows = connection.execute(sa.text(
+            f'SELECT 1 FROM {table} WHERE version_id = :version_id LIMIT 1'), {'version_id': current.id}).first()
+        if current_has_rows:
+            return superseded.id
+    return current.id
+
+
+def _orphan_regulation_ids(connection, table):
+    return connection.execute(sa.text(
+        f'SELECT DISTINCT regulation_id FROM {table} WHERE version_id IS NULL')).scalars().all()
+
+
+def _relink(connection, regulation_id):
+    """按回填后的版本重建法规的条文-事由关联"""
+    connection.execute(link_table.delete().where(link_table.c.regulation_id == regulation_id))
+    version_ids = connection.execute(sa.text(
+        'SELECT id FROM legal_regulation_version WHERE regulation_id = :id'), {'id': regulation_id}).scalars().all()
+    for version_id in version_ids:
+        params = {'regulation_id': regulation_id, 'version_id': version_id}
+        structures = connection.execute(sa.text(
+            'SELECT id, article, paragraph, item FROM legal_structure '
+            'WHERE regulation_id = :regulation_id AND version_id = :version_id'), params).all()
+        causes = connection.execute(sa.text(
+            'SELECT id, violation_type, penalty_type, behavior FROM legal_cause '
+            'WHERE regulation_id = :regulation_id AND version_id = :version_id'), params).all()
+        links = build_links(regulation_id, version_id, structures, causes)
+        if links:
+            connection.execute(link_table.insert(), links)
+
+
+def _recount_versions(connection, regulation_ids):
+    """重算法规各版本的计数（法规与全局计数按 regulation_id 统计，不受回填影响）"""
+    for regulation_id in regulation_ids:
+        params = {'id': regulation_id}
+        connection.execute(sa.text(
+            "DELETE FROM legal_counter WHERE scope = 'version' AND regulation_id = :id"), params)
+        connection.execute(sa.text(
+            "INSERT INTO legal_counter (scope, scope_id, regulation_id, regulation_count, "
+            "structure_count, cause_count, punishment_count) "
+            "SELECT 'version', v.id, v.regulation_id, 1, "
+            "(SELECT COUNT(*) FROM legal_structure s WHERE s.version_id = v.id), "
+            "(SELECT COUNT(*) FROM legal_cause c WHERE c.version_id = v.id), "
+            "(SELECT COUNT(*) FROM legal_punishment p WHERE p.version_id = v.id) "
+            "FROM legal_regulation_version v WHERE v.regulation_id = :id"), params)
+
+
+def backfill_version_ids(connection):
+    """将 version_id 为空的条文、事由与处罚归入所属版本，返回 {表名: 更新行数}"""
+    updated = {}
+    regulation_ids = set()
+    for table in ('legal_structure', 'legal_cause'):
+        updated[table] = 0
+        for regulation_id in _orphan_regulation_ids(connection, table):
+            version_id = _target_version_id(connection, regulation_id, table)
+            updated[table] += connection.execute(sa.text(
+                f'UPDATE {table} SET version_id = :version_id '
+                f'WHERE regulation_id = :regulation_id AND version_id IS NULL'),
+                {'version_id': version_id, 'regulation_id': regulation_id}).rowcount
+            regulation_ids.add(regulation_id)
+
+    # 事由已全部有版本，处罚沿用所属事由的版本
+    regulation_ids.update(_orphan_regulation_ids(connection, 'legal_punishment'))
+    updated['legal_punishment'] = connection.execute(sa.text(
+        'UPDATE legal_punishment SET version_id = '
+        '(SELECT version_id FROM legal_cause WHERE legal_cause.id = legal_punishment.cause_id) '
+        'WHERE version_id IS NULL')).rowcount
+
+    # 检索文档记录的版本随之更新
+    for doc_type, table in (('structure', 'legal_structure'), ('cause', 'legal_cause'),
+                            ('punishment', 'legal_punishment')):
+        connection.execute(sa.text(
+            f"UPDATE legal_search_document SET version_id = "
+            f"(SELECT version_id FROM {table} WHERE {table}.id = legal_search_document.doc_id) "
+            f"WHERE doc_type = '{doc_type}' AND version_id IS NULL"))
+
+    for regulation_id in sorted(regulation_ids):
+        _relink(connection, regulation_id)
+    _recount_versions(connection, regulation_ids)
+    return updated
+
+
+def upgrade():
+    # 早期导入的数据没有 version_id，先归入所属版本，再加上 NOT NULL 约束
+    updated = backfill_version_ids(op.get_bind())
+    if any(updated.values()):
+        logger.info(f"已为缺少版本的数据回填版本: {updated}")
+
+    # 版本必填后，删除版本时其内容随之删除
+    for table, fk_name in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            if table == 'legal_structure':
+                _drop_path_key(batch_op)
+            batch_op.alter_column('version_id', existing_type=sa.INTEGER(), nullable=False)
+            batch_op.drop_constraint(fk_name, type_='foreignkey')
+            batch_op.create_foreign_key(fk_name, 'legal_regulation_version', ['version_id'], ['id'], ondelete='CASCADE')
+    _add_path_key()
+
+
+def downgrade():
+    for table, fk_name in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            if table == 'legal_structure':
+                _drop_path_key(batch_op)
+            batch_op.drop_constraint(fk_name, type_='foreignkey')
+            batch_op.create_foreign_key(fk_name, 'legal_regulation_version', ['version_id'], ['id'], ondelete='SET NULL')
+            batch_op.alter_column('version_id', existing_type=sa.INTEGER(), nullable=True)
+    _add_path_key()
@@ -0,0 +1,76 @@
+"""add on delete cascade
+
+Revision ID: d542c8551319
+Revises: b894ccb7d1b3
+Create Date: 2026-10-18 11:55:13.323362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd542c8551319'
+down_revision = 'b894ccb7d1b3'
+branch_labels = None
+depends_on = None
+
+# 初始迁移中的外键未命名，反射时按此规则生成名称以便删除
+naming_convention = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+}
+
+# (表, 原外键名, 新外键名, 引用表, 列, ON DELETE)
+FOREIGN_KEYS = [
+    ('legal_regulation_version', 'fk_legal_regulation_version_regulation_id_legal_regulation',
+     'fk_version_regulation_id', 'legal_regulation', 'regulation_id', 'CASCADE'),
+    ('legal_structure', 'fk_legal_structure_regulation_id_legal_regulation',
+     'fk_structure_regulation_id', 'legal_regulation', 'regulation_id', 'CASCADE'),
+    ('legal_structure', 'fk_structure_version_id',
+     'fk_structure_version_id', 'legal_regulation_version', 'version_id', 'SET NULL'),
+    ('legal_cause', 'fk_legal_cause_regulation_id_legal_regulation',
+     'fk_cause_regulation_id', 'legal_regulation', 'regulation_id', 'CASCADE'),
+    ('legal_cause', 'fk_cause_version_id',
+     'fk_cause_version_id', 'legal_regulation_version', 'version_id', 'SET NULL'),
+    ('legal_punishment', 'fk_legal_punishment_cause_id_legal_cause',
+     'fk_punishment_cause_id', 'legal_cause', 'cause_id', 'CASCADE'),
+    ('legal_punishment', 'fk_punishment_version_id',
+     'fk_punishment_version_id', 'legal_regulation_version', 'version_id', 'SET NULL'),
+    ('legal_structure_cause_link', 'fk_legal_structure_cause_link_regulation_id_legal_regulation',
+     'fk_link_regulation_id', 'legal_regulation', 'regulation_id', 'CASCADE'),
+    ('legal_structure_cause_link', 'fk_link_version_id',
+     'fk_link_version_id', 'legal_regulation_version', 'version_id', 'CASCADE'),
+    ('legal_structure_cause_link', 'fk_legal_structure_cause_link_structure_id_legal_structure',
+     'fk_link_structure_id', 'legal_structure', 'structure_id', 'CASCADE'),
+    ('legal_structure_cause_link', 'fk_legal_structure_cause_link_cause_id_legal_cause',
+     'fk_link_cause_id', 'legal_cause', 'cause_id', 'CASCADE'),
+]
+
+
+def _tables():
+    tables = []
+    for table, *_ in FOREIGN_KEYS:
+        if table not in tables:
+            tables.append(table)
+    return tables
+
+
+def upgrade():
+    # SQLite 需重建表才能修改外键，迁移期间 env.py 已关闭 foreign_keys
+    for table in _tables():
+        with op.batch_alter_table(table, schema=None, naming_convention=naming_convention) as batch_op:
+            for fk_table, old_name, new_name, referent, column, ondelete in FOREIGN_KEYS:
+                if fk_table != table:
+                    continue
+                batch_op.drop_constraint(old_name, type_='foreignkey')
+                batch_op.create_foreign_key(new_name, referent, [column], ['id'], ondelete=ondelete)
+
+
+def downgrade():
+    for table in reversed(_tables()):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for fk_table, old_name, new_name, referent, column, ondelete in FOREIGN_KEYS:
+                if fk_table != table:
+                    continue
+                batch_op.drop_constraint(new_name, type_='foreignkey')
+                batch_op.create_foreign_key(old_name, referent, [column], ['id'])
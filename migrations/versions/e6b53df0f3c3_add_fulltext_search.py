@@ -0,0 +1,118 @@
+"""add fulltext search
+
+Revision ID: e6b53df0f3c3
+Revises: 6b92a63b5e04
+Create Date: 2026-10-18 11:48:54.329272
+
+"""
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.search import tokenize, clause_anchor
+
+logger = logging.getLogger('alembic.env')
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b53df0f3c3'
+down_revision = '6b92a63b5e04'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# 以下为本迁移时的表结构（条文内容仍在 legal_structure.content，处罚经所属事由归入法规），不使用 ORM 模型
+document_table = sa.table(
+    'legal_search_document', sa.column('id'), sa.column('doc_type'), sa.column('doc_id'),
+    sa.column('regulation_id'), sa.column('version_id'), sa.column('article'), sa.column('paragraph'),
+    sa.column('item'), sa.column('section'),
+)
+SOURCE_SQL = {
+    'structure': 'SELECT id, regulation_id, version_id, article, paragraph, item, section, content '
+                 'FROM legal_structure',
+    'cause': 'SELECT id, regulation_id, version_id, description, illegal_behavior, violation_type FROM legal_cause',
+    'punishment': 'SELECT p.id, c.regulation_id, p.version_id, p.punishment_details, c.violation_type '
+                  'FROM legal_punishment p JOIN legal_cause c ON c.id = p.cause_id',
+}
+
+
+def _documents(connection, doc_type):
+    """(文档, 正文)，与 app/services/search.py 中各类文档的取法一致"""
+    for row in connection.execute(sa.text(SOURCE_SQL[doc_type])):
+        document = {'doc_type': doc_type, 'doc_id': row.id,
+                    'regulation_id': row.regulation_id, 'version_id': row.version_id}
+        if doc_type == 'structure':
+            document.update(article=row.article, paragraph=row.paragraph, item=row.item, section=row.section)
+            content = row.content
+        else:
+            document.update(clause_anchor(row.violation_type), section=None)
+            content = (row.punishment_details if doc_type == 'punishment' else
+                       '\n'.join(part for part in (row.description, row.illegal_behavior) if part))
+        yield document, content
+
+
+def _populate_index(connection):
+    """为现有的条文、事由与处罚建立索引，返回文档数"""
+    total = 0
+    batch = []
+
+    def flush():
+        connection.execute(document_table.insert(), [document for document, _ in batch])
+        connection.execute(sa.text('INSERT INTO legal_search_fts(rowid, body) VALUES (:rowid, :body)'),
+                           [{'rowid': document['id'], 'body': body} for document, body in batch])
+        batch.clear()
+
+    for doc_type in SOURCE_SQL:
+        for document, content in _documents(connection, doc_type):
+            body = tokenize(content)
+            if not body:
+                continue
+            total += 1
+            document['id'] = total
+            batch.append((document, body))
+            if len(batch) >= BATCH_SIZE:
+                flush()
+    if batch:
+        flush()
+    return total
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('legal_search_document',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('doc_type', sa.String(length=20), nullable=False),
+    sa.Column('doc_id', sa.Integer(), nullable=False),
+    sa.Column('regulation_id', sa.Integer(), nullable=False),
+    sa.Column('version_id', sa.Integer(), nullable=True),
+    sa.Column('article', sa.Integer(), nullable=True),
+    sa.Column('paragraph', sa.Integer(), nullable=True),
+    sa.Column('item', sa.Integer(), nullable=True),
+    sa.Column('section', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('doc_type', 'doc_id', name='uq_search_doc_type_id')
+    )
+    with op.batch_alter_table('legal_search_document', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_legal_search_document_regulation_id'), ['regulation_id'], unique=False)
+
+    # ### end Alembic commands ###
+
+    # FTS5 虚拟表仅用于 SQLite，建表后为现有数据建立索引；之后可用 import_db.py --rebuild-search 重建
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS legal_search_fts USING fts5(body, tokenize='unicode61')")
+        total = _populate_index(op.get_bind())
+        if total:
+            logger.info(f"已为现有数据建立全文索引: {total} 个文档")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS legal_search_fts")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('legal_search_document', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_legal_search_document_regulation_id'))
+
+    op.drop_table('legal_search_document')
+    # ### end Alembic commands ###
@@ -3,6 +3,7 @@ from openpyxl import load_workbook
 import re
 from process.tools.extract_violation_articles import get_violation_pattern
 from process.tools.extract_violation_articles import find_associated_body
+from process.tools.article_index import ArticleIndex
 
 
 # 定义行政处罚相关的正则表达式模式
@@ -32,37 +33,6 @@ def check_discretion(content):
     return 0
 
 
-def find_children(df, row):
-    """
-    查找当前行的子节点
-    :param df: 数据框
-    :param row: 当前行
-    :return: 子节点数据框
-    """
-    article = row['条']
-    paragraph = row['款']
-    item = row['项']
-    # 额外检查和转换 item
-    if pd.isna(item):
-        item = None
-    #print(f"item {item} ")
-    if paragraph:
-        if item:
-            # 如果有款和项，查找目
-            condition = (df['条'] == article) & (df['款'] == paragraph) & (df['项'] == item) & (df['目'].notnull())
-            #print(f"condition1 {condition} ")
-        else:
-            # 如果只有款，查找项
-            condition = (df['条'] == article) & (df['款'] == paragraph) & (df['项'].notnull())
-            #print(f"condition2 {condition} ")
-    else:
-        # 如果没有款，查找款
-        condition = (df['条'] == article) & (df['款'].notnull())
-        #print(f"condition3 {condition} ")
-
-    return df[condition]
-
-
 def update_excel(file_path):
     wb = load_workbook(file_path)
     for sheet_name in wb.sheetnames:
@@ -89,6 +59,7 @@ def update_excel(file_path):
         # 筛选出条值小于 10000 的记录
         df_less_than_10000 = df[df['条'] < 10000]
         df_greater_than_or_equal_to_10000 = df[df['条'] >= 10000]
+        article_index = ArticleIndex(df_less_than_10000)
 
         # 遍历条值小于 10000 的记录，设置罚则
         for index, row in df_less_than_10000.iterrows():
@@ -100,10 +71,8 @@ def update_excel(file_path):
             # 这里可以继续添加处理违法情形的代码，原代码中此处逻辑可继续沿用
             if row['罚则'] == 1:
                 df_less_than_10000.at[index, '条类型'] = 2
-                # 确保 row 中的缺失值已经被正确转换
-                row = row.where(pd.notna(row), None)
-                children = find_children(df_less_than_10000, row)
-                if children.empty:
+                children = article_index.children(index)
+                if not children:
                     # 判断其是不是违法情形
                     associated_body = find_associated_body(row['内容'])
                     # 将 associated_body 写入“违法行为文本”列
@@ -122,7 +91,7 @@ def update_excel(file_path):
                         df_less_than_10000.at[index, '条类型'] = 4
                 elif  "下列" in row['内容']:
                     df_less_than_10000.at[index, '条类型'] = 6
-                    for child_index, _ in children.iterrows():
+                    for child_index in children:
                         df_less_than_10000.at[child_index, '违法情形'] = 1
                         df_less_than_10000.at[child_index, '条类型'] = 3
 
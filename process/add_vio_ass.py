@@ -1,44 +1,65 @@
 import pandas as pd
 from openpyxl import load_workbook
 import re
-import jieba
-from gensim.models import KeyedVectors
 from process.tools.extract_violation_articles import PENALTY_TYPES
 import numpy as np
 from process.tools.extract_violation_articles import get_violation_pattern
 from process.tools.extract_violation_articles import get_clause_array
 from process.tools.extract_violation_articles import find_associated_body
+from process.tools.clause_parser import scan_clauses
+from process.tools.article_index import ArticleIndex
+from process.tools.word_vectors import get_model, CompactVectors
+from process.tools import tokenizer
 import os
 
 
 # 定义辅助词和否定词，增加 "下列行为" 和 "之一"，用于语义比较
 REMOVE_WORDS = ["不", "未", "的", "下列行为", "之一"]
 
+# 可能违则的相似度下限与最多保留的条数
+SIMILARITY_THRESHOLD = 0.9
+TOP_K = 5
+# 矩阵乘积（float32）与逐条计算的相似度之差远小于此值，差额以内的记录再逐条复核
+SIMILARITY_MARGIN = 1e-4
+# 精简词向量表对某个工作表的覆盖率低于此值时提示重新生成
+COVERAGE_WARNING = 0.95
+
 
 def load_pretrained_model():
+    """进程内共用的词向量模型（见 process/tools/word_vectors.py），首次调用时加载"""
     try:
-        # 构建 AILab.bin 的路径
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        model_path = os.path.join(base_dir, 'AILab.bin')
-        model = KeyedVectors.load_word2vec_format(model_path, binary=True)
-        return model
+        return get_model()
     except FileNotFoundError:
         print("未找到预训练模型文件，请检查文件路径。")
         return None
 
 
-def preprocess(sentence):
+def remove_words(sentence):
     """
-    预处理句子，去除特殊词并分词
+    去除 REMOVE_WORDS 中的辅助词和否定词
     """
     for word in REMOVE_WORDS:
         sentence = sentence.replace(word, "")
-    return jieba.lcut(sentence)
+    return sentence
+
+
+def preprocess(sentence):
+    """
+    预处理句子，去除特殊词并分词（分词结果经 process/tools/tokenizer.py 缓存）
+    """
+    return tokenizer.cut(remove_words(sentence))
+
+
+def preprocess_many(sentences):
+    """
+    批量预处理，与逐句调用 preprocess 结果相同；未缓存的句子较多时多进程分词
+    """
+    return tokenizer.cut_many(remove_words(sentence) for sentence in sentences)
 
 
 def get_sentence_vector(sentence, model):
     """
-    根据预训练的 Word2Vec 模型获取句子向量
+    根据预训练的 Word2Vec 模型（或精简词向量表）获取句子向量
     """
     vectors = []
     for word in sentence:
@@ -49,6 +70,20 @@ def get_sentence_vector(sentence, model):
     return np.mean(vectors, axis=0)
 
 
+def report_coverage(sheet_name, df, model):
+    """
+    输出精简词向量表对工作表 内容 列分词结果的覆盖率；表中没有的词从完整模型读取
+    """
+    if not isinstance(model, CompactVectors) or '内容' not in df.columns:
+        return
+    words = {word for tokens in preprocess_many(df['内容'].dropna().astype(str)) for word in tokens}
+    coverage = model.coverage(words)
+    print(f"Sheet {sheet_name}: 精简词向量表覆盖 {coverage:.1%} 的词（共 {len(words)} 个）")
+    if coverage < COVERAGE_WARNING:
+        print(f"Warning: 精简词向量表缺少 sheet {sheet_name} 中较多的词，已从完整模型读取；"
+              f"请运行 python build_compact_vectors.py 重新生成")
+
+
 def cosine_similarity(vec1, vec2):
     """
     计算两个向量的余弦相似度
@@ -77,7 +112,7 @@ def is_mostly_contained(sentence1, sentence2, model, threshold=0.85):
     return similarity >= threshold, similarity
 
 
-def extract_violation_clauses(text, df):  # 添加 df 参数，用于获取数据
+def extract_violation_clauses(text, article_index):  # 传入工作表的条款索引，用于获取数据
     """
     从文本中抽取符合格式的内容
     格式要求：(?:未依照|违反|有)必须有一个，当前面为"有"时，后面必须有"致使"
@@ -108,10 +143,10 @@ def extract_violation_clauses(text, df):  # 添加 df 参数，用于获取数
             if re.match(r'第\d+条$', clause_text):  # 判断是否为“第X条”格式
                 article_num = int(re.findall(r'\d+', clause_text)[0])
                 # 查找同条下“违法情形”为1的记录
-                same_article_records = df[(df['条'] == article_num) & (df['违法情形'] == 1)]
-                if not same_article_records.empty:
-                    for _, row in same_article_records.iterrows():
-                        new_clause = format_clause(row)
+                same_article_records = article_index.where(article_index.article(article_num), 违法情形=1)
+                if same_article_records:
+                    for label in same_article_records:
+                        new_clause = format_clause(article_index.df.loc[label])
                         result_parts.append(new_clause)
                 else:
                     result_parts.append(clause_text)
@@ -142,19 +177,60 @@ def format_clause(row):
     return clause_str
 
 
-def get_superior_text(df, current_row):
+def get_superior_text(article_index, current_row):
     if bool(current_row['项']) and not bool(current_row['目']):
-        superior_conditions = (df['条'] == current_row['条']) & (df['款'] == current_row['款']) & (df['项'] == 0)
-        superior_rows = df[superior_conditions]
-        if not superior_rows.empty:
-            superior_row = superior_rows.iloc[0]
-            parts = re.split(r'[;,，；]', superior_row['内容'])
+        superior = article_index.parent(current_row.name)
+        if superior is not None:
+            parts = re.split(r'[;,，；]', article_index.df.at[superior, '内容'])
             for part in parts:
                 if "下列" in part:
                     return part + current_row['内容']
     return current_row['内容']
 
 
+def build_candidates(df, model):
+    """
+    可作为可能违则的记录：条 < 10000，且罚则、违法情形都不为 1
+    每条记录分词并计算句向量一次，归一化后按行组成矩阵，供 find_similar_clauses 一次算出全部相似度
+    """
+    rows = df[(df['条'] < 10000) & ~((df['罚则'] == 1) | (df['违法情形'] == 1))]
+    vectors = [get_sentence_vector(words, model) for words in preprocess_many(rows['内容'])]
+    matrix = np.array(vectors, dtype=np.float32).reshape(len(vectors), model.vector_size)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return {
+        'clauses': [format_clause(row) for _, row in rows.iterrows()],
+        'articles': rows['条'].to_numpy(),
+        'vectors': vectors,
+        'matrix': np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0),
+    }
+
+
+def find_similar_clauses(text, current_article, candidates, model):
+    """
+    与 text 相似度超过 SIMILARITY_THRESHOLD 的其他条的记录，按相似度从高到低取前 TOP_K 条
+    相似度由矩阵乘积一次算出并筛选，入选的记录再用 cosine_similarity 逐条复核，结果与逐条比较一致
+    返回 (条款号列表, 相似度列表)
+    """
+    vector = get_sentence_vector(preprocess(text), model)
+    norm = np.linalg.norm(vector)
+    if norm == 0 or not candidates['clauses']:
+        return [], []
+    scores = candidates['matrix'] @ (vector / norm).astype(np.float32)
+    selected = np.flatnonzero((scores > SIMILARITY_THRESHOLD - SIMILARITY_MARGIN)
+                              & (candidates['articles'] != current_article))
+
+    matching_clauses = []
+    matching_similarities = []
+    for position in selected:
+        similarity = cosine_similarity(vector, candidates['vectors'][position])
+        if similarity > SIMILARITY_THRESHOLD:
+            matching_clauses.append(candidates['clauses'][position])
+            matching_similarities.append(similarity)
+    sorted_indices = np.argsort(matching_similarities)[::-1][:TOP_K]
+    return ([matching_clauses[i] for i in sorted_indices],
+            [matching_similarities[i] for i in sorted_indices])
+
+
 
 
 def update_excel(file_path, model):
@@ -197,6 +273,9 @@ def update_excel(file_path, model):
             # 添加新的列
             df['可能违则'] = ""
             df['可能度'] = ""
+            article_index = ArticleIndex(df)
+            candidates = None
+            report_coverage(sheet_name, df, model)
 
             # 处理罚则为 0 且违法情形为 1 的记录
             valid_rows = df[(df['罚则'] == 0) & (df['违法情形'] == 1)].index
@@ -204,7 +283,7 @@ def update_excel(file_path, model):
             
             for index in valid_rows:
                 row = df.loc[index]
-                violation_clauses = extract_violation_clauses(row['内容'], df)  # 传递 df 参数
+                violation_clauses = extract_violation_clauses(row['内容'], article_index)
                 if violation_clauses:
                     df.at[index, '可能违则'] = violation_clauses
                     df.at[index, '可能度'] = 1
@@ -212,35 +291,26 @@ def update_excel(file_path, model):
                     continue
 
                 if row['项'] > 0:
-                    same_kuan_first_row = df[(df['条'] == row['条']) & (df['款'] == row['款']) & (df['项'] == 0)].iloc[0]
-                    if same_kuan_first_row['条类型'] == 6:
+                    same_kuan_rows = article_index.within(row['条'], row['款'], 0)
+                    same_kuan_first_row = df.loc[same_kuan_rows[0]] if same_kuan_rows else None
+                    if same_kuan_first_row is not None and same_kuan_first_row['条类型'] == 6:
                         B_text = same_kuan_first_row['内容']
-                        new_violation_clauses = extract_violation_clauses(B_text, df)
+                        new_violation_clauses = extract_violation_clauses(B_text, article_index)
                         if new_violation_clauses:
                             df.at[index, '可能违则'] = new_violation_clauses
                             df.at[index, '可能度'] = 1
                             df.at[index, '条类型'] = 311
                             continue
 
-                current_text = get_superior_text(df, row)
+                current_text = get_superior_text(article_index, row)
                 current_article = row['条']
-                other_records = df[(df['条'] != current_article) & (df['条'] < 10000) & ~((df['罚则'] == 1) | (df['违法情形'] == 1))]
-
-                # 遍历其他记录，检查是否与当前记录相似
-                matching_clauses = []
-                matching_similarities = []
-                for other_index, other_row in other_records.iterrows():
-                    is_contained, similarity = is_mostly_contained(current_text, other_row['内容'], model)
-                    if is_contained and similarity > 0.9:
-                        matching_clauses.append(format_clause(other_row))
-                        matching_similarities.append(similarity)
-                
-                # 对匹配结果进行排序
-                if matching_clauses:
-                    sorted_indices = np.argsort(matching_similarities)[::-1][:5]
-                    top_matching_clauses = [matching_clauses[i] for i in sorted_indices]
-                    top_matching_similarities = [matching_similarities[i] for i in sorted_indices]
+                if candidates is None:
+                    candidates = build_candidates(df, model)
 
+                # 与其他条的记录比较，取最相似的几条
+                top_matching_clauses, top_matching_similarities = find_similar_clauses(
+                    current_text, current_article, candidates, model)
+                if top_matching_clauses:
                     df.at[index, '可能违则'] = "|".join(top_matching_clauses)
                     df.at[index, '可能度'] = "|".join(map(str, top_matching_similarities))
                     df.at[index, '条类型'] = 32
@@ -266,7 +336,7 @@ def update_excel(file_path, model):
                 #print(f"associated_body1 {associated_body}")
                 if match or first_part_ends_with_de or last_part_ends_with_de:
                     # 抽取有直接描述的条款号
-                    violation_clauses = extract_violation_clauses(associated_body.replace(" ", ""), df)  # 传递 df 参数
+                    violation_clauses = extract_violation_clauses(associated_body.replace(" ", ""), article_index)
                     
                     if violation_clauses:
                          # 拆分可能违则的条款号
@@ -277,32 +347,21 @@ def update_excel(file_path, model):
                         additional_penalty = ""
                         for clause in clause_list:
                             # 解析条款号获取条、款、项、目
-                            match = re.match(r'第(\d+)条(?:第(\d+)款)?(?:第(\d+)项)?(?:第(\d+)目)?', clause)
-                            if match:
-                                article = int(match.group(1))
-                                section = int(match.group(2)) if match.group(2) else None
-                                item = int(match.group(3)) if match.group(3) else None
-                                subitem = int(match.group(4)) if match.group(4) else None
-                                
-                                # 筛选出符合条件的记录
-                                condition = (df['条'] == article)
-                                if section is not None:
-                                    condition &= (df['款'] == section)
-                                if item is not None:
-                                    condition &= (df['项'] == item)
-                                if subitem is not None:
-                                    condition &= (df['目'] == subitem)
+                            refs = scan_clauses(clause)
+                            if refs and refs[0].article is not None:
+                                _, article, section, item, subitem = refs[0]
                                 
-                                clause_rows = df[condition]
+                                # 筛选出符合条件的记录，未写的级别不限
+                                clause_rows = article_index.match(article, section, item, subitem)
                                 
-                                for _, clause_row in clause_rows.iterrows():
+                                for clause_label in clause_rows:
+                                    clause_row = df.loc[clause_label]
                                     print(f"clause_rows {clause_row['条款'] }")
                                     if clause_row['条类型'] in [3, 311]:
                                         is_type_3_or_311 = True
                                         # 查找同条同款类型为6的记录
-                                        condition = (df['条'] == article) & (df['款'] == section) & (df['条类型'] == 6)
-                                        if not condition.empty:
-                                            df.loc[condition, '增加处罚'] = df.at[index, '条款']
+                                        same_kuan = article_index.within(article, section) if section is not None else []
+                                        df.loc[article_index.where(same_kuan, 条类型=6), '增加处罚'] = df.at[index, '条款']
                         if is_type_3_or_311:
                             df.at[index, '条类型'] = 5
                             df.at[index, '违法情形'] = 0
@@ -324,20 +383,11 @@ def update_excel(file_path, model):
                         df.at[index, '违法行为文本'] = associated_body
                     #print(f"associated_body2 {associated_body}")
                     current_article = row['条']
-                    other_records = df[(df['条'] != current_article) & (df['条'] < 10000) & ~((df['罚则'] == 1) | (df['违法情形'] == 1))]
-                    matching_clauses = []
-                    matching_similarities = []
-                    for _, other_row in other_records.iterrows():
-                        is_contained, similarity = is_mostly_contained(associated_body, other_row['内容'], model)
-                        if is_contained and similarity > 0.9:
-                            matching_clauses.append(format_clause(other_row))
-                            matching_similarities.append(similarity)
-
-                    if matching_clauses:
-                        sorted_indices = np.argsort(matching_similarities)[::-1][:5]
-                        top_matching_clauses = [matching_clauses[i] for i in sorted_indices]
-                        top_matching_similarities = [matching_similarities[i] for i in sorted_indices]
-
+                    if candidates is None:
+                        candidates = build_candidates(df, model)
+                    top_matching_clauses, top_matching_similarities = find_similar_clauses(
+                        associated_body, current_article, candidates, model)
+                    if top_matching_clauses:
                         df.at[index, '可能违则'] = "|".join(top_matching_clauses)
                         df.at[index, '可能度'] = "|".join(map(str, top_matching_similarities))
                         df.at[index, '条类型'] = 44
@@ -379,6 +429,7 @@ def update_excel(file_path, model):
 
         # 保存工作簿
         wb.save(file_path)
+        tokenizer.flush()
         print("File updated successfully.")
     except Exception as e:
         import traceback
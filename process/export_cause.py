@@ -3,6 +3,8 @@ import re
 import json
 import logging
 import argparse
+from process.tools.clause_parser import scan_clauses, clause_numbers
+from process.tools.article_index import ArticleIndex
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -15,27 +17,23 @@ def format_clause(record):
             clause_str += f"第{int(record[part])}{part}"
     return clause_str
 
-def extract_clause_numbers(clause): 
-    parts = re.findall(r'\d+', clause)
-    return {
-        '条': int(parts[0]) if parts else 0,
-        '款': int(parts[1]) if len(parts) > 1 else 0,
-        '项': int(parts[2]) if len(parts) > 2 else 0,
-        '目': int(parts[3]) if len(parts) > 3 else 0
-    }
-
-def filter_records(df, conditions):
-    filter_conditions = pd.Series([True] * len(df))
-    for key, value in conditions.items():
-        if value:
-            filter_conditions &= (df[key] == value)
-    return df[filter_conditions]
-
-def get_related_records(df, clauses):
+def extract_clause_numbers(clause):
+    return dict(zip(('条', '款', '项', '目'), clause_numbers(clause)))
+
+def reference_conditions(text):
+    """文本中各条款引用的筛选条件（解析见 clause_parser），缺少条号的引用跳过"""
+    return [dict(zip(('条', '款', '项', '目'), (value or 0 for value in ref[1:])))
+            for ref in scan_clauses(text) if ref.article is not None]
+
+def filter_records(article_index, conditions):
+    """条款号为 0 的级别不限，返回符合条件的记录"""
+    return article_index.rows(article_index.match(*(conditions[key] for key in ('条', '款', '项', '目'))))
+
+def get_related_records(article_index, clauses):
     records = []
     for clause in clauses:
         conditions = extract_clause_numbers(clause)
-        sub_df = filter_records(df, conditions)
+        sub_df = filter_records(article_index, conditions)
         for _, row in sub_df.iterrows():
             records.append({
                 '条': row['条'], '款': row['款'], '项': row['项'], '目': row['目'],
@@ -44,22 +42,23 @@ def get_related_records(df, clauses):
     return records
 
 # 获取违法行为和对应的罚则
-def get_current_and_article_records(df, row):
+def get_current_and_article_records(article_index, row):
     current_record = {'条': row['条'], '款': row['款'], '项': row['项'], '目': row['目'], '内容': row['内容']}
     # 筛选出同条的记录
-    same_article_df = df[df['条'] == row['条']]
-    if same_article_df.equals(df.loc[[row.name]]):  # 如果同条记录只有当前行
+    same_article = article_index.article(row['条'])
+    if same_article == [row.name]:  # 如果同条记录只有当前行
         # 修改此处逻辑，将当前行加入到数组中
         article_records = [{'条': row['条'], '款': row['款'], '项': row['项'], '目': row['目'], '内容': row['内容']}]
     else:
         # 筛选出“罚则”列为1的记录
         article_records = [
             {'条': r['条'], '款': r['款'], '项': r['项'], '目': r['目'], '内容': r['内容']}
-            for _, r in same_article_df[same_article_df['罚则'] == 1].iterrows()
+            for _, r in article_index.rows(article_index.where(same_article, 罚则=1)).iterrows()
         ]
     return current_record, article_records
 
-def get_penalty_records(df, row):
+def get_penalty_records(article_index, row):
+    df = article_index.df
     penalty_column = next((col for col in df.columns if '增加处罚' in col), None)
     if penalty_column:
         penalty_value = row.get(penalty_column)
@@ -68,19 +67,14 @@ def get_penalty_records(df, row):
     
     if pd.notna(penalty_value) and str(penalty_value).strip() != "":
         # 获取相关记录
-        related_records = get_related_records(df, str(penalty_value).split('|'))
+        related_records = get_related_records(article_index, str(penalty_value).split('|'))
         # 筛选出“罚则”列为1的记录
         penalty_records = []
         for record in related_records:
             # 查找原数据框中对应记录的“罚则”列值
-            match_row = df[
-                (df['条'] == record['条']) &
-                (df['款'] == record['款']) &
-                (df['项'] == record['项']) &
-                (df['目'] == record['目'])
-            ]
-            if not match_row.empty and (match_row['罚则'].values[0] == 1 
-            or (match_row['条'].values[0] > 1000 and re.search(r'罚款|责令改正|没收|吊销', match_row['内容'].values[0]))):
+            match_label = article_index.first(record['条'], record['款'], record['项'], record['目'])
+            if match_label is not None and (df.at[match_label, '罚则'] == 1
+            or (df.at[match_label, '条'] > 1000 and re.search(r'罚款|责令改正|没收|吊销', df.at[match_label, '内容']))):
                 penalty_records.append(record)
         return penalty_records
     return []
@@ -121,6 +115,8 @@ def process_sheet(df, output_file):
             if col not in df.columns:
                 df[col] = None
 
+        article_index = ArticleIndex(df)
+
         # 用于记录已处理的条款，避免重复
         processed_clauses = set()
 
@@ -137,33 +133,29 @@ def process_sheet(df, output_file):
                     for clause in violation_clauses:
                         A = A.replace(clause, "")
                     if row.get('可能度') != '1' or row.get('条类型') == 311:
-                        related_records = get_related_records(df, violation_clauses)
+                        related_records = get_related_records(article_index, violation_clauses)
                     else:
                         for clause in violation_clauses:
-                            single_related_records = get_related_records(df, [clause])
-                            current_record, article_records = get_current_and_article_records(df, row)
-                            penalty_records = article_records + get_penalty_records(df, row)
+                            single_related_records = get_related_records(article_index, [clause])
+                            current_record, article_records = get_current_and_article_records(article_index, row)
+                            penalty_records = article_records + get_penalty_records(article_index, row)
                             result = generate_text(current_record, penalty_records, single_related_records)
                             all_results.append(result)
                         continue
 
-            current_record, article_records = get_current_and_article_records(df, row)
+            current_record, article_records = get_current_and_article_records(article_index, row)
             for record in article_records:
                 clause_str = format_clause(record)
                 A = A.replace(clause_str, "")
 
-            penalty_records = article_records + get_penalty_records(df, row)
+            penalty_records = article_records + get_penalty_records(article_index, row)
             for record in penalty_records:
                 clause_str = format_clause(record)
                 A = A.replace(clause_str, "")
 
-            pattern = r'第\d+条(?:第\d+款)?(?:第\d+项)?(?:第\d+目)?'
             new_records = []
-            matches = re.findall(pattern, A)
-            for match in matches:
-                full_match = ''.join(match.split())
-                conditions = extract_clause_numbers(full_match)
-                sub_df = filter_records(df, conditions)
+            for conditions in reference_conditions(A):
+                sub_df = filter_records(article_index, conditions)
                 for _, r in sub_df.iterrows():
                     new_records.append({'条': r['条'], '款': r['款'], '项': r['项'], '目': r['目'], '内容': r['内容']})
 
@@ -171,11 +163,8 @@ def process_sheet(df, output_file):
                 for record in records:
                     content = record['内容']
                     if isinstance(content, str):
-                        content_matches = re.findall(pattern, content)
-                        for match in content_matches:
-                            full_match = ''.join(match.split())
-                            conditions = extract_clause_numbers(full_match)
-                            sub_df = filter_records(df, conditions)
+                        for conditions in reference_conditions(content):
+                            sub_df = filter_records(article_index, conditions)
                             for _, r in sub_df.iterrows():
                                 new_record = {'条': r['条'], '款': r['款'], '项': r['项'], '目': r['目'], '内容': r['内容']}
                                 if new_record not in new_records:
@@ -3,6 +3,8 @@ import openpyxl
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Alignment, Border, Side, Font
 import logging
+from process.tools.clause_parser import clause_numbers
+from process.tools.article_index import ArticleIndex
 
 # 配置日志
 logging.basicConfig(filename='process_clauses.log', level=logging.ERROR,
@@ -14,44 +16,24 @@ def parse_clause(clause_str):
         return None, None, None, None
     
     clause_str = str(clause_str).replace(".1", "").replace(" ", "").strip()
-    if "《" in clause_str and "》" in clause_str:
-        clause_str = clause_str.split("》")[1]
-    
-    parts = clause_str.split("第")
-    strip, kuan, xiang, mu = None, None, None, None
-    
-    for part in parts[1:]:
-        if part.endswith("条"):
-            strip = part[:-1]
-        elif part.endswith("款"):
-            kuan = part[:-1]
-        elif part.endswith("项"):
-            xiang = part[:-1]
-        elif part.endswith("目"):
-            mu = part[:-1]
-    
-    strip = int(strip) if strip else 0
-    kuan = int(kuan) if kuan else 0
-    xiang = int(xiang) if xiang else 0
-    mu = int(mu) if mu else 0
-    
-    return strip, kuan, xiang, mu
+    return clause_numbers(clause_str)
 
-def find_content_in_law_structure(strip, kuan, xiang, mu, law_df):
+def find_content_in_law_structure(strip, kuan, xiang, mu, law_index):
+    if not strip:
+        return None
     if xiang != 0 or mu != 0:
-        query = "条 == @strip and 款 == @kuan and 项 == @xiang and 目 == @mu"
+        label = law_index.first(strip, kuan, xiang, mu)
     elif kuan != 0:
-        query = "条 == @strip and 款 == @kuan and 项 == 0 and 目 == 0"
+        label = law_index.first(strip, kuan, 0, 0)
     else:
         return None
     
-    results = law_df.query(query)
-    if results.empty:
+    if label is None:
         return None
     if strip and strip > 10000:
-        return results["内容"].iloc[0]
+        return law_index.df.at[label, "内容"]
     else:
-        return results["原内容"].iloc[0]
+        return law_index.df.at[label, "原内容"]
     #penalty_results = results[results["可能违则"] == 1]
      #说明查找的是违则
     #if not penalty_results.empty:
@@ -59,13 +41,13 @@ def find_content_in_law_structure(strip, kuan, xiang, mu, law_df):
     
     #return results.sort_values(by="可能度", ascending=False)["原内容"].iloc[0]
 
-def find_related_law(strip, kuan, xiang, mu, law_df):
+def find_related_law(strip, kuan, xiang, mu, law_index):
     """查找条款对应的关联法律"""
-    query = "条 == @strip and 款 == @kuan and 项 == @xiang and 目 == @mu"
-    results = law_df.query(query)
-    if results.empty:
+    label = law_index.first(strip, kuan, xiang, mu)
+    if label is None or "关联法律" not in law_index.df.columns:
         return None
-    return results.iloc[0]["关联法律"] if "关联法律" in results.columns and not pd.isna(results.iloc[0]["关联法律"]) else None
+    related_law = law_index.df.at[label, "关联法律"]
+    return None if pd.isna(related_law) else related_law
 
 def format_clause(strip, kuan, xiang, mu, related_law=None):
     """格式化条款字符串，支持带关联法律"""
@@ -80,7 +62,7 @@ def format_clause(strip, kuan, xiang, mu, related_law=None):
         clause = f"《{related_law}》{clause}"
     return clause
 
-def process_clauses(clauses_str, law_structure_df):
+def process_clauses(clauses_str, law_structure_index):
     """通用函数：处理条款字符串（罚则或违则），返回内容和更新后的条款列表"""
     try:
         clauses = str(clauses_str).split("|")
@@ -90,12 +72,12 @@ def process_clauses(clauses_str, law_structure_df):
         for clause in clauses:
             strip, kuan, xiang, mu = parse_clause(clause)
             if strip and strip > 10000:
-                related_law = find_related_law(strip, kuan, xiang, mu, law_structure_df)
+                related_law = find_related_law(strip, kuan, xiang, mu, law_structure_index)
                 adjusted_strip = strip - (strip // 10000) * 10000
                 updated_clause = format_clause(adjusted_strip, kuan, xiang, mu, related_law)
             else:
                 updated_clause = clause
-            content = find_content_in_law_structure(strip, kuan, xiang, mu,law_structure_df)
+            content = find_content_in_law_structure(strip, kuan, xiang, mu,law_structure_index)
             if content:
                 contents.append(content)
             updated_clauses.append(updated_clause)
@@ -126,7 +108,7 @@ def update_law_result(input_file, law_structure_file, output_file):
             print(f"Skipping sheet {sheet_name}: missing required columns")
             continue
 
-        law_structure_df = law_structure_sheets[sheet_name]
+        law_structure_index = ArticleIndex(law_structure_sheets[sheet_name])
         law_ai_df["违法行为"] = None
         law_ai_df["罚则条款"] = None
         law_ai_df["违则条款"] = None
@@ -134,16 +116,16 @@ def update_law_result(input_file, law_structure_file, output_file):
         for index, row in law_ai_df.iterrows():
             # 处理违法行为
             strip, kuan, xiang, mu = parse_clause(str(row["行为"]))
-            content = find_content_in_law_structure(strip, kuan, xiang, mu,law_structure_df)
+            content = find_content_in_law_structure(strip, kuan, xiang, mu,law_structure_index)
             law_ai_df.at[index, "违法行为"] = content
 
             # 处理罚则条款
-            penalty_contents, updated_penalty_clauses = process_clauses(row["罚则"], law_structure_df)
+            penalty_contents, updated_penalty_clauses = process_clauses(row["罚则"], law_structure_index)
             law_ai_df.at[index, "罚则条款"] = penalty_contents
             law_ai_df.at[index, "罚则"] = updated_penalty_clauses
 
             # 处理违则条款
-            violation_contents, updated_violation_clauses = process_clauses(row["违则"], law_structure_df)
+            violation_contents, updated_violation_clauses = process_clauses(row["违则"], law_structure_index)
             law_ai_df.at[index, "违则条款"] = violation_contents
             law_ai_df.at[index, "违则"] = updated_violation_clauses
 
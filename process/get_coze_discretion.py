@@ -3,6 +3,8 @@ import openpyxl
 import json
 import os
 import logging
+from process.tools.clause_parser import clause_numbers
+from process.tools.article_index import ArticleIndex
 from cozepy import COZE_CN_BASE_URL, Coze, TokenAuth, Message, ChatEventType
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import argparse
@@ -20,50 +22,30 @@ def parse_clause(clause_str):
         return None, None, None, None
     
     clause_str = str(clause_str).replace(".1", "").replace(" ", "").strip()
-    if "《" in clause_str and "》" in clause_str:
-        clause_str = clause_str.split("》")[1]
-    
-    parts = clause_str.split("第")
-    strip, kuan, xiang, mu = None, None, None, None
-    
-    for part in parts[1:]:
-        if part.endswith("条"):
-            strip = part[:-1]
-        elif part.endswith("款"):
-            kuan = part[:-1]
-        elif part.endswith("项"):
-            xiang = part[:-1]
-        elif part.endswith("目"):
-            mu = part[:-1]
-    
-    strip = int(strip) if strip else 0
-    kuan = int(kuan) if kuan else 0
-    xiang = int(xiang) if xiang else 0
-    mu = int(mu) if mu else 0
-    
-    return strip, kuan, xiang, mu
+    return clause_numbers(clause_str)
 
-def find_content_in_law_structure(strip, kuan, xiang, mu, law_df):
+def find_content_in_law_structure(strip, kuan, xiang, mu, law_index):
     """查找条款内容，一律使用‘内容’字段"""
+    if not strip:
+        return None
     if xiang != 0 or mu != 0:
-        query = "条 == @strip and 款 == @kuan and 项 == @xiang and 目 == @mu"
+        label = law_index.first(strip, kuan, xiang, mu)
     elif kuan != 0:
-        query = "条 == @strip and 款 == @kuan and 项 == 0 and 目 == 0"
+        label = law_index.first(strip, kuan, 0, 0)
     else:
         return None
     
-    results = law_df.query(query)
-    if results.empty:
+    if label is None:
         return None
-    return results["内容"].iloc[0]
+    return law_index.df.at[label, "内容"]
 
-def find_related_law(strip, kuan, xiang, mu, law_df):
+def find_related_law(strip, kuan, xiang, mu, law_index):
     """查找条款对应的关联法律"""
-    query = "条 == @strip and 款 == @kuan and 项 == @xiang and 目 == @mu"
-    results = law_df.query(query)
-    if results.empty:
+    label = law_index.first(strip, kuan, xiang, mu)
+    if label is None or "关联法律" not in law_index.df.columns:
         return None
-    return results.iloc[0]["关联法律"] if "关联法律" in results.columns and not pd.isna(results.iloc[0]["关联法律"]) else None
+    related_law = law_index.df.at[label, "关联法律"]
+    return None if pd.isna(related_law) else related_law
 
 def format_clause(strip, kuan, xiang, mu, related_law=None):
     """格式化条款字符串，支持带关联法律"""
@@ -78,7 +60,7 @@ def format_clause(strip, kuan, xiang, mu, related_law=None):
         clause = f"《{related_law}》{clause}"
     return clause
 
-def process_clauses_to_string(clauses_str, law_structure_df):
+def process_clauses_to_string(clauses_str, law_structure_index):
     """处理条款字符串，返回‘条款 + 内容’格式的字符串，多项用分号连接，并返回解析后的条款列表"""
     try:
         clauses = str(clauses_str).split("|")
@@ -90,12 +72,12 @@ def process_clauses_to_string(clauses_str, law_structure_df):
             if not strip:
                 continue
             if strip > 10000:
-                related_law = find_related_law(strip, kuan, xiang, mu, law_structure_df)
+                related_law = find_related_law(strip, kuan, xiang, mu, law_structure_index)
                 adjusted_strip = strip - (strip // 10000) * 10000
                 formatted_clause = format_clause(adjusted_strip, kuan, xiang, mu, related_law)
             else:
                 formatted_clause = format_clause(strip, kuan, xiang, mu)
-            content = find_content_in_law_structure(strip, kuan, xiang, mu, law_structure_df)
+            content = find_content_in_law_structure(strip, kuan, xiang, mu, law_structure_index)
             if content:
                 clause_content_pairs.append(f"{formatted_clause}    {content}")
                 clause_numbers.append((strip, kuan, xiang, mu))
@@ -134,12 +116,12 @@ def flatten_json(data, new_clause, clause_id):
             flattened_records.append(record)
     return flattened_records
 
-def process_row(coze, bot_id, user_id, row, law_structure_df):
+def process_row(coze, bot_id, user_id, row, law_structure_index):
     """处理单条记录并发送API请求"""
     try:
-        behavior_str, behavior_nums = process_clauses_to_string(row["行为"], law_structure_df)
-        penalty_str, penalty_nums = process_clauses_to_string(row["罚则"], law_structure_df)
-        violation_str, violation_nums = process_clauses_to_string(row["违则"], law_structure_df)
+        behavior_str, behavior_nums = process_clauses_to_string(row["行为"], law_structure_index)
+        penalty_str, penalty_nums = process_clauses_to_string(row["罚则"], law_structure_index)
+        violation_str, violation_nums = process_clauses_to_string(row["违则"], law_structure_index)
         clause_id = row['编号']
         cause = str(row["事由"])
 
@@ -230,12 +212,12 @@ def main(law_ai_result_file, law_structure_file, law_cause_file, output_file):
             logging.warning(f"Skipping sheet {sheet_name}: missing required columns")
             continue
 
-        law_structure_df = law_structure_sheets[sheet_name]
+        law_structure_index = ArticleIndex(law_structure_sheets[sheet_name])
         sheet_results = []
 
         # 使用线程池处理记录
         with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_row = {executor.submit(process_row, coze, bot_id, user_id, row, law_structure_df): row 
+            future_to_row = {executor.submit(process_row, coze, bot_id, user_id, row, law_structure_index): row 
                              for _, row in df.iterrows()}
             
             for future in as_completed(future_to_row):
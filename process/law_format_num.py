@@ -3,367 +3,365 @@ import re
 import os
 import logging
 from openpyxl.styles import Alignment
+from process.tools.chinese_numerals import chinese_to_int, NUMERAL_CHARS
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# 条款引用规范化：每段内容只做一次词法扫描，得到"第N条/款/项/目"记号与其间的文字，
+# 本条、本款、前款、前X款在扫描时展开，之后单独款项的补全与"至"区间的展开都在记号序列上完成，
+# 最后一次拼接成文本。中文条号按 process/tools/chinese_numerals 换算，其余规则与此前逐个正则改写的结果一致。
+REFERENCE_LEXER = re.compile(
+    rf'第(?:\((?P<bracket>[{NUMERAL_CHARS}]+)\)|(?P<chinese>[{NUMERAL_CHARS}]+)|(?P<digits>\d+))(?P<unit>[条款项目])'
+    r'|本(?P<self>条(?!例)|款)'
+    r'|前(?P<previous>\d*)款'
+)
+ARABIC_REFERENCE = re.compile(r'第(\d+)([条款项目])')
+ARTICLE_PATTERN = re.compile(r'第(\d+)条')
+ARTICLE_PARAGRAPH_PATTERN = re.compile(r'第(\d+)条第(\d+)款')
+PARAGRAPH_PATTERN = re.compile(r'第\d+款')
+# "第Z条第Y款"与其后的"第X项"之间允许的间隔
+ITEM_GAP_PATTERN = re.compile(r'\s*,?\s*')
+# 判断"第X项"是否已跟在完整的"第Z条第Y款"之后时向前查看的字数
+ITEM_LOOKBACK = 20
+# "至"区间的写法：(起点的级别, 终点的级别)，按顺序处理
+RANGE_SHAPES = (
+    (('条',), ('条',)),
+    (('条', '款'), ('条', '款')),
+    (('条', '款', '项'), ('条', '款', '项')),
+    (('条', '款', '项'), ('项',)),
+    (('条', '款', '项', '目'), ('条', '款', '项', '目')),
+)
+
+
+# ---- 记号序列 ----
+# 记号为 (级别, 数字串)，如 ('条', '12')；记号之间的文字为 str，相邻的文字合并为一项
+
+def _push_text(tokens, text):
+    if not text:
+        return
+    if tokens and type(tokens[-1]) is str:
+        tokens[-1] += text
+    else:
+        tokens.append(text)
 
-# 中文数字转阿拉伯数字的函数 - 修正版
-def chinese_to_arabic(chinese_str):
-    chinese_dict = {
-        '零': 0, '一': 1, '二': 2, '三': 3, '四': 4, '五': 5,
-        '六': 6, '七': 7, '八': 8, '九': 9, '十': 10,
-        '百': 100, '千': 1000, '万': 10000, '亿': 100000000,
-        '两': 2
-    }
-    
-    # 处理括号格式
-    bracket_pattern = r'第\(([零一二三四五六七八九十百千万亿两]+)\)([条款项目])'
-    def replace_brackets(match):
-        num = match.group(1)
-        unit = match.group(2)
-        return f'第{num}{unit}'
-    result = re.sub(bracket_pattern, replace_brackets, chinese_str)
-    
-    patterns = [
-        r'第([零一二三四五六七八九十百千万亿两]+)条',
-        r'第([零一二三四五六七八九十百千万亿两]+)款',
-        r'第([零一二三四五六七八九十百千万亿两]+)项',
-        r'第([零一二三四五六七八九十百千万亿两]+)目'
-    ]
-    
-    all_matches = []
-    for pattern in patterns:
-        matches = re.finditer(pattern, result)
-        for match in matches:
-            chinese_num = match.group(1)
-            full_match = match.group(0)
-            start, end = match.span()
-            unit_type = full_match[len('第') + len(chinese_num):]
-            
-            # 处理中文数字
-            if chinese_num == '十':
-                total = 10
-            elif chinese_num.startswith('十'):
-                total = 10 + chinese_dict[chinese_num[1]]
-            elif chinese_num.endswith('十'):
-                total = chinese_dict[chinese_num[0]] * 10
-            else:
-                total = 0
-                temp = 0  # 用于累积当前单位的数字
-                unit = 1  # 当前单位
-                for c in reversed(chinese_num):
-                    if c in '零一二三四五六七八九两':
-                        temp = chinese_dict[c] * unit
-                    elif c in '十百千万亿':
-                        if temp == 0:  # 处理单独的“十”、“百”等
-                            temp = 1 * unit
-                        total += temp
-                        unit = chinese_dict[c]
-                        temp = 0
-                if temp != 0:  # 处理剩余的最高位
-                    total += temp
-            
-            arabic_num = total
-            replacement = f'第{arabic_num}{unit_type}'
-            if isinstance(arabic_num, int):
-                all_matches.append((start, end, replacement))
-    
-    all_matches.sort(key=lambda x: x[0], reverse=True)
-    for start, end, replacement in all_matches:
-        result = result[:start] + replacement + result[end:]
-    
-    return result
 
-# 处理"本条"、"本款"引用
-def handle_self_references(text, current_tiao, current_kuan):
-    # 使用正则表达式的负向前瞻确保不会匹配到"本条例"等
-    new_text = re.sub(r'本条(?!例)', f'第{current_tiao}条', text)
-    new_text = re.sub(r'本款', f'第{current_tiao}条第{current_kuan}款', new_text)
-    return new_text
-
-# 处理"前款"或"前X款"引用
-def handle_previous_references(text, current_tiao, current_kuan):
-    # 处理"前款"
-    text = re.sub(r'前款', f'第{current_tiao}条第{current_kuan - 1}款', text)
-    # 处理"前X款"
-    def replace_previous_x_kuan(match):
-        x = int(match.group(1))
-        previous_kuan = []
-        for i in range(current_kuan - x, current_kuan):
-            if i > 0:  # 确保款号大于0
-                previous_kuan.append(f'第{current_tiao}条第{i}款')
-        return '、'.join(previous_kuan)
-
-    text = re.sub(r'前(\d+)款', replace_previous_x_kuan, text)
-    return text
-
-# 处理范围引用（使用"至"连接）
-def handle_range_references(text):
-    patterns = [
-        r'(第\d+条)至(第\d+条)',  # 条范围
-        r'(第\d+条第\d+款)至(第\d+条第\d+款)',  # 款范围
-        r'(第\d+条第\d+款第\d+项)至(第\d+条第\d+款第\d+项)',  # 完整项范围
-        r'(第\d+条第\d+款第\d+项)至第(\d+)项',  # 简写项范围
-        r'(第\d+条第\d+款第\d+项第\d+目)至(第\d+条第\d+款第\d+项第\d+目)'  # 目范围
-    ]
-    
-    for pattern in patterns:
-        matches = list(re.finditer(pattern, text))
-        for match in reversed(matches):
-            start_ref = match.group(1)
-            end_ref = match.group(2)
-            full_match = match.group(0)
-            print(text)
-
-            if '目' in start_ref:  # 处理到"目"级别
-                start_tiao = int(re.search(r'第(\d+)条', start_ref).group(1))
-                start_kuan = int(re.search(r'第\d+条第(\d+)款', start_ref).group(1))
-                start_xiang = int(re.search(r'第\d+条第\d+款第(\d+)项', start_ref).group(1))
-                start_mu = int(re.search(r'第\d+条第\d+款第\d+项第(\d+)目', start_ref).group(1))
-                
-                end_tiao = int(re.search(r'第(\d+)条', end_ref).group(1))
-                end_kuan = int(re.search(r'第\d+条第(\d+)款', end_ref).group(1))
-                end_xiang = int(re.search(r'第\d+条第\d+款第(\d+)项', end_ref).group(1))
-                end_mu = int(re.search(r'第\d+条第\d+款第\d+项第(\d+)目', end_ref).group(1))
-                
-                if start_tiao == end_tiao and start_kuan == end_kuan and start_xiang == end_xiang:
-                    expanded_refs = []
-                    for mu in range(start_mu, end_mu + 1):
-                        expanded_refs.append(f'第{start_tiao}条第{start_kuan}款第{start_xiang}项第{mu}目')
-                    expanded_text = '、'.join(expanded_refs)
-                    text = text.replace(full_match, expanded_text)
-            
-            elif pattern == r'(第\d+条第\d+款第\d+项)至第(\d+)项':  # 处理简写项范围
-                start_tiao = int(re.search(r'第(\d+)条', start_ref).group(1))
-                start_kuan = int(re.search(r'第\d+条第(\d+)款', start_ref).group(1))
-                start_xiang = int(re.search(r'第\d+条第\d+款第(\d+)项', start_ref).group(1))
-                end_xiang = int(end_ref)  # end_ref 已经是数字，直接使用
-                
-                expanded_refs = []
-                for xiang in range(start_xiang, end_xiang + 1):
-                    expanded_refs.append(f'第{start_tiao}条第{start_kuan}款第{xiang}项')
-                expanded_text = '、'.join(expanded_refs)
-                text = text.replace(full_match, expanded_text)
-            
-            elif '项' in start_ref:  # 处理完整项范围
-                start_tiao = int(re.search(r'第(\d+)条', start_ref).group(1))
-                start_kuan = int(re.search(r'第\d+条第(\d+)款', start_ref).group(1))
-                start_xiang = int(re.search(r'第\d+条第\d+款第(\d+)项', start_ref).group(1))
-                
-                end_tiao = int(re.search(r'第(\d+)条', end_ref).group(1))
-                end_kuan = int(re.search(r'第\d+条第(\d+)款', end_ref).group(1))
-                end_xiang = int(re.search(r'第\d+条第\d+款第(\d+)项', end_ref).group(1))
-                
-                if start_tiao == end_tiao and start_kuan == end_kuan:
-                    expanded_refs = []
-                    for xiang in range(start_xiang, end_xiang + 1):
-                        expanded_refs.append(f'第{start_tiao}条第{start_kuan}款第{xiang}项')
-                    expanded_text = '、'.join(expanded_refs)
-                    text = text.replace(full_match, expanded_text)
-            
-            elif '款' in start_ref:  # 处理到"款"级别
-                start_tiao = int(re.search(r'第(\d+)条', start_ref).group(1))
-                start_kuan = int(re.search(r'第\d+条第(\d+)款', start_ref).group(1))
-                
-                end_tiao = int(re.search(r'第(\d+)条', end_ref).group(1))
-                end_kuan = int(re.search(r'第\d+条第(\d+)款', end_ref).group(1))
-                
-                if start_tiao == end_tiao:
-                    expanded_refs = []
-                    for kuan in range(start_kuan, end_kuan + 1):
-                        expanded_refs.append(f'第{start_tiao}条第{kuan}款')
-                    expanded_text = '、'.join(expanded_refs)
-                    text = text.replace(full_match, expanded_text)
-            
-            else:  # 处理"条"级别
-                start_tiao = int(re.search(r'第(\d+)条', start_ref).group(1))
-                end_tiao = int(re.search(r'第(\d+)条', end_ref).group(1))
-                
-                expanded_refs = []
-                for tiao in range(start_tiao, end_tiao + 1):
-                    expanded_refs.append(f'第{tiao}条')
-                expanded_text = '、'.join(expanded_refs)
-                text = text.replace(full_match, expanded_text)
-    
-    return text
-    
-#补全款项，针对比如：违反第1款第1项、第5项规定
-def handle_standalone_clauses(content, df, current_tiao):
-    if not isinstance(content, str):
-        return str(content) if content is not None else ""
-
-    try:
-        # 定义匹配模式
-        kuan_pattern = r'第(\d+)款'  # 匹配“第X款”
-        xiang_pattern = r'第(\d+)项'  # 匹配“第X项”
-        tiao_pattern = r'第(\d+)条'  # 匹配“第X条”
-        tiao_kuan_pattern = r'第(\d+)条第(\d+)款'  # 匹配“第Z条第Y款”
-        tiao_kuan_xiang_pattern = r'第(\d+)条第(\d+)款第(\d+)项'  # 匹配“第Z条第Y款第X项”
-
-        # 查找所有“第X款”和“第X项”
-        kuan_matches = list(re.finditer(kuan_pattern, content))
-        xiang_matches = list(re.finditer(xiang_pattern, content))
-        
-        # 合并所有匹配，按位置从后向前处理
-        all_matches = []
-        for match in kuan_matches:
-            all_matches.append(('kuan', match))
-        for match in xiang_matches:
-            all_matches.append(('xiang', match))
-        all_matches.sort(key=lambda x: x[1].start(), reverse=True)
-
-        # 处理每个匹配
-        for match_type, match in all_matches:
-            full_text = match.group(0)  # 如“第5款”或“第5项”
-            num = match.group(1)       # 如“5”
-            start_pos = match.start()  # 匹配起始位置
-            
-            # 获取匹配前的子字符串
-            substring_before = content[:start_pos]
-            
-            if match_type == 'kuan':
-                # 检查“第X款”前是否紧跟“第Y条”
-                if re.search(tiao_pattern + r'\s*$', substring_before):
+def _push_reference(tokens, unit, number):
+    """追加"第{number}{unit}"，编号不是数字时（如条号为空）按文字处理"""
+    digits = f'{number}'
+    if digits.isdecimal():
+        tokens.append((unit, digits))
+    else:
+        _push_text(tokens, f'第{digits}{unit}')
+
+
+def render_tokens(tokens):
+    return ''.join(token if type(token) is str else f'第{token[1]}{token[0]}' for token in tokens)
+
+
+def _lex_arabic(text):
+    tokens = []
+    last = 0
+    for match in ARABIC_REFERENCE.finditer(text):
+        _push_text(tokens, text[last:match.start()])
+        tokens.append((match.group(2), match.group(1)))
+        last = match.end()
+    _push_text(tokens, text[last:])
+    return tokens
+
+
+def lex_references(content, current_tiao, current_kuan):
+    """扫描内容得到记号序列，同时将中文条号转为数字、展开"本条""本款""前款""前X款" """
+    tokens = []
+    last = 0
+    removed = False
+    for match in REFERENCE_LEXER.finditer(content):
+        _push_text(tokens, content[last:match.start()])
+        last = match.end()
+        unit = match.group('unit')
+        if unit:
+            digits = match.group('digits')
+            if digits is None:
+                number = chinese_to_int(match.group('bracket') or match.group('chinese'))
+                if number is None:
+                    # 不是有效的中文数字（如"第十百条"），只去掉括号
+                    _push_text(tokens, f"第{match.group('bracket') or match.group('chinese')}{unit}")
                     continue
-                
-                # 向前查找最近的“第Y条”
-                tiao_matches = list(re.finditer(tiao_pattern, substring_before))
-                if tiao_matches:
-                    last_tiao_match = tiao_matches[-1]
-                    tiao_num = last_tiao_match.group(1)
-                    replacement = f'第{tiao_num}条第{num}款'
-                    content = content[:start_pos] + replacement + content[start_pos + len(full_text):]
-                else:
-                    # 查找同条号的第一款内容
-                    first_kuan = df[(df['条'] == current_tiao) & (df['款'] == 1)]
-                    if not first_kuan.empty and pd.notna(first_kuan.iloc[0]['内容']):
-                        first_kuan_content = str(first_kuan.iloc[0]['内容'])
-                        # 查找第一个独立的“第Z条”（后面不紧跟“第X款”）
-                        tiao_matches_in_first = list(re.finditer(tiao_pattern, first_kuan_content))
-                        for tiao_match in tiao_matches_in_first:
-                            tiao_num = tiao_match.group(1)
-                            tiao_end_pos = tiao_match.end()
-                            if not re.search(r'第\d+款', first_kuan_content[tiao_end_pos:tiao_end_pos+5]):  # 检查后5个字符
-                                replacement = f'第{tiao_num}条第{num}款'
-                                content = content[:start_pos] + replacement + content[start_pos + len(full_text):]
-                                break
-                            else:
-                                logging.info(f"独立款项 '{full_text}' 没有找到匹配的条号前级，位置: {start_pos}")
-                    else:
-                        logging.info(f"独立款项 '{full_text}' 没有找到匹配的条号前级，位置: {start_pos}")
-
-            elif match_type == 'xiang':
-                # 检查“第X项”前是否已经是“第Z条第Y款第X项”完整模式（包括后面有逗号的情况）
-                recent_text = substring_before[-20:]  # 检查前20个字符，避免过长
-                if re.search(tiao_kuan_pattern + r'\s*,?\s*$', recent_text):
-                    continue  # 如果前文已经是完整引用，跳过处理
-
-                # 情况1：检查“第X项”前是否有“第Z条第Y款”（如“第40条第1款 第5项”）
-                tiao_kuan_matches = list(re.finditer(tiao_kuan_pattern, substring_before))
-                if tiao_kuan_matches:
-                    # 取最近的“第Z条第Y款”
-                    last_tiao_kuan_match = tiao_kuan_matches[-1]
-                    tiao_num = last_tiao_kuan_match.group(1)
-                    kuan_num = last_tiao_kuan_match.group(2)
-                    # 检查“第Z条第Y款”是否属于一个完整引用的一部分
-                    tiao_kuan_end_pos = last_tiao_kuan_match.end()
-                    # 如果“第Z条第Y款”后面紧跟“第W项”，说明它已经是完整引用的一部分
-                    if re.search(tiao_kuan_xiang_pattern + r'\s*,?\s*$', substring_before[:tiao_kuan_end_pos]):
-                        continue  # 跳过处理，避免重复补全
-                    # 否则，使用最近的“第Z条第Y款”补全
-                    replacement = f'第{tiao_num}条第{kuan_num}款第{num}项'
-                    content = content[:start_pos] + replacement + content[start_pos + len(full_text):]
-                    continue  # 已处理，跳过后续逻辑
-                
-                # 情况2：检查“第X项”前是否紧跟“第Y款”（如“第2款 第5项”）
-                kuan_matches_before = list(re.finditer(kuan_pattern, substring_before))
-                if kuan_matches_before:
-                    last_kuan_match = kuan_matches_before[-1]
-                    kuan_num = last_kuan_match.group(1)
-                    # 查找“第Y款”前的“第Z条”
-                    kuan_start_pos = last_kuan_match.start()
-                    tiao_matches_before_kuan = list(re.finditer(tiao_pattern, substring_before[:kuan_start_pos]))
-                    if tiao_matches_before_kuan:
-                        last_tiao_match = tiao_matches_before_kuan[-1]
-                        tiao_num = last_tiao_match.group(1)
-                        replacement = f'第{tiao_num}条第{kuan_num}款第{num}项'
-                    else:
-                        replacement = f'第{kuan_num}款第{num}项'
-                    content = content[:start_pos] + replacement + content[start_pos + len(full_text):]
-                    continue  # 已处理，跳过后续逻辑
-                
-                # 情况3：前文无“第Y款”，需要推断
-                first_kuan = df[(df['条'] == current_tiao) & (df['款'] == 1)]
-                if not first_kuan.empty and pd.notna(first_kuan.iloc[0]['内容']) and '下列' in first_kuan.iloc[0]['内容']:
-                    first_kuan_content = str(first_kuan.iloc[0]['内容'])
-                    # 寻找“第X条”或者“第X条第X款”
-                    tiao_matches = list(re.finditer(tiao_pattern, first_kuan_content))
-                    kuan_tiao_matches = list(re.finditer(r'第(\d+)条第(\d+)款', first_kuan_content))
-                    if kuan_tiao_matches:
-                        last_kuan_tiao_match = kuan_tiao_matches[-1]
-                        tiao_num = last_kuan_tiao_match.group(1)
-                        kuan_num = last_kuan_tiao_match.group(2)
-                        replacement = f'第{tiao_num}条第{kuan_num}款第{num}项'
-                        content = content[:start_pos] + replacement + content[start_pos + len(full_text):]
-                    elif tiao_matches:
-                        last_tiao_match = tiao_matches[-1]
-                        tiao_num = last_tiao_match.group(1)
-                        replacement = f'第{tiao_num}条第1款第{num}项'
-                        content = content[:start_pos] + replacement + content[start_pos + len(full_text):]
-                    else:
-                        logging.info(f"独立款项 '{full_text}' 没有找到匹配的条号或款号前级，位置: {start_pos}")
+                digits = str(number)
+            tokens.append((unit, digits))
+        elif match.group('self') == '款':
+            _push_reference(tokens, '条', current_tiao)
+            _push_reference(tokens, '款', current_kuan)
+        elif match.group('self'):
+            _push_reference(tokens, '条', current_tiao)
+        elif not current_kuan > 0:
+            _push_text(tokens, match.group(0))
+        elif not match.group('previous'):
+            _push_reference(tokens, '条', current_tiao)
+            _push_reference(tokens, '款', current_kuan - 1)
+        else:
+            previous_kuan = [i for i in range(current_kuan - int(match.group('previous')), current_kuan) if i > 0]
+            for index, kuan in enumerate(previous_kuan):
+                if index:
+                    _push_text(tokens, '、')
+                _push_reference(tokens, '条', current_tiao)
+                _push_reference(tokens, '款', kuan)
+            removed = removed or not previous_kuan
+    _push_text(tokens, content[last:])
+    # 引用被整体删去时前后文字相接，可能拼出新的条号，重新切分
+    return _lex_arabic(render_tokens(tokens)) if removed else tokens
+
+
+def attach_standalone_sections(tokens):
+    """单独的"第X款"补上前面最近的"第Y条"（紧跟在条之后的除外）"""
+    result = []
+    last_tiao = None
+    previous = None
+    gap = ''
+    for token in tokens:
+        if type(token) is str:
+            result.append(token)
+            gap = token
+            continue
+        unit, digits = token
+        if unit == '款' and last_tiao is not None and not (previous == '条' and (not gap or gap.isspace())):
+            result.append(('条', last_tiao))
+        result.append(token)
+        if unit == '条':
+            last_tiao = digits
+        previous = unit
+        gap = ''
+    return result
+
+
+def insert_default_paragraph(tokens):
+    """"第X条第Y项"补为"第X条第1款第Y项" """
+    result = []
+    for token in tokens:
+        if type(token) is tuple and token[0] == '项' and result \
+                and type(result[-1]) is tuple and result[-1][0] == '条':
+            result.append(('款', '1'))
+        result.append(token)
+    return result
+
+
+def _paragraph_from_first(kuan, first_paragraph):
+    """前文没有条号的"第X款"，用同条第一款中第一个后面不跟款号的"第Z条"补全"""
+    content = first_paragraph() if first_paragraph else None
+    if content is None:
+        logging.info(f"独立款项 '第{kuan}款' 没有找到匹配的条号前级")
+        return None
+    content = str(content)
+    for match in ARTICLE_PATTERN.finditer(content):
+        if not PARAGRAPH_PATTERN.search(content, match.end(), match.end() + 5):
+            return [('条', match.group(1)), ('款', kuan)]
+        logging.info(f"独立款项 '第{kuan}款' 没有找到匹配的条号前级")
+    return None
+
+
+def _item_from_first(xiang, first_paragraph):
+    """前文没有款号的"第X项"，按同条第一款（含"下列"）中最后的"第Z条第Y款"或"第Z条"补全"""
+    content = first_paragraph() if first_paragraph else None
+    if content is None or '下列' not in content:
+        logging.info(f"独立款项 '第{xiang}项' 没有找到匹配的款号前级")
+        return None
+    content = str(content)
+    pairs = list(ARTICLE_PARAGRAPH_PATTERN.finditer(content))
+    if pairs:
+        return [('条', pairs[-1].group(1)), ('款', pairs[-1].group(2)), ('项', xiang)]
+    articles = list(ARTICLE_PATTERN.finditer(content))
+    if articles:
+        return [('条', articles[-1].group(1)), ('款', '1'), ('项', xiang)]
+    logging.info(f"独立款项 '第{xiang}项' 没有找到匹配的条号或款号前级")
+    return None
+
+
+def complete_standalone_clauses(tokens, first_paragraph=None):
+    """补全单独的"第X款""第X项"，比如：违反第1款第1项、第5项规定
+
+    first_paragraph 返回同条第一款的内容（没有时为 None），前文找不到条、款时才调用。
+    判断只依据原记号序列中当前位置之前的部分。
+    """
+    result = []
+    position = 0
+    last_tiao = None  # 最近的"第Z条"
+    last_pair = None  # 最近的相邻"第Z条第Y款"
+    last_kuan = None  # 最近的"第Y款"及其之前最近的"第Z条"
+    previous = None  # 前一个记号：(级别, 数字串, 位置, 与其相邻的更前一个记号)
+    gap = ''
+    for token in tokens:
+        if type(token) is str:
+            result.append(token)
+            position += len(token)
+            gap = token
+            continue
+        unit, digits = token
+        replacement = None
+        if unit == '款':
+            if not (previous and previous[0] == '条' and (not gap or gap.isspace())):
+                if last_tiao is not None:
+                    replacement = [('条', last_tiao), token]
                 else:
-                    logging.info(f"独立款项 '{full_text}' 没有找到匹配的款号前级，位置: {start_pos}")
-
-    except Exception as e:
-        logging.error(f"处理单独款项时出错: {str(e)}")
-    
-    return content
-
-def handle_standalone_sections(content):
-    if not isinstance(content, str):
-        return str(content) if content is not None else ""
-    try:
-        # 查找所有"第X款"
-        kuan_pattern = r'第(\d+)款'
-        kuan_matches = list(re.finditer(kuan_pattern, content))
-        
-        # 从后向前处理每个匹配
-        for match in reversed(kuan_matches):
-            kuan_text = match.group(0)
-            kuan_num = match.group(1)
-            start_pos = match.start()
-            
-            # 检查前面是否紧跟"第X条"
-            tiao_pattern = r'第(\d+)条'
-            substring_before = content[:start_pos]
-            if re.search(tiao_pattern + r'\s*$', substring_before):
+                    replacement = _paragraph_from_first(digits, first_paragraph)
+        elif unit == '项':
+            complete = previous and previous[0] == '款' and ITEM_GAP_PATTERN.fullmatch(gap) \
+                and previous[3] and previous[3][0] == '条' and previous[3][2] >= position - ITEM_LOOKBACK
+            if complete:
+                pass
+            elif last_pair:
+                replacement = [('条', last_pair[0]), ('款', last_pair[1]), token]
+            elif last_kuan:
+                kuan, tiao = last_kuan
+                replacement = ([('条', tiao)] if tiao is not None else []) + [('款', kuan), token]
+            else:
+                replacement = _item_from_first(digits, first_paragraph)
+        if replacement:
+            result.extend(replacement)
+        else:
+            result.append(token)
+
+        adjacent = previous if not gap else None
+        if unit == '款':
+            if adjacent and adjacent[0] == '条':
+                last_pair = (adjacent[1], digits)
+            last_kuan = (digits, last_tiao)
+        elif unit == '条':
+            last_tiao = digits
+        previous = (unit, digits, position, adjacent)
+        position += len(digits) + 2
+        gap = ''
+    return result
+
+
+def _range_sites(tokens, start_units, end_units):
+    """从左到右不重叠地找出"起点至终点"的位置"""
+    sites = []
+    last_end = 0
+    for index, token in enumerate(tokens):
+        if token != '至':
+            continue
+        start, end = index - len(start_units), index + 1 + len(end_units)
+        if start < last_end or end > len(tokens):
+            continue
+        refs = tokens[start:index] + tokens[index + 1:end]
+        if all(type(ref) is tuple and ref[0] == unit for ref, unit in zip(refs, start_units + end_units)):
+            sites.append(tuple(tokens[start:end]))
+            last_end = end
+    return sites
+
+
+def _range_expansion(site, shape):
+    """区间展开后的记号，起止不在同一上级下时返回 None"""
+    numbers = [int(token[1]) for token in site if type(token) is tuple]
+    start_units, end_units = RANGE_SHAPES[shape]
+    start, end = numbers[:len(start_units)], numbers[len(start_units):]
+    if shape == 3:  # 第Z条第Y款第X项至第W项
+        end = start[:2] + end
+    elif start[:-1] != end[:-1]:
+        return None
+    expanded = []
+    for number in range(start[-1], end[-1] + 1):
+        if expanded:
+            expanded.append('、')
+        expanded.extend(zip(start_units, [str(value) for value in start[:-1]] + [str(number)]))
+    return expanded
+
+
+def _replace_all(tokens, site, expanded):
+    result = []
+    index = 0
+    size = len(site)
+    while index < len(tokens):
+        if tokens[index] == site[0] and tuple(tokens[index:index + size]) == site:
+            result.extend(expanded)
+            index += size
+        else:
+            result.append(tokens[index])
+            index += 1
+    return result
+
+
+def expand_ranges(tokens):
+    """展开"第X条至第Y条""第X条第1款第2项至第5项"等区间，相同写法在全文中一并替换"""
+    if '至' not in tokens:
+        return tokens
+    for shape, (start_units, end_units) in enumerate(RANGE_SHAPES):
+        for site in reversed(_range_sites(tokens, start_units, end_units)):
+            expanded = _range_expansion(site, shape)
+            if expanded is None:
                 continue
-            
-            # 向前查找最近的"第X条"
-            tiao_matches = list(re.finditer(tiao_pattern, substring_before))
-            
-            if tiao_matches:
-                last_tiao_match = tiao_matches[-1]
-                tiao_num = last_tiao_match.group(1)
-                replacement = f'第{tiao_num}条第{kuan_num}款'
-                content = content[:start_pos] + replacement + content[start_pos + len(kuan_text):]
-    
-    except Exception as e:
-        print(f"处理单独段落时出错: {str(e)}")
-        pass
-    
-    return content
-
-# 新增函数：处理“第X条第X项”为“第X第一条第X项”
-def handle_article_item_reference(content):
-    pattern = r'第(\d+)条第(\d+)项'
-    def replace_match(match):
-        tiao_num = match.group(1)
-        xiang_num = match.group(2)
-        return f'第{tiao_num}条第1款第{xiang_num}项'
-    return re.sub(pattern, replace_match, content)
+            tokens = _replace_all(tokens, site, expanded)
+            if not expanded:
+                tokens = _lex_arabic(render_tokens(tokens))
+    return tokens
+
+
+def normalize_references(content, current_tiao, current_kuan, first_paragraph=None):
+    """规范化一段内容中的条款引用：转数字、展开本条/本款/前款、补全单独款项、展开区间"""
+    if not isinstance(content, str) or ('第' not in content and '本' not in content and '前' not in content):
+        return content
+    tokens = lex_references(content, current_tiao, current_kuan)
+    if len(tokens) == 1 and type(tokens[0]) is str:
+        return tokens[0]
+    tokens = attach_standalone_sections(tokens)
+    tokens = insert_default_paragraph(tokens)
+    tokens = complete_standalone_clauses(tokens, first_paragraph)
+    tokens = expand_ranges(tokens)
+    return render_tokens(tokens)
+
+
+# 按条款规范化一个sheet的"内容"列
+def format_sheet(df):
+    contents = df['内容'].tolist()
+    articles = df['条'].tolist()
+    paragraphs = [0 if missing else value for value, missing in zip(df['款'].tolist(), df['款'].isna().tolist())]
+    items = [0 if missing else value for value, missing in zip(df['项'].tolist(), df['项'].isna().tolist())]
+
+    # 各条第一款所在的行，补全单独款项时读取其（已处理过的）内容
+    first_rows = {}
+    for position, (article, paragraph, missing) in enumerate(zip(articles, paragraphs, df['条'].isna().tolist())):
+        if paragraph == 1 and not missing:
+            first_rows.setdefault(article, position)
+
+    # 各条罚则为1的记录的款号（升序），步骤6按条号取用，不再逐行筛选整表
+    penalty_kuans_by_tiao = {}
+    if '罚则' in df.columns:
+        penalty_records = df.loc[df['罚则'] == 1, ['条', '款']].dropna()
+        penalty_kuans_by_tiao = {
+            article: sorted(kuans.astype(int).tolist()) for article, kuans in penalty_records.groupby('条')['款']
+        }
+
+    def first_paragraph_of(article):
+        position = first_rows.get(article)
+        if position is None or pd.isna(contents[position]):
+            return None
+        return contents[position]
+
+    for position, content in enumerate(contents):
+        current_tiao = articles[position]
+        current_kuan = paragraphs[position]
+        current_xiang = items[position]
+
+        # 步骤1-5：转数字、本条/本款/前款、单独款项补全、区间展开
+        content = normalize_references(
+            content, current_tiao, current_kuan,
+            first_paragraph=lambda: first_paragraph_of(current_tiao)
+        )
+
+        # 步骤6：如果paragraph_num和item_num都为0，查找同号下的罚则为1的记录
+        if current_kuan == 0 and current_xiang == 0:
+            penalty_kuans = penalty_kuans_by_tiao.get(current_tiao)
+            if penalty_kuans:
+                # 用"|"连接所有罚则引用，添加到内容末尾
+                penalty_refs = [f'第{current_tiao}条第{kuan}款' for kuan in penalty_kuans]
+                penalty_text = '|'.join(penalty_refs)
+                content = f"{content} {penalty_text}"
+
+        contents[position] = content
+
+    df['内容'] = contents
+    return df
+
 
 # 主函数处理Excel文件
 def process_legal_document(file_path, output_path):
@@ -383,70 +381,10 @@ def process_legal_document(file_path, output_path):
                 df.to_excel(writer, sheet_name=sheet_name, index=False)
                 continue
 
-            # 处理每一行数据
-            for idx, row in df.iterrows():
-                content = row['内容']
-                current_tiao = row['条']
-                current_kuan = row['款'] if not pd.isna(row['款']) else 0
-                current_xiang = row['项'] if not pd.isna(row['项']) else 0
-                current_mu = row['目'] if not pd.isna(row['目']) else 0
-                #print(f"处理前第 {idx} 行内容: {content}")
-
-                # 步骤1：将中文数字转换为阿拉伯数字
-                content = chinese_to_arabic(content)
-
-                # 步骤2：处理"本条"、"本款"引用
-                content = handle_self_references(content, current_tiao, current_kuan)
-
-                # 步骤3：处理"前款"或"前X款"引用
-                if current_kuan > 0:  # 确保是在有款号的情况下处理
-                    content = handle_previous_references(content, current_tiao, current_kuan)               
-
-                # 步骤5：处理文本中的单独"第X款"
-                content = handle_standalone_sections(content)
-
-                 # 步骤5.1：处理“第X条第X项”为“第X条第1款第X项”
-                content = handle_article_item_reference(content)
-
-
-                # 步骤5.2：处理单独的“第X款”或“第X项”，补全上下文
-                content = handle_standalone_clauses(content, df, current_tiao)
-
-               
-
-                # 步骤6：如果paragraph_num和item_num都为0，查找同号下的罚则为1的记录
-                if current_kuan == 0 and current_xiang == 0:
-                    # 查找同号下的罚则为1的记录
-                    penalty_records = df[
-                        (df['条'] == current_tiao) & 
-                        (df['罚则'] == 1)
-                    ]
-                    
-                    if not penalty_records.empty:
-                        # 获取所有罚则记录的款号
-                        penalty_kuans = penalty_records['款'].dropna().astype(int).tolist()
-                        if penalty_kuans:
-                            # 将款号排序
-                            penalty_kuans.sort()
-                            # 构建罚则引用文本
-                            penalty_refs = [f'第{current_tiao}条第{kuan}款' for kuan in penalty_kuans]
-                            # 用"|"连接所有罚则引用
-                            penalty_text = '|'.join(penalty_refs)
-                            # 将罚则引用添加到内容末尾
-                            content = f"{content} {penalty_text}"
-
-                 # 步骤4：处理范围引用（使用"至"连接）
-                content = handle_range_references(content)
-                # 更新处理后的内容
-                df.at[idx, '内容'] = content
-                #print(f"处理后第 {idx} 行内容: {content}")
+            df = format_sheet(df)
 
             # 将处理后的数据写入新的Excel文件
-            df.to_excel(writer, sheet_name=sheet_name, index=False) 
-
-        
-            
-            
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
 
     print(f"处理完成，结果已保存至: {output_path}")
 
@@ -457,4 +395,4 @@ if __name__ == "__main__":
     if os.path.exists(input_file):
         process_legal_document(input_file, output_file)
     else:
-        print(f"输入文件 {input_file} 不存在，请检查文件路径。")
\ No newline at end of file
+        print(f"输入文件 {input_file} 不存在，请检查文件路径。")
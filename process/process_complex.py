@@ -2,6 +2,22 @@ import pandas as pd
 import re
 import os
 from openpyxl import load_workbook
+from process.tools.article_index import ArticleIndex
+
+
+def clauses_of_article(article_index, tiao_num, column):
+    """同一条中指定列为 1 的各行，格式化为“第X条第Y款第Z项”"""
+    clauses = []
+    for label in article_index.where(article_index.article(tiao_num), **{column: 1}):
+        _, kuan, xiang, _ = article_index.key(label)
+        clause = f"第{tiao_num}条"
+        if kuan > 0:
+            clause += f"第{kuan}款"
+        if xiang > 0:
+            clause += f"第{xiang}项"
+        clauses.append(clause)
+    return clauses
+
 
 def process_excel(file_path):
     # 读取 Excel 文件
@@ -20,6 +36,8 @@ def process_excel(file_path):
             print(f"Sheet {sheet_name} 缺少必要的列，跳过处理")
             continue
 
+        article_index = ArticleIndex(df)
+
         # 处理每一行数据
         for idx, row in df.iterrows():
             content = row['内容']
@@ -33,16 +51,7 @@ def process_excel(file_path):
                 matches = re.findall(r'第(\d+)条(?!第\d+款)', content)
                 for match in matches:
                     tiao_num = int(match)
-                    relevant_rows = df[df['条'] == tiao_num]
-                    penalty_clauses = []
-                    for _, rel_row in relevant_rows.iterrows():
-                        if rel_row['罚则'] == 1:
-                            clause = f"第{tiao_num}条"
-                            if rel_row['款'] > 0:
-                                clause += f"第{int(rel_row['款'])}款"
-                            if rel_row['项'] > 0:
-                                clause += f"第{int(rel_row['项'])}项"
-                            penalty_clauses.append(clause)
+                    penalty_clauses = clauses_of_article(article_index, tiao_num, '罚则')
                     if penalty_clauses:
                         replacement = '、'.join(penalty_clauses)
                         content = content.replace(f"第{tiao_num}条", replacement)
@@ -51,16 +60,7 @@ def process_excel(file_path):
                 matches = re.findall(r'第(\d+)条(?!第\d+款)', content)
                 for match in matches:
                     tiao_num = int(match)
-                    relevant_rows = df[df['条'] == tiao_num]
-                    violation_clauses = []
-                    for _, rel_row in relevant_rows.iterrows():
-                        if rel_row['违法情形'] == 1:
-                            clause = f"第{tiao_num}条"
-                            if rel_row['款'] > 0:
-                                clause += f"第{int(rel_row['款'])}款"
-                            if rel_row['项'] > 0:
-                                clause += f"第{int(rel_row['项'])}项"
-                            violation_clauses.append(clause)
+                    violation_clauses = clauses_of_article(article_index, tiao_num, '违法情形')
                     if violation_clauses:
                         replacement = '、'.join(violation_clauses)
                         content = content.replace(f"第{tiao_num}条", replacement)
@@ -1,5 +1,7 @@
 import pandas as pd
 import re
+from process.tools.clause_parser import scan_clauses
+from process.tools.article_index import ArticleIndex
 
 def check_text_in_array(target_text, text_array):
     for index, text in enumerate(text_array):
@@ -24,6 +26,8 @@ def process_law_penalty(file_path):
             if '增加处罚' not in df.columns:
                 df['增加处罚'] = ''
 
+            article_index = ArticleIndex(df)
+
             # 筛选符合条件的记录
             filtered_df = df[
                 (df['罚则'] == 1) &  # 涉及处罚
@@ -33,7 +37,6 @@ def process_law_penalty(file_path):
 
             # 定义正则表达式模式
             overall_pattern = r'(依照|按照)(.*?)(条|款)(.*?)(处罚|罚款|责令改正)'  # 匹配处罚引用文本
-            clause_pattern = r'第(\d+)条(?:第(\d+)款)?(?:第(\d+)项)?'  # 提取条款编号
 
             # 处理筛选出的记录
             for index, row in filtered_df.iterrows():
@@ -44,13 +47,13 @@ def process_law_penalty(file_path):
                 # 分析每个匹配的引用
                 for overall_match in overall_matches:
                     overall_text = ''.join(overall_match)
-                    clause_matches = re.findall(clause_pattern, overall_text)
+                    clause_matches = [ref for ref in scan_clauses(overall_text) if ref.article is not None]
 
                     # 提取并整理条款信息
                     for match in clause_matches:
-                        article_num = int(match[0])  # 条号
-                        paragraph_num = int(match[1]) if match[1] else 0  # 款号
-                        item_num = int(match[2]) if match[2] else 0  # 项号
+                        article_num = match.article  # 条号
+                        paragraph_num = match.paragraph or 0  # 款号
+                        item_num = match.item or 0  # 项号
 
                         # 构建引用文本
                         ref_text = f"第{article_num}条"
@@ -61,10 +64,9 @@ def process_law_penalty(file_path):
 
                         # 如果 paragraph_num 和 item_num 都为 0，查找同条号下罚则为 1 的记录
                         if paragraph_num == 0 and item_num == 0:
-                            penalty_records = df[
-                                (df['条'] == article_num) & 
-                                (df['罚则'] == 1)
-                            ]
+                            penalty_records = article_index.rows(
+                                article_index.where(article_index.article(article_num), 罚则=1)
+                            )
                             #如果不为空，则遍历罚则为1的记录，将条号和款号拼接成字符串
                             if not penalty_records.empty:
                                 ref_texts = []
@@ -1,5 +1,7 @@
 import pandas as pd
 import re
+from process.tools.clause_parser import scan_clauses
+from process.tools.article_index import ArticleIndex
 
 def process_law_penalty(file_path):
     # 打开 Excel 文件并获取所有工作表名称
@@ -18,12 +20,13 @@ def process_law_penalty(file_path):
             if '增加处罚' not in df.columns:
                 df['增加处罚'] = ''
 
+            article_index = ArticleIndex(df)
+
             # 筛选符合条件的记录：条类型等于 6
             filtered_df = df[df['条类型'] == 6]
 
             # 定义正则表达式模式
             overall_pattern = r'(依照|按照)(.*?)(条|款)(.*?)(处罚|罚款|责令改正)'  # 匹配处罚引用文本
-            clause_pattern = r'第(\d+)条(?:第(\d+)款)?(?:第(\d+)项)?'  # 提取条款编号
             penalty_keywords = r'(罚款|责令改正|没收|吊销)'  # 处罚相关关键词
 
             # 处理筛选出的记录
@@ -35,14 +38,14 @@ def process_law_penalty(file_path):
                 ref_text_B1 = []
                 for overall_match in overall_matches:
                     overall_text = ''.join(overall_match)
-                    clause_matches = re.findall(clause_pattern, overall_text)
+                    clause_matches = [ref for ref in scan_clauses(overall_text) if ref.article is not None]
                     #print(f"在处罚引用文本 {overall_text} 中找到 {len(clause_matches)} 个条款编号")
 
                     # 提取并整理条款信息
                     for match in clause_matches:
-                        article_num = int(match[0])  # 条号
-                        paragraph_num = int(match[1]) if match[1] else 0  # 款号
-                        item_num = int(match[2]) if match[2] else 0  # 项号
+                        article_num = match.article  # 条号
+                        paragraph_num = match.paragraph or 0  # 款号
+                        item_num = match.item or 0  # 项号
 
                         # 构建引用文本
                         ref_text = f"第{article_num}条"
@@ -52,12 +55,10 @@ def process_law_penalty(file_path):
                             ref_text += f"第{item_num}项"
 
                         # 查找相关记录，要求包含处罚关键词
-                        related_records = df[
-                            (df['条'] == article_num) &
-                            (df['款'] == paragraph_num if paragraph_num > 0 else True) &
-                            (df['项'] == item_num if item_num > 0 else True) &
-                            (df['内容'].str.contains(penalty_keywords, na=False))
-                        ]
+                        related_records = article_index.rows(
+                            article_index.match(article_num, paragraph_num, item_num)
+                        )
+                        related_records = related_records[related_records['内容'].str.contains(penalty_keywords, na=False)]
                         if not related_records.empty:
                             for _, related_row in related_records.iterrows():
                                 rel_article = int(related_row['条'])
@@ -79,11 +80,8 @@ def process_law_penalty(file_path):
                 B1 = "|".join(ref_text_B1) if ref_text_B1 else ""
 
                 # 更新同号同款记录的“增加处罚”列，但不对“条类型”为 6 的记录自身操作
-                same_clause_records = df[
-                    (df['条'] == row['条']) &
-                    (df['款'] == (row['款'] if pd.notna(row['款']) else 0)) 
-                ]
-                for same_index, same_row in same_clause_records.iterrows():
+                same_clause_records = article_index.within(row['条'], row['款'])
+                for same_index in same_clause_records:
                     existing_content = str(df.at[same_index, '增加处罚'])
                     if existing_content and existing_content != 'nan':
                         if B1 and B1 not in existing_content:
@@ -1,5 +1,7 @@
 import pandas as pd
 import re
+from process.tools.clause_parser import scan_clauses
+from process.tools.article_index import ArticleIndex
 
 #判断找出罚则中的所有5，即是否为别的款的额外处罚
 def process_law_penalty_new(file_path):
@@ -17,6 +19,8 @@ def process_law_penalty_new(file_path):
             if '增加处罚' not in df.columns:
                 df['增加处罚'] = ''
 
+            article_index = ArticleIndex(df)
+
             # 筛选出"罚则"为 1 且"内容"文本中没有“下列情形”“下列情况”“下列行为”之一的记录
             filtered_df = df[
                 (df['罚则'] == 1) &
@@ -26,8 +30,6 @@ def process_law_penalty_new(file_path):
 
             # 定义正则表达式模式，用于匹配包含处罚引用的总体文本
             overall_pattern = r'(依照|按照)(.*?)(条|款)(.*?)(处罚|罚款)'
-            # 定义正则表达式模式，用于匹配具体的条款号
-            clause_pattern = r'第(\d+)条(?:第(\d+)款)?(?:第(\d+)项)?'
 
             # 遍历筛选后的记录
             for index, row in filtered_df.iterrows():
@@ -37,13 +39,13 @@ def process_law_penalty_new(file_path):
                 for overall_match in overall_matches:
                     overall_text = ''.join(overall_match)
                     #print(f"overall_text: {overall_text}")
-                    clause_matches = re.findall(clause_pattern, overall_text)
+                    clause_matches = [ref for ref in scan_clauses(overall_text) if ref.article is not None]
                     #print(f"clause_matches: {clause_matches}")
                     for match in clause_matches:
                         # 提取引用的条款项信息
-                        article_num = int(match[0])
-                        paragraph_num = int(match[1]) if match[1] else 0
-                        item_num = int(match[2]) if match[2] else 0
+                        article_num = match.article
+                        paragraph_num = match.paragraph or 0
+                        item_num = match.item or 0
 
                         # 构建引用文本
                         ref_text = f"第{article_num}条"
@@ -53,13 +55,7 @@ def process_law_penalty_new(file_path):
                             ref_text += f"第{item_num}项"
 
                         # 查找对应的记录
-                        query_conditions = (df['条'] == article_num)
-                        if paragraph_num > 0:
-                            query_conditions &= (df['款'] == paragraph_num)
-                        if item_num > 0:
-                            query_conditions &= (df['项'] == item_num)
-
-                        related_records = df[query_conditions]
+                        related_records = article_index.match(article_num, paragraph_num, item_num)
 
                         # 构建当前记录的条款项号
                         current_article = row['条']
@@ -74,7 +70,7 @@ def process_law_penalty_new(file_path):
 
                         # 更新对应的"增加处罚"列
                         df.at[index, '条类型'] = 5
-                        for related_index in related_records.index:
+                        for related_index in related_records:
                             existing_content = str(df.at[related_index, '增加处罚'])
                             if existing_content and existing_content != 'nan':
                                 if current_ref not in existing_content:
@@ -0,0 +1,107 @@
+"""
+条款索引
+process/ 各步骤共用的工作表索引：每张工作表建立一次，按 (条, 款, 项, 目) 取行，
+不必在逐行循环里每次对整表做布尔筛选。提供：
+    find(5, 2)                   条款号完全相同的行（未写的级别为 0）
+    within(5, 2)                 以第5条第2款开头的各行，即该款本身及其下各项、目
+    match(5, 0, 3)               为 0 的级别不限，如第5条（任一款）第3项
+    children(label)、parent(label)  下级各行、上一级的行
+    where(labels, 罚则=1)         按罚则、违法情形、条类型等列的当前值筛选
+索引只记录行标签（df.index）。条、款、项、目的空值与 0 都记为 0，建立索引后不应再修改；
+其余各列取的是 df 的当前值，循环中修改罚则、违法情形、条类型后，where 的结果随之变化。
+"""
+import pandas as pd
+
+KEY_COLUMNS = ('条', '款', '项', '目')
+
+
+def _number(value):
+    """条款号规范为整数，空值记为 0"""
+    if value is None or pd.isna(value):
+        return 0
+    return int(value)
+
+
+def _key_column(df, column):
+    if column not in df.columns:
+        return [0] * len(df)
+    return pd.to_numeric(df[column], errors='coerce').fillna(0).astype(int).tolist()
+
+
+class ArticleIndex:
+    def __init__(self, df):
+        self.df = df
+        self._keys = {}
+        self._prefixes = {}
+        for label, key in zip(df.index, zip(*(_key_column(df, column) for column in KEY_COLUMNS))):
+            self._keys[label] = key
+            for length in range(1, len(KEY_COLUMNS) + 1):
+                self._prefixes.setdefault(key[:length], []).append(label)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def key(self, label):
+        """行的 (条, 款, 项, 目)"""
+        return self._keys[label]
+
+    def within(self, *levels):
+        """前几级条款号依次相同的各行，按表中顺序"""
+        return list(self._prefixes.get(tuple(_number(value) for value in levels), ()))
+
+    def article(self, article):
+        """同一条的各行"""
+        return self.within(article)
+
+    def find(self, article, paragraph=0, item=0, subitem=0):
+        """条款号完全相同的各行"""
+        return self.within(article, paragraph, item, subitem)
+
+    def first(self, article, paragraph=0, item=0, subitem=0):
+        """条款号完全相同的第一行，没有时返回 None"""
+        labels = self._prefixes.get(tuple(map(_number, (article, paragraph, item, subitem))))
+        return labels[0] if labels else None
+
+    def match(self, article=0, paragraph=0, item=0, subitem=0):
+        """不为 0 的级别须相同，为 0 的级别不限"""
+        wanted = tuple(map(_number, (article, paragraph, item, subitem)))
+        known = 0
+        while known < len(wanted) and wanted[known]:
+            known += 1
+        if known == len(wanted):
+            return self.within(*wanted)
+        candidates = self._prefixes.get(wanted[:known], ()) if known else self._keys
+        return [label for label in candidates
+                if all(not value or value == actual
+                       for value, actual in zip(wanted[known:], self._keys[label][known:]))]
+
+    def children(self, label):
+        """下级各行（含更下级），如某款下的各项及项下的目"""
+        key = self._keys[label]
+        depth = 1
+        while depth < len(key) and key[depth]:
+            depth += 1
+        if depth == len(key):
+            return []
+        return [child for child in self._prefixes[key[:depth]] if self._keys[child][depth]]
+
+    def parent(self, label):
+        """上一级的第一行，如某项所在款的款本身；已是条一级时返回 None"""
+        key = self._keys[label]
+        depth = len(key) - 1
+        while depth > 0 and not key[depth]:
+            depth -= 1
+        if depth == 0:
+            return None
+        labels = self._prefixes.get(key[:depth] + (0,))
+        return labels[0] if labels else None
+
+    def where(self, labels, **conditions):
+        """按各列当前值筛选，如 where(labels, 罚则=1, 违法情形=0)"""
+        cells = self.df.at
+        return [label for label in labels
+                if all(cells[label, column] == value for column, value in conditions.items())]
+
+    def rows(self, labels):
+        """各行组成的 DataFrame"""
+        return self.df.loc[labels]
@@ -0,0 +1,67 @@
+"""
+中文数字转换
+导入（import_db_structure）与 process/ 各步骤共用的中文数字表：1–9999 的所有写法在导入时生成一次，
+转换只做一次字典查找。收录的写法：
+    十二、一十二                 十位为一时可省略"一"
+    一百一十、一百十             紧跟百、千的"一十"可省略"一"（"一千零一十"不省略）
+    两百、两千                   百、千位上的"二"可写作"两"
+    一百零五、一百〇五           中间的零写作"零"或"〇"
+带括号的写法，如"(十二)""（十二）"，也一并收录。
+"""
+from itertools import product
+
+MAX_NUMBER = 9999
+
+NUMERAL_CHARS = '零〇一二两三四五六七八九十百千'
+DIGIT_CHARS = '零一二三四五六七八九'
+ZERO_CHARS = ('零', '〇')
+UNITS = ('千', '百', '十', '')
+BRACKETS = {'(': ')', '（': '）'}
+
+
+def _forms(number):
+    """number 的所有写法，第一个为规范写法"""
+    digits = (number // 1000 % 10, number // 100 % 10, number // 10 % 10, number % 10)
+    parts = []
+    started = pending_zero = False
+    for digit, unit in zip(digits, UNITS):
+        if digit == 0:
+            pending_zero = started
+            continue
+        choices = [DIGIT_CHARS[digit]]
+        if digit == 2 and unit in ('百', '千'):
+            choices.append('两')
+        elif digit == 1 and unit == '十' and not pending_zero:
+            choices = ['一', ''] if started else ['', '一']
+        if pending_zero:
+            parts.append(ZERO_CHARS)
+            pending_zero = False
+        parts.append([choice + unit for choice in choices])
+        started = True
+    return [''.join(part) for part in product(*parts)]
+
+
+def _build_table():
+    table = {}
+    for number in range(1, MAX_NUMBER + 1):
+        for form in _forms(number):
+            table[form] = number
+            for opening, closing in BRACKETS.items():
+                table[f'{opening}{form}{closing}'] = number
+    return table
+
+
+# 中文写法 -> 数值
+CHINESE_NUMERALS = _build_table()
+
+
+def chinese_to_int(text):
+    """中文数字转为整数，如"三十七""(一百零五)"；不在 1–9999 内或无法识别时返回 None"""
+    return CHINESE_NUMERALS.get(text)
+
+
+def int_to_chinese(number):
+    """整数的规范中文写法，如 105 -> "一百零五"，超出 1–9999 时返回 None"""
+    if not 1 <= number <= MAX_NUMBER:
+        return None
+    return _forms(number)[0]
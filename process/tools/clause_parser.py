@@ -0,0 +1,129 @@
+"""
+条款引用解析
+页面、导入与 process/ 各步骤共用的条款引用扫描：一个预编译的正则单遍扫描文本，
+得到 (法规名, 条, 款, 项, 目) 结构，并处理以下写法：
+    《中华人民共和国统计法》第三十七条第一款     法规名、中文数字
+    第十二条、第十五条第二款                     并列引用
+    第二款、第（三）项                           单独的款、项归入前面的条、款
+    第三条至第五条、第（一）项到第（四）项       区间展开为逐条（项）
+未写法规名的引用沿用同一文本中前一个法规名，遇到"本法""本条例"等则恢复为本法规。
+结果按文本缓存，同一文本重复解析直接返回。
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from process.tools.chinese_numerals import chinese_to_int, NUMERAL_CHARS
+
+ClauseRef = namedtuple('ClauseRef', ['law', 'article', 'paragraph', 'item', 'section'])
+
+LEVELS = ('article', 'paragraph', 'item', 'section')
+
+# 区间最多展开的条数，超出视为两个独立引用
+MAX_RANGE = 200
+CACHE_SIZE = 65536
+
+_NUMBER = rf'[0-9０-９{NUMERAL_CHARS}]+'
+
+
+def _chain(suffix):
+    """连续的"第N条第N款第N项第N目"，至少一级"""
+    return (
+        rf'(?=第[（(]?{_NUMBER}[）)]?[条款项目])'
+        rf'(?:第(?P<article{suffix}>{_NUMBER})条(?!例))?'
+        rf'(?:第(?P<paragraph{suffix}>{_NUMBER})款)?'
+        rf'(?:第[（(]?(?P<item{suffix}>{_NUMBER})[）)]?项)?'
+        rf'(?:第(?P<section{suffix}>{_NUMBER})目)?'
+    )
+
+
+CLAUSE_PATTERN = re.compile(
+    rf'(?:《(?P<law>[^》]+)》)?{_chain("")}'
+    rf'(?:(?:至|到|－|-|—|～|~){_chain("_end")})?'
+)
+
+# 两个引用之间出现时，后面的引用指本法规
+SELF_REFERENCE_PATTERN = re.compile(r'本(?:法|条例|办法|规定|细则|决定|规则)')
+
+
+def parse_number(text):
+    """阿拉伯或中文数字转为整数，如 "37"、"三十七"、"一百零五"，无法识别时返回 None"""
+    if not text:
+        return None
+    if text.isdigit():
+        return int(text)
+    return chinese_to_int(text)
+
+
+def _first_level(values):
+    return next((index for index, value in enumerate(values) if value is not None), None)
+
+
+def _inherit(values, context):
+    """单独的款、项、目沿用前一个引用的上级编号"""
+    first = _first_level(values)
+    return [context[index] if index < first else value for index, value in enumerate(values)]
+
+
+def _expand_range(start, end_values):
+    """区间的起止只在一级上不同时逐个展开，否则返回 None"""
+    level = _first_level(end_values)
+    end = start[:level] + end_values[level:]
+    if start[:level] != end[:level] or any(value is not None for value in end[level + 1:]) \
+            or any(value is not None for value in start[level + 1:]):
+        return None
+    low, high = start[level], end[level]
+    if low is None or high is None or not 0 < high - low <= MAX_RANGE:
+        return None
+    return [start[:level] + [number] + start[level + 1:] for number in range(low, high + 1)]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def scan_clauses(text):
+    """扫描文本中的条款引用，返回 ClauseRef 元组（按出现顺序去重）
+
+    单独的款、项之前没有可沿用的条时，条为 None。
+    """
+    if not text or '第' not in text:
+        return ()
+    refs = []
+    seen = set()
+    law = None
+    context = [None, None, None, None]
+    previous_end = 0
+    for match in CLAUSE_PATTERN.finditer(text):
+        name, *numbers = match.groups()
+        if not any(numbers[:4]):
+            continue
+        values = [parse_number(number) if number else None for number in numbers[:4]]
+        if _first_level(values) is None:
+            continue
+        if name:
+            law = name
+            context = [None, None, None, None]
+        elif SELF_REFERENCE_PATTERN.search(text, previous_end, match.start()):
+            law = None
+        previous_end = match.end()
+
+        values = _inherit(values, context)
+        expanded = None
+        end_values = [parse_number(number) if number else None for number in numbers[4:]]
+        if _first_level(end_values) is not None:
+            expanded = _expand_range(values, end_values)
+            if expanded is None:
+                expanded = [values, _inherit(end_values, values)]
+        for current in expanded or [values]:
+            ref = ClauseRef(law, *current)
+            if ref not in seen:
+                seen.add(ref)
+                refs.append(ref)
+            context = current
+    return tuple(refs)
+
+
+def clause_numbers(text):
+    """第一个引用的 (条, 款, 项, 目)，缺省为 0；没有引用时全为 0"""
+    refs = scan_clauses(text)
+    if not refs:
+        return 0, 0, 0, 0
+    return tuple(value or 0 for value in refs[0][1:])
@@ -1,96 +1,27 @@
 import re
+from process.tools.clause_parser import scan_clauses
 
-# 基础中文数字映射
-BASE_NUM = {
-    '零': 0, '一': 1, '二': 2, '三': 3, '四': 4,
-    '五': 5, '六': 6, '七': 7, '八': 8, '九': 9,
-    '十': 10, '百': 100, '千': 1000
-}
+# 条款数组中条、款、项、目的键名
+CLAUSE_KEYS = ('Article', 'Section', 'Item', 'Subitem')
 PENALTY_TYPES = ["处罚", "罚款", "改正", "吊销", "责令", "逾期", "限期", "处**罚款", "没收", "降低资质", "查封", "强制", "情节**", "通报批评", "处分", "依法给予"]
 
 
-def process_standalone_sections(array_B):
-    """
-    处理单独的"第X款"，将其与前面的"第X条"关联
-    """
-    #print("\n开始处理单独的款号...")
-    result = []
-    last_article = None
-    
-    for clause in array_B:
-        # 如果当前条款有Article，更新last_article
-        if 'Article' in clause:
-            last_article = clause['Article']
-            result.append(clause)
-            #print(f"找到条款号：{last_article}")
-        # 如果当前条款只有Section，且前面有last_article
-        elif 'Section' in clause and last_article is not None:
-            # 创建新的条款对象，包含Article和Section
-            new_clause = {
-                'Article': last_article,
-                'Section': clause['Section'],
-                'Item': clause.get('Item'),
-                'Subitem': clause.get('Subitem')
-            }
-            result.append(new_clause)
-            #print(f"将单独的款号 {clause['Section']} 关联到条款号 {last_article}")
-        else:
-            # 其他情况直接添加
-            result.append(clause)
-    
-    #print(f"处理后的条款数组：{result}")
-    return result
-
 def get_clause_array(text):
     """
     从文本中提取条款数组，比如提取出"第X条"、"第X条第Y款"、"第X条第Y款第Z项"等
+    单独的"第X款""第X项"归入前面的条、款，"第X条至第Y条"展开为逐条（解析见 clause_parser）
     参数:
         text (str): 需要处理的文本
     返回:
-        list: 包含提取到的条款的数组
+        list: 包含提取到的条款的数组，如 [{'Article': '3', 'Section': '2'}]
     """
-    #print(f"\n开始处理文本：{text}")
-    
-    # Use regex to match "Article X", "Section X", "Item X" with Arabic numerals
-    pattern = r'第\d+(?:条(?:第\d+款(?:第\d+项)?)?|款(?:第\d+项)?|项)'
-    array_A = re.findall(pattern, text)
-    #print(f"提取到的条款数组：{array_A}")
     array_B = []
-    last_tiao = None
-    last_kuan = None
-    
-    for clause in array_A:
+    for ref in scan_clauses(text):
         obj = {}
-        tiao_match = re.search(r'第(\d+)条', clause)
-        kuan_match = re.search(r'第(\d+)款', clause)
-        xiang_match = re.search(r'第(\d+)项', clause)
-        
-        if tiao_match:
-            obj['Article'] = tiao_match.group(1)
-            last_tiao = obj['Article']
-            last_kuan = None
-            #print(f"提取到条款：{obj['Article']}")
-
-        if kuan_match:
-            obj['Section'] = kuan_match.group(1)
-            if 'Article' not in obj and last_tiao:
-                obj['Article'] = last_tiao
-            last_kuan = obj['Section']
-            #print(f"提取到款：{obj['Section']}")
-
-        if xiang_match:
-            obj['Item'] = xiang_match.group(1)
-            if 'Article' not in obj and last_tiao:
-                obj['Article'] = last_tiao
-            if 'Section' not in obj and last_kuan:
-                obj['Section'] = last_kuan
-            #print(f"提取到项：{obj['Item']}")
+        for key, value in zip(CLAUSE_KEYS, ref[1:]):
+            if value is not None:
+                obj[key] = str(value)
         array_B.append(obj)
-    #print(f"提取到的条款数组：{array_B}")
-    
-    # 处理单独的款号，有些文本中是单独的"第X款"，需要将其与前面的"第X条"关联
-    array_B = process_standalone_sections(array_B)
-    
     return array_B
     
 #找出罚则词，保留该词之前的部分，如果前面有情形的描述，则保留情形描述之前的部分
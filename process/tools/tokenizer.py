@@ -0,0 +1,234 @@
+"""
+分词缓存
+add_vio_ass 语义比较前要对条文分词，同一段文字在一次处理中、各次处理之间反复出现。
+分词结果按内容哈希缓存：
+    内存中保留最近用到的 CACHE_SIZE 段（LRU）
+    设置 TOKEN_CACHE_PATH 后另存入该 SQLite 文件，各进程、各次处理共用
+jieba 在首次分词时才构建前缀词典（约 1 秒）；init_tokenizer 在 worker 启动时提前完成这一步，
+并加载法律用语词典 JIEBA_USER_DICT（默认 process/legal_dict.txt，文件存在时；格式同 jieba 用户词典，
+由 build_legal_dict.py 从法规名称、制定机关与处罚用语生成）。
+加载词典时使用独立的分词器，全文检索（app/services/search.py）的分词不受影响。
+缓存键包含 jieba 版本与词典内容的哈希，更换词典后旧缓存自然失效，精简词向量表需重新生成。
+cut_many 批量分词，未缓存的文字较多时分给多个进程。
+"""
+import os
+import json
+import atexit
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import jieba
+
+logger = logging.getLogger(__name__)
+
+PROCESS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 可用环境变量指定；TOKEN_CACHE_PATH 为空时不使用磁盘缓存
+USER_DICT_PATH = os.environ.get('JIEBA_USER_DICT', os.path.join(PROCESS_DIR, 'legal_dict.txt'))
+CACHE_PATH = os.environ.get('TOKEN_CACHE_PATH', '')
+CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE') or 50000)
+
+# 未缓存的文字少于此数时在本进程内分词，多进程的启动开销不值得
+PARALLEL_MIN = 2000
+CHUNK_SIZE = 200
+# 磁盘缓存每积累这么多条新结果提交一次
+COMMIT_EVERY = 1000
+QUERY_BATCH_SIZE = 500
+
+_lock = threading.Lock()
+_tokenizer = None
+_fingerprint = ''
+_store = None
+
+
+class LRUCache:
+    """容量有限的缓存，满时淘汰最久未用的项"""
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class TokenStore:
+    """磁盘上的分词缓存（SQLite），内容哈希 -> 词列表（JSON）"""
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS tokens (hash TEXT PRIMARY KEY, words TEXT NOT NULL)')
+        self._connection.commit()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """已缓存的 {哈希: 词元组}"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._pending:
+                    found[key] = self._pending[key]
+            rest = [key for key in keys if key not in found]
+            for start in range(0, len(rest), QUERY_BATCH_SIZE):
+                batch = rest[start:start + QUERY_BATCH_SIZE]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._connection.execute(
+                    f'SELECT hash, words FROM tokens WHERE hash IN ({placeholders})', batch)
+                found.update((key, tuple(json.loads(words))) for key, words in rows)
+        return found
+
+    def put(self, key, words):
+        with self._lock:
+            self._pending[key] = words
+            if len(self._pending) >= COMMIT_EVERY:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        self._connection.executemany(
+            'INSERT OR IGNORE INTO tokens (hash, words) VALUES (?, ?)',
+            [(key, json.dumps(words, ensure_ascii=False)) for key, words in self._pending.items()])
+        self._connection.commit()
+        self._pending.clear()
+
+
+_memory = LRUCache(CACHE_SIZE)
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def init_tokenizer(user_dict=USER_DICT_PATH):
+    """构建分词器（加载前缀词典与法律用语词典），进程内只做一次，返回分词器"""
+    global _tokenizer, _fingerprint
+    if _tokenizer is not None:
+        return _tokenizer
+    with _lock:
+        if _tokenizer is None:
+            if user_dict and os.path.exists(user_dict):
+                tokenizer = jieba.Tokenizer()
+                tokenizer.initialize()
+                tokenizer.load_userdict(user_dict)
+                dictionary = _file_hash(user_dict)
+                logger.info(f"已加载法律用语词典 {user_dict}")
+            else:
+                tokenizer = jieba.dt
+                tokenizer.initialize()
+                dictionary = ''
+            _fingerprint = f"jieba {jieba.__version__} {dictionary}\n"
+            _tokenizer = tokenizer
+    return _tokenizer
+
+
+def _get_store():
+    global _store
+    if _store is None and CACHE_PATH:
+        with _lock:
+            if _store is None:
+                _store = TokenStore(CACHE_PATH)
+                atexit.register(_store.flush)
+    return _store
+
+
+def content_key(text):
+    """缓存键：分词器版本、词典与文字内容的 SHA-256"""
+    init_tokenizer()
+    return hashlib.sha256((_fingerprint + text).encode('utf-8')).hexdigest()
+
+
+def _lcut(text):
+    return init_tokenizer().lcut(text)
+
+
+def cut(text):
+    """分词（同 jieba.lcut），结果经缓存"""
+    key = content_key(text)
+    words = _memory.get(key)
+    if words is None:
+        store = _get_store()
+        words = store.get_many([key]).get(key) if store else None
+        if words is None:
+            words = tuple(_lcut(text))
+            if store:
+                store.put(key, words)
+        _memory.put(key, words)
+    return list(words)
+
+
+def cut_many(texts, workers=None):
+    """
+    批量分词，返回与 texts 一一对应的词列表
+    未缓存的文字不少于 PARALLEL_MIN 段时分给 workers 个进程（默认 CPU 数）
+    """
+    texts = list(texts)
+    keys = [content_key(text) for text in texts]
+    results = {}
+    missing = {}
+    for key, text in zip(keys, texts):
+        words = _memory.get(key)
+        if words is not None:
+            results[key] = words
+        else:
+            missing[key] = text
+
+    store = _get_store()
+    if missing and store:
+        found = store.get_many(list(missing))
+        results.update(found)
+        for key in found:
+            del missing[key]
+
+    if missing:
+        workers = workers or os.cpu_count() or 1
+        pending = list(missing.values())
+        if workers > 1 and len(pending) >= PARALLEL_MIN:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_tokenizer) as executor:
+                tokenized = list(executor.map(_lcut, pending, chunksize=CHUNK_SIZE))
+        else:
+            tokenized = [_lcut(text) for text in pending]
+        for key, words in zip(missing, tokenized):
+            results[key] = tuple(words)
+            if store:
+                store.put(key, results[key])
+        if store:
+            store.flush()
+
+    for key in dict.fromkeys(keys):
+        _memory.put(key, results[key])
+    return [list(results[key]) for key in keys]
+
+
+def flush():
+    """将磁盘缓存中尚未提交的结果写入文件"""
+    if _store is not None:
+        _store.flush()
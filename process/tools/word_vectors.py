@@ -0,0 +1,211 @@
+"""
+词向量模型
+add_vio_ass 语义比较所用的词向量（腾讯 AILab word2vec）。原始的 AILab.bin 每次都要整体解析，
+耗时数十秒且每个 worker 各占一份内存；先用 convert_word_vectors.py 转换一次为 gensim 原生格式：
+    AILab.kv                 词表等元数据
+    AILab.kv.vectors.npy     向量矩阵
+之后以 mmap='r' 只读映射 .npy，各进程、各次任务共用操作系统的页缓存，加载只需读词表。
+模型在进程内首次使用时加载一次（get_model），此后直接返回同一个对象。
+
+完整模型有数百万词，法规语料实际用到的只有几万个。build_compact_vectors.py 扫描 laws_folder
+与数据库中的条文、事由，只保留分词后出现过的词，导出精简词向量表（CompactVectors）：
+    AILab.compact.npy        float16 向量矩阵
+    AILab.compact.vocab      词表，每行一个词，行号即矩阵中的行
+    AILab.compact.missing    生成时已确认完整模型也没有的词（标点、生僻词等）
+存在精简表时 get_model 优先加载它。新导入的法规可能带来表中没有的词：这些词在首次遇到时
+从完整模型（内存映射）中读取，结果不受影响，只是要多加载一次完整模型的词表；
+add_vio_ass 按工作表输出精简表的覆盖率，偏低时应重新生成。完整模型比精简表新时不使用精简表。
+"""
+import os
+import time
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 可用环境变量指向其他位置
+SOURCE_PATH = os.environ.get('WORD_VECTORS_SOURCE') or os.path.join(MODEL_DIR, 'AILab.bin')
+NATIVE_PATH = os.environ.get('WORD_VECTORS_PATH') or os.path.join(MODEL_DIR, 'AILab.kv')
+# 设为空字符串则不使用精简表
+COMPACT_PATH = os.environ.get('WORD_VECTORS_COMPACT', os.path.join(MODEL_DIR, 'AILab.compact'))
+
+_models = {}
+_lock = threading.Lock()
+
+
+def vectors_file(native_path):
+    """原生格式中单独保存的向量矩阵文件"""
+    return f"{native_path}.vectors.npy"
+
+
+def _read_lines(path):
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    return content.split('\n') if content else []
+
+
+def _write_lines(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+class CompactVectors:
+    """
+    精简词向量表，提供 add_vio_ass 用到的 vector_size、in 与按词取向量
+    向量以 float16 保存，取出时转为 float32；词到行号的映射是普通 dict
+    missing 是生成时已确认完整模型没有的词；两者都不含的词交给 fallback（返回完整模型的函数），
+    首次用到时才调用，没有 fallback 或找不到完整模型时按模型不收录处理
+    """
+    def __init__(self, words, vectors, missing=(), fallback=None):
+        if len(words) != len(vectors):
+            raise ValueError(f"词表与向量矩阵行数不一致: {len(words)} != {len(vectors)}")
+        self.index_to_key = list(words)
+        self.key_to_index = {word: row for row, word in enumerate(self.index_to_key)}
+        self.vectors = np.asarray(vectors, dtype=np.float16)
+        self.vector_size = self.vectors.shape[1]
+        self.missing = set(missing)
+        self.fallback = fallback
+        self._fallback_model = None
+        self._fallback_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.index_to_key)
+
+    def __contains__(self, word):
+        if word in self.key_to_index:
+            return True
+        if word in self.missing:
+            return False
+        model = self.fallback_model()
+        return model is not None and word in model
+
+    def __getitem__(self, word):
+        row = self.key_to_index.get(word)
+        if row is not None:
+            return self.vectors[row].astype(np.float32)
+        model = self.fallback_model() if word not in self.missing else None
+        if model is None:
+            raise KeyError(word)
+        return np.asarray(model[word], dtype=np.float32)
+
+    def covers(self, word):
+        """生成精简表时是否见过该词（收录或已确认完整模型没有）"""
+        return word in self.key_to_index or word in self.missing
+
+    def coverage(self, words):
+        """words 中精简表见过的词所占比例（按不同的词计）"""
+        words = set(words)
+        if not words:
+            return 1.0
+        return sum(1 for word in words if self.covers(word)) / len(words)
+
+    def fallback_model(self):
+        """完整模型，首次调用时经 fallback 加载；不可用时返回 None"""
+        if self._fallback_model is None and self.fallback is not None:
+            with self._fallback_lock:
+                if self._fallback_model is None and self.fallback is not None:
+                    try:
+                        self._fallback_model = self.fallback()
+                        logger.info("精简词向量表缺少部分词，已加载完整模型补充")
+                    except FileNotFoundError as e:
+                        logger.warning(f"精简词向量表缺少部分词，且无法加载完整模型: {e}")
+                        self.fallback = None
+        return self._fallback_model
+
+    @classmethod
+    def from_model(cls, model, words):
+        """从完整模型中取出 words 里模型收录的词，按 words 的顺序；其余的词记入 missing"""
+        words = [word for word in dict.fromkeys(words) if '\n' not in word]
+        kept = [word for word in words if word in model]
+        vectors = np.empty((len(kept), model.vector_size), dtype=np.float16)
+        for row, word in enumerate(kept):
+            vectors[row] = model[word]
+        return cls(kept, vectors, missing=[word for word in words if word not in model])
+
+    def save(self, path):
+        matrix_file, vocab_file, missing_file = compact_files(path)
+        np.save(matrix_file, self.vectors)
+        _write_lines(vocab_file, self.index_to_key)
+        _write_lines(missing_file, sorted(self.missing))
+
+    @classmethod
+    def load(cls, path, fallback=None):
+        matrix_file, vocab_file, missing_file = compact_files(path)
+        missing = _read_lines(missing_file) if os.path.exists(missing_file) else []
+        return cls(_read_lines(vocab_file), np.load(matrix_file), missing=missing, fallback=fallback)
+
+    @property
+    def nbytes(self):
+        """向量矩阵占用的字节数"""
+        return self.vectors.nbytes
+
+
+def compact_files(path):
+    """精简表的 (向量矩阵, 词表, 完整模型没有的词) 文件"""
+    return f"{path}.npy", f"{path}.vocab", f"{path}.missing"
+
+
+def has_compact(path):
+    return bool(path) and all(os.path.exists(file) for file in compact_files(path)[:2])
+
+
+def is_stale(compact_path, native_path):
+    """完整模型在精简表生成之后更新过"""
+    model_file = vectors_file(native_path)
+    return os.path.exists(model_file) and os.path.getmtime(model_file) > os.path.getmtime(compact_files(compact_path)[0])
+
+
+def convert_model(source_path=SOURCE_PATH, native_path=NATIVE_PATH):
+    """将 word2vec 二进制格式转换为 gensim 原生格式，向量矩阵单独保存为 .npy，返回词数"""
+    from gensim.models import KeyedVectors
+
+    started = time.monotonic()
+    model = KeyedVectors.load_word2vec_format(source_path, binary=True)
+    logger.info(f"已读取 {source_path}: {len(model.index_to_key)} 个词，{model.vector_size} 维，"
+                f"耗时 {time.monotonic() - started:.1f}s")
+    model.save(native_path, separately=['vectors'])
+    logger.info(f"已保存 {native_path} 与 {vectors_file(native_path)}")
+    return len(model.index_to_key)
+
+
+def _load(native_path, source_path, compact_path):
+    started = time.monotonic()
+    if has_compact(compact_path):
+        model = CompactVectors.load(compact_path, fallback=lambda: get_model(native_path, source_path, compact_path=''))
+        logger.info(f"已加载精简词向量表 {compact_path}: {len(model)} 个词，"
+                    f"耗时 {time.monotonic() - started:.2f}s")
+        return model
+
+    from gensim.models import KeyedVectors
+    if os.path.exists(native_path) and os.path.exists(vectors_file(native_path)):
+        model = KeyedVectors.load(native_path, mmap='r')
+    elif os.path.exists(source_path):
+        logger.warning(f"未找到 {native_path}，整体解析 {source_path}；"
+                       f"运行 python convert_word_vectors.py 转换后可改为内存映射加载")
+        model = KeyedVectors.load_word2vec_format(source_path, binary=True)
+    else:
+        raise FileNotFoundError(f"未找到词向量模型: {native_path} 或 {source_path}")
+    logger.info(f"词向量模型加载完成，耗时 {time.monotonic() - started:.2f}s")
+    return model
+
+
+def get_model(native_path=NATIVE_PATH, source_path=SOURCE_PATH, compact_path=COMPACT_PATH):
+    """
+    进程内共用的词向量模型，首次调用时加载：有精简表时用精简表（缺少的词从完整模型读取），否则用完整模型
+    compact_path 为空或精简表比完整模型旧时只加载完整模型；找不到模型文件时抛出 FileNotFoundError
+    """
+    if has_compact(compact_path) and is_stale(compact_path, native_path):
+        logger.warning(f"{vectors_file(native_path)} 比精简词向量表 {compact_path} 新，改用完整模型；"
+                       f"请重新运行 python build_compact_vectors.py")
+        compact_path = ''
+    key = (native_path, compact_path if has_compact(compact_path) else '')
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = _models[key] = _load(native_path, source_path, key[1])
+    return model
@@ -1,7 +1,9 @@
 # wsgi.py
+import os
 from app import create_app
 
-application = create_app()
+# 生产部署设置 APP_CONFIG=config.ProductionConfig
+application = create_app(os.environ.get('APP_CONFIG', 'config.Config'))
 
 if __name__ == "__main__":
     application.run(debug=True)
\ No newline at end of file